@@ -26,4 +26,6 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Froggit(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Froggit(width=GAME_WIDTH,height=GAME_HEIGHT,retained=True,timestep=1/60,
+            profile=PROFILE_FILE if PROFILE else False,overlay=PROFILE,
+            record=RECORD_FILE if RECORD else None).run()
@@ -71,7 +71,14 @@ class Froggit(GameApp):
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
 
     # Attribute _cover: A background underneath text to display to the player
-    # Invariant: _cover is a GLabel, or None if there is no text to display
+    # Invariant: _cover is a GLabel, or None if there is no text to display (the
+    #            texts of a pause are only made once, when _cover is None)
+    #
+    # Attribute _loader: The loader making the level, a few steps every frame
+    # Invariant: _loader is a GLoader, or None if no level is loading
+    #
+    # Attribute _bar: The progress bar of the loading screen (its outline and its fill)
+    # Invariant: _bar is a list of two GRectangles, or None if no level is loading
 
     # DO NOT MAKE A NEW INITIALIZER!
 
@@ -92,10 +99,17 @@ class Froggit(GameApp):
         """
         #no need for assert statements bc no parameters
         #initialize any game specific attributes
+        self.load_atlas(IMAGE_ATLAS)
+        self.load_sounds(SOUND_VOICES)
+        self.load_glyphs(ALLOY_FONT,ALLOY_TINY)
+        if self.recorder:
+            self.recorder.tag = DEFAULT_LEVEL
         self._level = None
         self._title = None
         self._text = None
         self._cover = None
+        self._loader = None
+        self._bar = None
         self._state = STATE_INACTIVE
 
         #invariants of _state
@@ -138,10 +152,12 @@ class Froggit(GameApp):
         STATE_LOADING: This is the state that creates a new level and shows it on
         the screen. The application switches to this state if the state was
         STATE_INACTIVE in the previous frame, and the player pressed a key.
-        This state only lasts one animation frame (the amount of time to load
-        the data from the file) before switching to STATE_ACTIVE. One of the
-        key things about this state is that it resizes the window to match the
-        level file.
+        The level file is read on a worker thread, and the level is then made
+        a few lanes at a time, LOAD_BUDGET seconds every frame, while a progress
+        bar is shown. So this state lasts as many frames as loading takes
+        before switching to STATE_ACTIVE (unless the game is being recorded, as
+        a replay expects a level to load in one frame). One of the key things
+        about this state is that it resizes the window to match the level file.
 
         STATE_ACTIVE: This is a session of normal gameplay. The player can
         move the frog towards the exit, and the game will move all obstacles
@@ -170,14 +186,21 @@ class Froggit(GameApp):
             self._title = None
             self._text = None
             self._state = STATE_LOADING
+            self.loadingTexts()
 
         if self._state == STATE_LOADING:
-            dic = self.load_json(DEFAULT_LEVEL)
-            hitdic = self.load_json(OBJECT_DATA)
-            self._level = Level(dic, hitdic)
-            self.width = self._level.getWidth()
-            self.height = self._level.getHeight()
-            self._state = STATE_ACTIVE
+            if self._loader.update(self.frame):
+                self._level = self._loader.result
+                self._level.setProfiler(self.profiler)
+                self.width = self._level.getWidth()
+                self.height = self._level.getHeight()
+                self._loader = None
+                self._bar = None
+                self._text = None
+                self._state = STATE_ACTIVE
+            else:
+                self._bar[1].width = max(1,self._bar[0].width*self._loader.progress)
+                self._bar[1].left = self._bar[0].left
         if self._state == STATE_ACTIVE and not self.isPaused():
                 self._level.update(dt, self.input)
 
@@ -186,7 +209,8 @@ class Froggit(GameApp):
                 self.youLoseText(self._level)
                 self._state = STATE_COMPLETE
             elif self._level.pauseGame():
-                self.pausedTexts(self._level)
+                if self._cover is None:
+                    self.pausedTexts(self._level)
                 if self.input.is_key_down('c'):
                     self._state = STATE_CONTINUE
             elif self._level.endGame():
@@ -195,6 +219,8 @@ class Froggit(GameApp):
 
         if self._state == STATE_CONTINUE:
             self._level.resetFrog()
+            self._text = None
+            self._cover = None
             self._state = STATE_ACTIVE
 
     def draw(self):
@@ -215,8 +241,16 @@ class Froggit(GameApp):
             self._title.draw(self.view)
             self._text.draw(self.view)
 
-        if self._state != STATE_INACTIVE:
-            self._level.draw(self.view)
+        if self._state == STATE_LOADING:
+            self._text.draw(self.view)
+            for rect in self._bar:
+                rect.draw(self.view)
+
+        if self._state != STATE_INACTIVE and self._state != STATE_LOADING:
+            self._level.setFramerate(self.framerate)
+            # Only a level that is being updated has two positions to draw between
+            alpha = self.alpha if self._state == STATE_ACTIVE else 1
+            self._level.draw(self.view, alpha)
 
         if self._state == STATE_PAUSED or self._state == STATE_COMPLETE:
             self._cover.draw(self.view)
@@ -231,6 +265,36 @@ class Froggit(GameApp):
         if self._level.pauseGame() or self._level.endGame():
             self._state = STATE_PAUSED
 
+    def loadingTexts(self):
+        """
+        Starts loading the level, and initializes the loading screen
+
+        The level file is read on a worker thread (see readLevel), and the level is
+        made on the main thread in small steps (see the method build in Level).
+        """
+        # A recording expects the level to load in one frame (as a replay does)
+        recording = not self.recorder is None
+        self._loader = GLoader(self.readLevel, lambda data: Level.build(*data), \
+        budget=None if recording else LOAD_BUDGET, threaded=not recording)
+
+        self._text = GLabel(text="LOADING",font_name=ALLOY_FONT,\
+        font_size=ALLOY_MEDIUM,x=self.width//2,y=self.height//2)
+
+        self._bar = [GRectangle(width=self.width//2,height=GRID_SIZE//4,\
+        x=self.width//2,top=self._text.bottom-GRID_SIZE//2,\
+        fillcolor="white",linecolor="dark green",linewidth=2)]
+        self._bar.append(GRectangle(width=1,height=self._bar[0].height,\
+        left=self._bar[0].left,y=self._bar[0].y,fillcolor="dark green"))
+
+    def readLevel(self):
+        """
+        Returns the tuple (dic, hitdic) for the level file, compiled
+
+        This is called on the worker thread of the loader, so it must not make any
+        graphics objects.
+        """
+        return self.load_compiled(DEFAULT_LEVEL,Level.compile,OBJECT_DATA)
+
     def pausedTexts(self, level):
         """
         Initializes the messages on the pause screen
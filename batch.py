@@ -0,0 +1,376 @@
+"""
+Batch simulation script for Froggit
+
+This module runs many independent episodes of Froggit (for balancing levels, or for
+training a player) on a pool of worker processes.  An episode is one game of a level,
+from the first frame until the game is won, lost or runs out of time.  The frog is
+controlled by a policy, which chooses the key to hold down each frame.  Each episode has
+its own seed, so an episode with the same level, policy and seed always plays the same.
+
+Episodes are completely independent, so they are spread over the processes in small
+chunks and the results are collected as they finish.  With one process per core, the
+number of episodes per second grows almost linearly with the number of cores.
+
+Like simulate.py, this script uses the headless backend of game2d.
+
+Run by typing "python batch.py [level ...] [--episodes N] [--policy NAME] [--processes N]
+[--frames N] [--out FILE]" into the command line.  The script prints a summary of each
+level, and can save the result of every episode as CSV or JSON.
+"""
+import os
+import sys
+os.environ['GAME2D_HEADLESS'] = '1'
+
+# The constants read the game's command line (level and frog speed), not this one
+_argv, sys.argv = sys.argv, sys.argv[:1]
+import random
+import multiprocessing
+from consts import *
+from game2d import *
+from level import *
+from simulate import Simulation
+sys.argv = _argv
+
+
+# POLICIES (EACH CHOOSES THE KEY TO HOLD DOWN EACH FRAME, OR NONE)
+class Policy(object):
+    """
+    A class representing a way of choosing keys for the frog.
+
+    The base policy never presses anything.  Subclasses override choose.  A policy is
+    reset with its own random number generator at the start of every episode, so any
+    randomness should come from that generator.
+    """
+    # HIDDEN ATTRIBUTES
+
+    # Attribute _rng: The random number generator for the current episode
+    # Invariant: _rng is a random.Random object (or None before the first episode)
+
+    def __init__(self):
+        """
+        Initializes a new policy
+        """
+        self._rng = None
+
+    def reset(self, rng):
+        """
+        Starts a new episode
+
+        Parameter rng: The random number generator for the episode
+        Precondition: rng is a random.Random object
+        """
+        self._rng = rng
+
+    def choose(self, frame, level):
+        """
+        Returns the key to hold down this frame, or None for no key
+
+        Parameter frame: The frame number in the episode
+        Precondition: frame is an int >= 0
+
+        Parameter level: The level being played
+        Precondition: level is a Level object
+        """
+        return None
+
+
+class RandomPolicy(Policy):
+    """
+    A policy that taps a random arrow key at a fixed interval.
+
+    Hops up are more likely than the others, so the frog makes progress.
+    """
+    # The keys to choose from, with up listed more than once
+    KEYS = ['up', 'up', 'up', 'left', 'right', 'down']
+
+    def __init__(self, interval=20):
+        """
+        Initializes a new random policy
+
+        Parameter interval: The number of frames between key taps
+        Precondition: interval is an int > 0
+        """
+        super().__init__()
+        self._interval = interval
+
+    def choose(self, frame, level):
+        """
+        Returns a random key on every interval-th frame, and None otherwise
+
+        Parameter frame: The frame number in the episode
+        Precondition: frame is an int >= 0
+
+        Parameter level: The level being played
+        Precondition: level is a Level object
+        """
+        if frame % self._interval == 0:
+            return self._rng.choice(self.KEYS)
+        return None
+
+
+class UpPolicy(Policy):
+    """
+    A policy that taps the up key at a fixed interval, after a random delay.
+    """
+
+    def __init__(self, interval=20):
+        """
+        Initializes a new up policy
+
+        Parameter interval: The number of frames between key taps
+        Precondition: interval is an int > 0
+        """
+        super().__init__()
+        self._interval = interval
+        self._offset = 0
+
+    def reset(self, rng):
+        """
+        Starts a new episode, with a random delay before the first hop
+
+        Parameter rng: The random number generator for the episode
+        Precondition: rng is a random.Random object
+        """
+        super().reset(rng)
+        self._offset = rng.randrange(self._interval)
+
+    def choose(self, frame, level):
+        """
+        Returns 'up' on every interval-th frame (after the delay), and None otherwise
+
+        Parameter frame: The frame number in the episode
+        Precondition: frame is an int >= 0
+
+        Parameter level: The level being played
+        Precondition: level is a Level object
+        """
+        if frame % self._interval == self._offset:
+            return 'up'
+        return None
+
+
+class ScriptPolicy(Policy):
+    """
+    A policy that plays back a fixed list of (frame, key) taps.
+    """
+
+    def __init__(self, taps):
+        """
+        Initializes a new script policy
+
+        Parameter taps: The frames and keys to tap
+        Precondition: taps is a list of (int, str) pairs
+        """
+        super().__init__()
+        self._taps = dict(taps)
+
+    def choose(self, frame, level):
+        """
+        Returns the key scripted for this frame, or None
+
+        Parameter frame: The frame number in the episode
+        Precondition: frame is an int >= 0
+
+        Parameter level: The level being played
+        Precondition: level is a Level object
+        """
+        return self._taps.get(frame)
+
+
+# The policies available from the command line
+POLICIES = {'idle':Policy, 'random':RandomPolicy, 'up':UpPolicy}
+
+
+# EPISODES
+def run_episode(level, seed, policy, frames=36000, dt=1/60):
+    """
+    Returns a dictionary with the results of a single episode
+
+    The dictionary has the level, seed, the number of frames and seconds simulated,
+    the number of deaths and exits, whether the game was won, and the simulated time
+    of the first exit (None if there was none).
+
+    Parameter level: The level file in the JSON folder
+    Precondition: level is a string naming a JSON file
+
+    Parameter seed: The seed for the policy
+    Precondition: seed is an int
+
+    Parameter policy: The policy to control the frog
+    Precondition: policy is a Policy object
+
+    Parameter frames: The maximum number of frames to simulate
+    Precondition: frames is an int > 0
+
+    Parameter dt: The time in seconds for each frame
+    Precondition: dt is a number > 0
+    """
+    sim = Simulation(level)
+    policy.reset(random.Random(seed))
+    held = None
+    deaths = 0
+    exits = 0
+    first = None
+    lives = sim.getLevel().getLives()
+
+    while sim.getFrames() < frames and not sim.isOver():
+        if sim.getLevel().pauseGame():
+            if sim.getLevel().getLives() < lives:
+                deaths += 1
+                lives = sim.getLevel().getLives()
+            else:
+                exits += 1
+                first = sim.getTime() if first is None else first
+
+        key = policy.choose(sim.getFrames(), sim.getLevel())
+        if key != held:
+            if not held is None:
+                sim.input.release(held)
+            if not key is None:
+                sim.input.press(key)
+            held = key
+        sim.step(dt)
+
+    won = sim.getLevel().endGame()
+    if won:
+        exits += 1
+        first = sim.getTime() if first is None else first
+    if sim.getLevel().getLives() < lives:
+        deaths += 1
+
+    return {'level':level, 'seed':seed, 'frames':sim.getFrames(), 'time':sim.getTime(),
+            'deaths':deaths, 'exits':exits, 'won':won, 'first_exit':first}
+
+
+def _work(job):
+    """
+    Returns the results of the episode described by job (for the process pool)
+
+    Parameter job: The episode description
+    Precondition: job is a tuple (level, seed, policy, frames, dt)
+    """
+    return run_episode(*job)
+
+
+def run_batch(levels, episodes, policy, processes=None, frames=36000, dt=1/60, seed=0):
+    """
+    Returns a list of the results of every episode, spread over a process pool
+
+    Each level is played episodes times, with seeds seed, seed+1, and so on.  The
+    results are in the same order as the episodes.
+
+    Parameter levels: The level files in the JSON folder
+    Precondition: levels is a list of strings naming JSON files
+
+    Parameter episodes: The number of episodes per level
+    Precondition: episodes is an int > 0
+
+    Parameter policy: The policy to control the frog (copied to each process)
+    Precondition: policy is a Policy object
+
+    Parameter processes: The number of worker processes (None for one per core)
+    Precondition: processes is an int > 0 or None
+
+    Parameter frames: The maximum number of frames in an episode
+    Precondition: frames is an int > 0
+
+    Parameter dt: The time in seconds for each frame
+    Precondition: dt is a number > 0
+
+    Parameter seed: The seed of the first episode
+    Precondition: seed is an int
+    """
+    # Compile the levels once, so that the workers all find them in the cache
+    for level in levels:
+        GameApp.load_compiled(level, Level.compile, OBJECT_DATA)
+
+    jobs = [(level, seed+pos, policy, frames, dt) for level in levels
+            for pos in range(episodes)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        return [_work(job) for job in jobs]
+
+    chunk = max(1, len(jobs)//(processes*8))
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(_work, jobs, chunksize=chunk)
+
+
+def summarize(results):
+    """
+    Prints the average results for each level
+
+    Parameter results: The results of run_batch
+    Precondition: results is a list of dictionaries
+    """
+    print('%-18s %8s %8s %8s %8s %10s %10s' %
+          ('level', 'episodes', 'won', 'deaths', 'exits', 'frames', 'first exit'))
+    for level in sorted(set(result['level'] for result in results)):
+        group = [result for result in results if result['level'] == level]
+        size = len(group)
+        firsts = [result['first_exit'] for result in group if not result['first_exit'] is None]
+        first = '%10.1f' % (sum(firsts)/len(firsts)) if firsts else '%10s' % '-'
+        print('%-18s %8d %7.0f%% %8.2f %8.2f %10.0f %s' %
+              (level, size, 100*sum(result['won'] for result in group)/size,
+               sum(result['deaths'] for result in group)/size,
+               sum(result['exits'] for result in group)/size,
+               sum(result['frames'] for result in group)/size, first))
+
+
+def save(results, path):
+    """
+    Writes the results of every episode to a file (JSON if path ends in .json, else CSV)
+
+    Parameter results: The results of run_batch
+    Precondition: results is a list of dictionaries
+
+    Parameter path: The file to write
+    Precondition: path is a string
+    """
+    import json
+    import csv
+    if path[-5:].lower() == '.json':
+        with open(path,'w') as file:
+            json.dump(results, file, indent=1)
+    else:
+        fields = ['level', 'seed', 'frames', 'time', 'deaths', 'exits', 'won', 'first_exit']
+        with open(path,'w',newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+# Application code
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Simulate many Froggit episodes in parallel.')
+    parser.add_argument('levels', nargs='*', default=[DEFAULT_LEVEL],
+                        help='the level files in the JSON folder')
+    parser.add_argument('--episodes', type=int, default=100,
+                        help='the number of episodes per level')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random',
+                        help='how to choose the keys for the frog')
+    parser.add_argument('--interval', type=int, default=20,
+                        help='the frames between key taps (random and up policies)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='the number of worker processes (default one per core)')
+    parser.add_argument('--frames', type=int, default=36000,
+                        help='the most frames in one episode')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the first episode')
+    parser.add_argument('--out', metavar='FILE', help='save every episode (CSV or JSON)')
+    args = parser.parse_args()
+
+    levels = [name if name[-5:].lower() == '.json' else name+'.json' for name in args.levels]
+    policy = POLICIES[args.policy]() if args.policy == 'idle' else POLICIES[args.policy](args.interval)
+
+    start = time.perf_counter()
+    results = run_batch(levels, args.episodes, policy, args.processes, args.frames, seed=args.seed)
+    elapsed = time.perf_counter()-start
+
+    summarize(results)
+    total = sum(result['frames'] for result in results)
+    print('%d episodes, %d frames in %.2f s (%.1f episodes/s, %.0f frames/s)' %
+          (len(results), total, elapsed, len(results)/elapsed, total/elapsed))
+    if args.out:
+        save(results, args.out)
@@ -0,0 +1,518 @@
+"""
+Benchmark script for game2d and Froggit
+
+This module times the game2d primitives that the game leans on every frame (collisions,
+containment, sprite frames, tile and polygon meshes, labels, sounds) and full Level
+updates on each of the shipped level files.  Each benchmark is timed with timeit: the
+number of calls per run is chosen automatically, the run is repeated several times, and
+the fastest run is kept (the other runs only measure interference from the rest of the
+machine).  Results are in microseconds per call.
+
+Results can be saved as a baseline and compared against later.  Timings only compare
+on the same machine, so the baseline is a local file that is not part of the repository.
+
+Run by typing "python bench.py [--save] [--baseline FILE] [--threshold T] [--only TEXT]
+[--repeat N] [--accuracy N]" into the command line.  If the environment variable GAME2D_HEADLESS is set, the level
+benchmarks use the headless backend, and the Kivy-only benchmarks are skipped.  The
+script exits with status 1 if any benchmark is slower than the baseline by more than
+the threshold (a fraction, 0.1 by default).
+
+With --accuracy N, the script instead checks the two collision tests for rotated
+objects (the default edge test, and the exact separating axis test in game2d.gsat)
+against plain geometry on N random pairs, and prints how often each one is wrong.
+"""
+import os
+import sys
+import json
+import math
+import timeit
+import platform
+
+# The constants read the game's command line (level and frog speed), not this one
+_argv, sys.argv = sys.argv, sys.argv[:1]
+from consts import *
+from game2d import *
+from level import *
+from game2d import gsat
+sys.argv = _argv
+
+
+# The default baseline file
+BASELINE = 'bench_baseline.json'
+
+# The number of timed runs for each benchmark (the fastest one is kept)
+REPEATS = 7
+
+# The minimum time in seconds for a single run (timeit picks the number of calls)
+RUNTIME = 0.05
+
+# The level files for the level benchmarks
+LEVELS = ['easy1.json', 'complete.json', 'bigones.json', 'roadsonly.json',
+          'multihedge.json']
+
+# The number of level updates in a single call of a level benchmark
+STEPS = 100
+
+# The number of obstacles in the one-against-many collision benchmarks
+CROWD = 100
+
+# Whether game2d is the headless backend
+HEADLESS = os.environ.get('GAME2D_HEADLESS','0') not in ('','0')
+
+
+GameApp.set_resources(os.path.dirname(os.path.abspath(__file__)))
+
+
+# BENCHMARK SETUP FUNCTIONS (EACH RETURNS THE FUNCTION TO TIME)
+def bench_collides_aligned():
+    """
+    Returns a benchmark of GObject.collides on two unrotated images
+    """
+    a = GImage(x=100, y=100, width=114, height=64, source='car1.png')
+    b = GImage(x=150, y=120, width=52, height=38, source='frog1.png')
+    return lambda : a.collides(b)
+
+
+def bench_collides_rotated():
+    """
+    Returns a benchmark of GObject.collides on two rotated images
+    """
+    a = GImage(x=100, y=100, width=114, height=64, source='car1.png', angle=30)
+    b = GImage(x=150, y=120, width=52, height=38, source='frog1.png', angle=90)
+    return lambda : a.collides(b)
+
+
+def bench_collides_moving():
+    """
+    Returns a benchmark of GObject.collides on two rotated images, one of them moving
+    """
+    a = GImage(x=100, y=100, width=114, height=64, source='car1.png', angle=30)
+    b = GImage(x=150, y=120, width=52, height=38, source='frog1.png', angle=90)
+    state = [0]
+    def step():
+        state[0] = (state[0]+1) % 64
+        a.x = 100+state[0]
+        return a.collides(b)
+    return step
+
+
+def bench_collides_rotated_sat():
+    """
+    Returns a benchmark of GObject.collides on two rotated images, with the exact test
+    """
+    a = GImage(x=100, y=100, width=114, height=64, source='car1.png', angle=30)
+    b = GImage(x=150, y=120, width=52, height=38, source='frog1.png', angle=90)
+    a.COLLIDER = 'sat'
+    return lambda : a.collides(b)
+
+
+def crowd(seed=0):
+    """
+    Returns a frog body and a list of CROWD rotated bodies scattered around it
+
+    Parameter seed: The seed for the positions and angles
+    Precondition: seed is an int
+    """
+    import random
+    rng = random.Random(seed)
+    frog = GBody(x=400, y=300, width=52, height=38, source='frog1.png', angle=10)
+    others = [GBody(x=rng.uniform(0, 800), y=rng.uniform(0, 600), width=114, height=64,
+                    source='car1.png', angle=rng.uniform(0, 360)) for _ in range(CROWD)]
+    return (frog, others)
+
+
+def bench_collides_many_edges():
+    """
+    Returns a benchmark of one body against CROWD rotated bodies, one at a time
+    """
+    (frog, others) = crowd()
+    return lambda : [frog.collides(body) for body in others]
+
+
+def bench_collides_many_sat():
+    """
+    Returns a benchmark of one body against CROWD rotated bodies, all at once
+    """
+    (frog, others) = crowd()
+    hitboxes = gsat.frames(others)
+    return lambda : gsat.collides_many(frog, hitboxes)
+
+
+def bench_body_collides():
+    """
+    Returns a benchmark of GBody.collides on two unrotated bodies
+    """
+    a = GBody(x=100, y=100, width=114, height=64, source='car1.png')
+    b = GBody(x=150, y=120, width=52, height=38, source='frog1.png')
+    return lambda : a.collides(b)
+
+
+def bench_body_collides_rotated():
+    """
+    Returns a benchmark of GBody.collides on two rotated bodies
+    """
+    a = GBody(x=100, y=100, width=114, height=64, source='car1.png', angle=30)
+    b = GBody(x=150, y=120, width=52, height=38, source='frog1.png', angle=90)
+    return lambda : a.collides(b)
+
+
+def bench_contains():
+    """
+    Returns a benchmark of GObject.contains on an unrotated image
+    """
+    a = GImage(x=100, y=100, width=114, height=64, source='log2.png')
+    point = (120, 110)
+    return lambda : a.contains(point)
+
+
+def bench_contains_rotated():
+    """
+    Returns a benchmark of GObject.contains on a rotated image
+    """
+    a = GImage(x=100, y=100, width=114, height=64, source='log2.png', angle=180)
+    point = (120, 110)
+    return lambda : a.contains(point)
+
+
+def bench_sprite_frame():
+    """
+    Returns a benchmark of switching the frame of a GSprite filmstrip
+    """
+    sprite = GSprite(source='frog2.png', format=(1,5), x=100, y=100)
+    state = [0]
+    def step():
+        state[0] = (state[0]+1) % 5
+        sprite.frame = state[0]
+    return step
+
+
+def bench_sprite_create():
+    """
+    Returns a benchmark of making a GSprite on a sheet with several frames (a respawn)
+    """
+    return lambda : GSprite(source='skulls.png', format=(2,4), x=100, y=100)
+
+
+def bench_label_create():
+    """
+    Returns a benchmark of making the GLabel of the pause message (a pause screen)
+    """
+    return lambda : GLabel(height=GRID_SIZE, x=300, y=200, text="PRESS 'C' TO CONTINUE",
+                           font_name=ALLOY_FONT, font_size=ALLOY_SMALL, linecolor='white')
+
+
+def bench_sound_respawn():
+    """
+    Returns a benchmark of getting the croak sound for a new frog (a respawn)
+    """
+    GameApp.load_sounds(SOUND_VOICES)
+    return lambda : GameApp.load_sound(CROAK_SOUND)
+
+
+def bench_tile_reset():
+    """
+    Returns a benchmark of building the mesh of a lane-sized GTile
+    """
+    tile = GTile(width=1024, height=64, x=512, y=32, source='road.png')
+    return tile._reset
+
+
+def bench_polygon_mesh():
+    """
+    Returns a benchmark of building the mesh of a 64-sided GPolygon
+    """
+    points = []
+    for pos in range(64):
+        angle = 2*math.pi*pos/64
+        points.extend([100*math.cos(angle), 100*math.sin(angle)])
+    polygon = GPolygon(points=points, fillcolor='red')
+    return polygon._make_mesh
+
+
+def bench_level(name):
+    """
+    Returns a function that returns a benchmark of STEPS updates of the given level
+
+    The frog sits still, and is restored whenever it dies (like simulate.py).  The
+    frog never times out, even if FROG_TIMEOUT is True, so that the timings compare
+    with those from before the timer.  If it loses every life anyway, the level is
+    made again.
+
+    Parameter name: The level file in the JSON folder
+    Precondition: name is a string naming a JSON file
+    """
+    def setup():
+        dic, hitdic = GameApp.load_compiled(name, Level.compile, OBJECT_DATA)
+        input = GInput()
+        level = None
+        def restart():
+            nonlocal level
+            level = Level(dic, hitdic)
+            level.setTimeout(False)
+        def step():
+            for _ in range(STEPS):
+                if level.noLives():
+                    restart()
+                elif level.pauseGame():
+                    level.resetFrog()
+                level.update(1/60, input)
+        restart()
+        return step
+    return setup
+
+
+def bench_level_build():
+    """
+    Returns a benchmark of making the largest shipped level (all of its steps at once)
+    """
+    dic, hitdic = GameApp.load_compiled('complete.json', Level.compile, OBJECT_DATA)
+    return lambda : Level(dic, hitdic)
+
+
+def benchmarks():
+    """
+    Returns a list of (name, setup function) for every benchmark in this backend
+    """
+    result = [('collides.aligned', bench_collides_aligned),
+              ('collides.rotated', bench_collides_rotated),
+              ('collides.moving', bench_collides_moving),
+              ('collides.rotated.sat', bench_collides_rotated_sat),
+              ('collides.many.edges', bench_collides_many_edges),
+              ('collides.many.sat', bench_collides_many_sat),
+              ('body.collides.aligned', bench_body_collides),
+              ('body.collides.rotated', bench_body_collides_rotated),
+              ('contains.aligned', bench_contains),
+              ('contains.rotated', bench_contains_rotated),
+              ('sprite.frame', bench_sprite_frame),
+              ('sprite.create', bench_sprite_create)]
+    if not HEADLESS:
+        result.append(('tile.reset', bench_tile_reset))
+        result.append(('polygon.mesh', bench_polygon_mesh))
+        result.append(('label.create', bench_label_create))
+        result.append(('sound.respawn', bench_sound_respawn))
+    for name in LEVELS:
+        label = 'level.%s.x%d' % (name[:-5], STEPS)
+        result.append((label, bench_level(name)))
+    result.append(('level.build', bench_level_build))
+    return result
+
+
+# ACCURACY OF THE ROTATED COLLISION TESTS
+def _crosses(p0, p1, q0, q1):
+    """
+    Returns True if the segment p0p1 meets the segment q0q1
+
+    Parameter p0, p1, q0, q1: The ends of the segments
+    Precondition: each is a pair of numbers
+    """
+    def side(a, b, c):
+        return (b[0]-a[0])*(c[1]-a[1])-(b[1]-a[1])*(c[0]-a[0])
+    d1 = side(q0, q1, p0)
+    d2 = side(q0, q1, p1)
+    d3 = side(p0, p1, q0)
+    d4 = side(p0, p1, q1)
+    return d1*d2 <= 0 and d3*d4 <= 0
+
+
+def _inside(point, poly):
+    """
+    Returns True if point is inside the convex polygon poly (counter-clockwise)
+
+    Parameter point: The point to test
+    Precondition: point is a pair of numbers
+
+    Parameter poly: The corners of the polygon
+    Precondition: poly is a list of pairs of numbers, in counter-clockwise order
+    """
+    for pos in range(len(poly)):
+        a = poly[pos]
+        b = poly[(pos+1) % len(poly)]
+        if (b[0]-a[0])*(point[1]-a[1])-(b[1]-a[1])*(point[0]-a[0]) < 0:
+            return False
+    return True
+
+
+def overlap(body1, body2):
+    """
+    Returns True if the hitboxes of the two bodies overlap, by plain geometry
+
+    Two convex polygons overlap exactly when two of their edges cross, or when one
+    of them has a corner inside the other.  This is slow, but it does not share any
+    code with the collision tests, so it is the reference for accuracy.
+
+    Parameter body1, body2: The bodies to test
+    Precondition: each is a GBody
+    """
+    p = gsat.box(body1)
+    q = gsat.box(body2)
+    for i in range(4):
+        for j in range(4):
+            if _crosses(p[i], p[(i+1) % 4], q[j], q[(j+1) % 4]):
+                return True
+    return _inside(p[0], q) or _inside(q[0], p)
+
+
+def accuracy(samples=20000, seed=0):
+    """
+    Prints how often each rotated collision test disagrees with plain geometry
+
+    The bodies are the frog and a car (in either order), at random angles and at random
+    offsets close enough to touch.  A miss is a collision the test did not find, and a false alarm is
+    a collision the test found where there was none.
+
+    Parameter samples: The number of random pairs
+    Precondition: samples is an int > 0
+
+    Parameter seed: The seed for the pairs
+    Precondition: seed is an int
+    """
+    import random
+    rng = random.Random(seed)
+    counts = {'edges':[0, 0], 'sat':[0, 0]}
+    hits = 0
+    for _ in range(samples):
+        a = GBody(x=0, y=0, width=114, height=64, source='car1.png',
+                  angle=rng.uniform(0, 360), hitbox=(rng.uniform(0, 20), 0, 0, 0))
+        b = GBody(x=rng.uniform(-90, 90), y=rng.uniform(-90, 90), width=52, height=38,
+                  source='frog1.png', angle=rng.uniform(0, 360))
+        if rng.random() < 0.5:
+            (a, b) = (b, a)
+        truth = overlap(a, b)
+        hits += truth
+        found = {'edges':a.collides(b), 'sat':gsat.collides(a, b)}
+        for name in counts:
+            if found[name] != truth:
+                counts[name][0 if truth else 1] += 1
+
+    print('%d random pairs, %d of them overlapping' % (samples, hits))
+    print('%-10s %10s %12s' % ('test', 'misses', 'false alarms'))
+    for name in counts:
+        print('%-10s %10d %12d' % (name, counts[name][0], counts[name][1]))
+
+
+# TIMING AND REPORTING
+def measure(function, repeats=REPEATS):
+    """
+    Returns the time in microseconds of one call to function (the fastest of repeats)
+
+    Parameter function: The function to time
+    Precondition: function is callable with no arguments
+
+    Parameter repeats: The number of timed runs
+    Precondition: repeats is an int > 0
+    """
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    number = max(1, int(math.ceil(number*RUNTIME/max(elapsed,1e-9))))
+    times = timer.repeat(repeat=repeats, number=number)
+    return min(times)/number*1e6
+
+
+def run(only=None, repeats=REPEATS):
+    """
+    Returns a dictionary of benchmark name to microseconds per call
+
+    Parameter only: Text that benchmark names must contain (None for all)
+    Precondition: only is a string or None
+
+    Parameter repeats: The number of timed runs of each benchmark
+    Precondition: repeats is an int > 0
+    """
+    results = {}
+    for (name, setup) in benchmarks():
+        if only is None or only in name:
+            results[name] = measure(setup(), repeats)
+            print('%-28s %12.3f us' % (name, results[name]), flush=True)
+    return results
+
+
+def machine():
+    """
+    Returns a dictionary describing this machine and backend
+    """
+    return {'python':platform.python_version(), 'machine':platform.machine(),
+            'processor':platform.processor(), 'system':platform.system(),
+            'headless':HEADLESS}
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change of each result against the baseline, returning the regressions
+
+    A regression is a benchmark whose time grew by more than threshold (as a fraction
+    of the baseline time).
+
+    Parameter results: The new results
+    Precondition: results is a dictionary of benchmark name to microseconds
+
+    Parameter baseline: The baseline results
+    Precondition: baseline is a dictionary of benchmark name to microseconds
+
+    Parameter threshold: The allowed slow down
+    Precondition: threshold is a number >= 0
+    """
+    regressions = []
+    print()
+    print('%-28s %12s %12s %8s' % ('benchmark', 'baseline', 'now', 'change'))
+    for name in results:
+        if not name in baseline:
+            print('%-28s %12s %12.3f %8s' % (name, '-', results[name], 'new'))
+            continue
+        change = results[name]/baseline[name]-1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print('%-28s %12.3f %12.3f %+7.1f%%%s' % (name, baseline[name], results[name],
+                                                 change*100, flag))
+    return regressions
+
+
+# Application code
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark game2d and Froggit levels.')
+    parser.add_argument('--save', action='store_true',
+                        help='save the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='the baseline file (default %s)' % BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='the slow down that counts as a regression (default 0.1)')
+    parser.add_argument('--only', default=None,
+                        help='only run benchmarks whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=REPEATS,
+                        help='the number of timed runs of each benchmark (default %d)' % REPEATS)
+    parser.add_argument('--accuracy', type=int, metavar='N', default=0,
+                        help='only check the rotated collision tests on N random pairs')
+    args = parser.parse_args()
+
+    if args.accuracy:
+        accuracy(args.accuracy)
+        sys.exit(0)
+
+    results = run(args.only, args.repeat)
+
+    stored = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            stored = json.load(file)
+        if stored.get('machine') != machine():
+            print('\nWarning: the baseline was recorded on a different machine or backend')
+
+    status = 0
+    if not stored is None:
+        regressions = compare(results, stored['results'], args.threshold)
+        if regressions:
+            print('\n%d regression(s) beyond %.0f%%' % (len(regressions), args.threshold*100))
+            status = 1
+
+    if args.save:
+        if not stored is None and stored.get('machine') == machine():
+            stored['results'].update(results)
+            results = stored['results']
+        with open(args.baseline,'w') as file:
+            json.dump({'machine':machine(), 'results':results}, file, indent=2, sort_keys=True)
+        print('\nSaved baseline to %s' % args.baseline)
+
+    sys.exit(status)
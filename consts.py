@@ -9,7 +9,6 @@ access them.
 Kendra Obika kao78
 December 20 2020
 """
-import introcs
 import sys
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
@@ -34,6 +33,10 @@ FROG_SAFE   = 'safe.png'
 FROG_HEAD   = 'froghead.png'
 # The number of lives the frog has before losing
 FROG_LIVES  = 3
+# The number of seconds the frog has to reach an exit (in each life)
+FROG_TIME   = 60
+# Whether the frog dies when that time runs out (otherwise the timer is only shown)
+FROG_TIMEOUT = False
 
 # The angles for the frog heading. Set the angle to these to get the right direction
 # Notice the frog image is upside down, so NORTH requires a 180 degree rotation
@@ -76,6 +79,59 @@ ALLOY_LARGE  = 124
 ALLOY_MEDIUM = 64
 # A small message or label
 ALLOY_SMALL  = 48
+# The readouts (score, timer and frame rate) on the life bar
+ALLOY_TINY   = 24
+
+
+### SCORE CONSTANTS ###
+
+# The points for each row the frog reaches that it has not reached in this life
+SCORE_STEP = 10
+# The points for reaching an exit
+SCORE_EXIT = 50
+# The points for each whole second left on the timer when the frog reaches an exit
+SCORE_TIME = 10
+# Whether to show the frame rate on the life bar
+SHOW_FPS   = True
+
+
+### COLLISIONS ###
+# Whether collisions follow the frog and the obstacles through each update (so that a
+# long update cannot carry a car through the frog), instead of only testing where
+# they are at the end of it
+SWEPT_COLLISIONS = True
+
+# Whether the obstacles of each lane are placed from the time since the level started
+# (which never drifts), instead of being moved a little at every update
+TIMED_LANES = True
+
+### IMAGE ATLAS ###
+
+# The atlas of every image, built in the Images folder on first run
+IMAGE_ATLAS = 'froggit.atlas'
+
+
+### LEVEL LOADING ###
+
+# The seconds of each frame spent making the level while it loads (the rest of the
+# frame is left for drawing the loading screen, so no frames are dropped)
+LOAD_BUDGET = 0.004
+
+
+### PROFILING ###
+
+# Whether to record frame times (shown on screen, and saved to PROFILE_FILE on exit)
+PROFILE = False
+# The file for the frame times (CSV, or JSON if the name ends in .json)
+PROFILE_FILE = 'profile.csv'
+
+
+### RECORDING ###
+
+# Whether to record the keyboard (saved to RECORD_FILE on exit, for simulate.py --replay)
+RECORD = False
+# The file for the recording
+RECORD_FILE = 'replay.g2dr'
 
 
 ### SOUND EFFECTS ###
@@ -87,6 +143,10 @@ SPLAT_SOUND = 'splat.wav'
 # The succes sound
 TRILL_SOUND = 'trill.wav'
 
+# The number of voices for each sound (the most plays of it that can overlap).  A croak
+# lasts about two hops, so a frog hopping steadily needs three voices.
+SOUND_VOICES = {CROAK_SOUND: 3, SPLAT_SOUND: 2, TRILL_SOUND: 2}
+
 
 ### JSON FILES ###
 
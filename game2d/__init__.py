@@ -4,14 +4,43 @@ A module to support simple 2D game development.
 This module is a simple wrapper around Kivy interfaces to make 2D game development
 simpler for students in CS 1110.
 
+If the environment variable ``GAME2D_HEADLESS`` is set (to anything other than 0)
+when this package is first imported, the Kivy classes are replaced by the
+geometry-only versions in :mod:`game2d.headless`.  These support simulation and
+collisions, but never open a window, load a texture or play a sound.  The headless
+backend has no :class:`GScene`, :class:`GEllipse` or paths; importing one of them raises
+an ImportError.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
-from .gtile import GTile
-from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+import os as _os
+
+from .gprofile import GProfiler
+from .gkeys import GKeyInput
+from .greplay import GRecorder, GReplayInput
+from .gload import GLoader
+
+if _os.environ.get('GAME2D_HEADLESS','0') not in ('','0'):
+    from .headless import GObject, GRectangle, GImage, GLabel, GText, GSprite, GTile, GBatch
+    from .gbody import GBody
+    from .headless import GInput, GView, Sound, SoundPool, SoundLibrary, GameApp
+
+    # Scenes, ellipses and paths only exist in the Kivy backend
+    _KIVY_ONLY = ('GScene','GEllipse','GPath','GTriangle','GPolygon')
+
+    def __getattr__(name):
+        if name in _KIVY_ONLY:
+            raise ImportError('game2d.%s is not available in the headless backend (unset GAME2D_HEADLESS to use it)' % name)
+        raise AttributeError('module %s has no attribute %s' % (repr(__name__),repr(name)))
+else:
+    from .gobject import GObject, GScene
+    from .grectangle import GRectangle, GEllipse, GImage, GLabel
+    from .gsprite import GSprite
+    from .gtile import GTile
+    from .gtext import GText
+    from .gbatch import GBatch, GBody
+    from .gpath import GPath, GTriangle, GPolygon
+    from .gview import GInput, GView
+    from .sound import Sound, SoundPool, SoundLibrary
+    from .app import GameApp
@@ -48,6 +48,21 @@ class GameApp(kivy.app.App):
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
     
+    # Class attribute for sharing the frames of sprite sheets, keyed by (source, format)
+    REGION_CACHE = {}
+    
+    # Class attribute for sharing preloaded sounds (each a SoundPool), keyed by file
+    SOUND_CACHE = {}
+    
+    # Class attribute for sharing rendered text, keyed by (text, font, size, bold, align)
+    LABEL_CACHE = {}
+    
+    # The most textures kept in the label cache (the least recently used go first)
+    LABEL_LIMIT = 256
+    
+    # Class attribute for sharing glyph atlases, keyed by (font, size, characters)
+    GLYPH_CACHE = {}
+    
     
     # MUTABLE ATTRIBUTES
     @property
@@ -104,7 +119,141 @@ class GameApp(kivy.app.App):
         Window.size = (round(self._gwidth), round(self._gheight))
     
     
+    @property
+    def timestep(self):
+        """
+        The fixed simulation time step in seconds, or None for a variable time step
+        
+        By default (None), :meth:`update` is called once per animation frame with the 
+        time since the last frame.  If this value is a number, the time of each frame is
+        instead added to an accumulator, and :meth:`update` is called once for every 
+        whole ``timestep`` in the accumulator, always with ``dt`` equal to ``timestep``.
+        The game then behaves the same no matter how fast or slow the frames are, which 
+        makes it reproducible.  The time left in the accumulator is available as 
+        :attr:`alpha`, to interpolate positions when drawing.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._timestep
+    
+    @timestep.setter
+    def timestep(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._timestep = value
+        self._accum = 0.0
+        self._alpha = 1.0
+    
+    @property
+    def maxsteps(self):
+        """
+        The most calls to :meth:`update` in a single animation frame
+        
+        This only applies if :attr:`timestep` is not None.  If the game falls so far 
+        behind that it needs more steps than this, the extra time is discarded (so the
+        game slows down rather than freezing).  By default this value is 5.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @maxsteps.setter
+    def maxsteps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
+    @property
+    def retained(self):
+        """
+        Whether the view keeps its graphics instructions between frames
+
+        If this value is True, the view only updates the parts of the window that have
+        been added, removed or reordered since the last frame.  See :class:`GView` for
+        more information.  By default this value is False.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._retained = value
+        if not self._view is None:
+            self._view.retained = value
+
     # IMMUTABLE PROPERTIES
+    @property
+    def profiler(self):
+        """
+        The frame-time profiler.
+        
+        The profiler is enabled by the ``profile`` keyword of the constructor.  When 
+        enabled, it records the time of each phase of the animation frame: ``'clear'``,
+        ``'update'``, ``'input'``, ``'draw'`` and ``'commit'``.  Game code can add 
+        phases of its own with ``profiler.phase``.  If ``profiler.overlay`` is True, 
+        a summary is drawn in the top left corner of the window.  See the class 
+        :class:`GProfiler` for more information.
+        
+        **Invariant**: Must be instance of :class:`GProfiler`.
+        """
+        return self._profiler
+    
+    @property
+    def alpha(self):
+        """
+        The fraction of a time step between the last update and the current frame.
+        
+        When :attr:`timestep` is not None, the game state is usually a little behind 
+        the actual time.  Drawing an object at ``previous + alpha*(current-previous)``
+        smooths out its motion.  When :attr:`timestep` is None, this value is always 1.
+        
+        **Invariant**: Must be a float in 0..1.
+        """
+        return self._alpha
+    
+    @property
+    def frame(self):
+        """
+        The number of the current animation frame (counting from 1).
+        
+        Every call to :meth:`update` in the same animation frame sees the same value.
+        When :attr:`timestep` is not None, there can be several such calls, so work that
+        has a time budget per frame (such as a :class:`GLoader`) can use this value to
+        share the budget among them.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frame
+    
+    @property
+    def framerate(self):
+        """
+        The measured number of frames drawn per second.
+        
+        Unlike :attr:`fps` (the frame rate the game asks for), this is the rate that is
+        actually achieved, averaged over the last few frames by the Kivy clock.
+        
+        **Invariant**: Must be a float >= 0.
+        """
+        return float(Clock.get_fps())
+    
+    @property
+    def recorder(self):
+        """
+        The recorder of the keyboard, or None if the game is not being recorded.
+        
+        The game is recorded if the constructor has the keyword ``record`` (the file to 
+        save the recording to when the game closes).  Every update is captured, so the 
+        recording can be replayed with :class:`GReplayInput`.  Game code may set the 
+        ``tag`` of the recorder to note what was played (e.g. the level file).  See the 
+        class :class:`GRecorder` for more information.
+        
+        **Invariant**: Must be instance of :class:`GRecorder` or None.
+        """
+        return self._recorder
+    
     @property
     def view(self):
         """
@@ -235,6 +384,96 @@ class GameApp(kivy.app.App):
         
         return texture
     
+    @classmethod
+    def load_regions(cls,name,format):
+        """
+        Returns: The frames of the given sprite sheet, or None if it cannot be loaded
+        
+        The ``name`` must refer to the file in the **Images** folder.  The sheet is 
+        divided into a grid of ``format`` (rows, columns) frames, listed left-to-right, 
+        top-to-bottom.  The result is a tuple of texture regions, one per frame.  It is 
+        cached under the name and format, so every :class:`GSprite` on the same sheet 
+        shares one tuple, and a new sprite does not slice the sheet again.  The cache 
+        follows the texture cache: if the texture for ``name`` changes (for example, 
+        when an atlas is loaded), the sheet is sliced again.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param format: The grid size (rows, columns) of the frames
+        :type format:  2-element tuple of ints > 0
+        """
+        texture = cls.load_texture(name)
+        if texture is None:
+            return None
+        
+        key = (name,tuple(format))
+        if key in cls.REGION_CACHE and cls.REGION_CACHE[key][0] is texture:
+            return cls.REGION_CACHE[key][1]
+        
+        width  = texture.width/format[1]
+        height = texture.height/format[0]
+        regions = []
+        ty = 0
+        for row in range(format[0]):
+            tx = 0
+            for col in range(format[1]):
+                regions.append(texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height)))
+                tx += width
+            ty += width
+        
+        regions = tuple(regions)
+        cls.REGION_CACHE[key] = (texture,regions)
+        return regions
+    
+    @classmethod
+    def load_atlas(cls,name,build=True):
+        """
+        Returns: The list of image names in the given atlas, or None if it cannot be loaded
+        
+        The ``name`` must refer to an atlas file (extension ``.atlas``) in the **Images** 
+        folder.  Each region of the atlas is put in the texture cache under the name of 
+        its original image.  After this, :meth:`load_texture` returns the atlas region 
+        instead of a separate texture, so :class:`GImage`, :class:`GSprite` and 
+        :class:`GTile` all draw from the atlas without any other changes.
+        
+        If ``build`` is True, the atlas is built (or rebuilt) from the PNG files in the 
+        **Images** folder whenever it is missing or out of date.  If it cannot be built, 
+        the images are loaded separately as before.
+        
+        :param name: The atlas file name
+        :type name:  ``str``
+        
+        :param build: Whether to build the atlas if it is missing or out of date
+        :type build:  ``bool``
+        """
+        from .gatlas import atlas_stale, build_atlas
+        if type(name) != str or name[-6:].lower() != '.atlas':
+            Logger.info('GameApp: %s is not an atlas file.' % repr(name))
+            return None
+        
+        path = os.path.join(cls.images,name)
+        if build and atlas_stale(path,cls.images):
+            build_atlas(path,cls.images)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            from kivy.atlas import Atlas
+            atlas = Atlas(path)
+        except:
+            Logger.info('GameApp: Atlas %s is not properly formatted.' % repr(name))
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            items = traceback.format_exception(exc_type, exc_value, exc_tb)
+            Logger.info(items[-1].strip())
+            return None
+        
+        result = []
+        for (key, texture) in atlas.textures.items():
+            cls.TEXTURE_CACHE[key+'.png'] = texture
+            result.append(key+'.png')
+        return result
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -248,6 +487,9 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert type(name) == str, '%s is not a valid texture name' % repr(name)
+        for key in [key for key in cls.REGION_CACHE if key[0] == name]:
+            del cls.REGION_CACHE[key]
+        
         if name in cls.TEXTURE_CACHE:
             texture = cls.TEXTURE_CACHE[name]
             del cls.TEXTURE_CACHE[name]
@@ -255,6 +497,157 @@ class GameApp(kivy.app.App):
         
         return None
     
+    @classmethod
+    def load_label(cls,text,font_name='Roboto',font_size=15,bold=False,halign='center'):
+        """
+        Returns: The texture of the given text, or None if the text is empty
+        
+        The text is rendered in white, so that one texture may be drawn in any color.
+        Textures are cached, so labels with the same text and font share a texture and
+        the text is only rendered once.  The cache holds at most ``LABEL_LIMIT`` 
+        textures; when it is full, the texture used least recently is dropped.
+        
+        :param text: The text to render (lines are separated by ``'\\n'``)
+        :type text:  ``str``
+        
+        :param font_name: The font file name (or the name of a Kivy font)
+        :type font_name:  ``str``
+        
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float``
+        
+        :param bold: Whether the text is bold
+        :type bold:  ``bool``
+        
+        :param halign: The alignment of the lines ('left', 'right' or 'center')
+        :type halign:  ``str``
+        """
+        key = (text,font_name,font_size,bold,halign)
+        if key in cls.LABEL_CACHE:
+            texture = cls.LABEL_CACHE.pop(key)
+            cls.LABEL_CACHE[key] = texture
+            return texture
+        
+        if text == '':
+            texture = None
+        else:
+            from kivy.core.text import Label
+            label = Label(text=text,font_name=font_name,font_size=font_size,bold=bold,
+                          halign=halign)
+            label.refresh()
+            texture = label.texture
+        
+        if len(cls.LABEL_CACHE) >= cls.LABEL_LIMIT:
+            del cls.LABEL_CACHE[next(iter(cls.LABEL_CACHE))]
+        cls.LABEL_CACHE[key] = texture
+        return texture
+    
+    @classmethod
+    def load_glyphs(cls,font_name='Roboto',font_size=15,chars=None):
+        """
+        Returns: The glyph atlas for the given font, size and characters
+        
+        Every character is rendered once into a single texture (see :class:`GText`).
+        If the atlas has already been built, it will return the cached atlas.  By 
+        default, the atlas has the printable ASCII characters.
+        
+        :param font_name: The font file name (or the name of a Kivy font)
+        :type font_name:  ``str``
+        
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float``
+        
+        :param chars: The characters to render (None for printable ASCII)
+        :type chars:  ``str`` or None
+        """
+        from .gtext import GlyphAtlas, GLYPHS
+        chars = GLYPHS if chars is None else chars
+        key = (font_name,font_size,chars)
+        if not key in cls.GLYPH_CACHE:
+            cls.GLYPH_CACHE[key] = GlyphAtlas(font_name,font_size,chars)
+        return cls.GLYPH_CACHE[key]
+    
+    @classmethod
+    def load_sound(cls,name,voices=1):
+        """
+        Returns: The sound pool for the given file name, or None if it cannot be loaded
+        
+        The ``name`` must refer to the file in the **Sounds** folder.  If the sound has
+        already been loaded, it will return the cached :class:`SoundPool` (whatever its
+        number of voices).  Otherwise, it will load the sound into a pool with the given 
+        number of voices and cache it before returning it.  So once a sound is loaded,
+        playing it never touches the disk.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param voices: The number of voices, if the sound is not loaded yet
+        :type voices:  ``int`` > 0
+        """
+        if name in cls.SOUND_CACHE:
+            return cls.SOUND_CACHE[name]
+        elif not cls.is_sound(name):
+            Logger.info('GameApp: No sound file named %s.' % repr(name))
+            return None
+        
+        try:
+            from .sound import SoundPool
+            sound = SoundPool(name,voices)
+            cls.SOUND_CACHE[name] = sound
+        except:
+            Logger.info('GameApp: Sound %s is not properly formatted.' % repr(name))
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            items = traceback.format_exception(exc_type, exc_value, exc_tb)
+            Logger.info(items[-1].strip())
+            sound = None
+        return sound
+    
+    @classmethod
+    def load_sounds(cls,voices=None):
+        """
+        Returns: The list of sound names loaded from the **Sounds** folder
+        
+        This loads every WAV and MP3 file in the **Sounds** folder with :meth:`load_sound`, 
+        so that it is best called once when the game starts.  The optional dictionary 
+        ``voices`` maps file names to their number of voices; any other sound gets one 
+        voice.
+        
+        :param voices: The number of voices for each file name
+        :type voices:  ``dict`` or None
+        """
+        assert voices is None or type(voices) == dict, '%s is not a dictionary' % repr(voices)
+        voices = {} if voices is None else voices
+        if not os.path.isdir(cls.sounds):
+            return []
+        
+        result = []
+        for name in sorted(os.listdir(cls.sounds)):
+            if name[-4:].lower() in ('.wav','.mp3'):
+                if not cls.load_sound(name,voices.get(name,1)) is None:
+                    result.append(name)
+        return result
+    
+    @classmethod
+    def unload_sound(cls,name):
+        """
+        Returns: The sound pool for the given file name, or None if it does not exist
+        
+        The ``name`` should refer to the file in the sound cache.  If the sound is in 
+        the cache, it will stop it and return it after removing it.  Otherwise, it will 
+        return None.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        assert type(name) == str, '%s is not a valid sound name' % repr(name)
+        if name in cls.SOUND_CACHE:
+            sound = cls.SOUND_CACHE[name]
+            del cls.SOUND_CACHE[name]
+            sound.stop()
+            return sound
+        
+        return None
+    
     @classmethod
     def load_json(cls,name):
         """
@@ -285,6 +678,34 @@ class GameApp(kivy.app.App):
                 data = None
         return data
     
+    @classmethod
+    def load_compiled(cls,name,compiler,*extras):
+        """
+        Returns: The compiled form of the given JSON files, or None if they cannot be loaded
+        
+        The ``name`` (and each of the ``extras``) must refer to a file in the **JSON**
+        folder.  The files are parsed and passed, in order, to the function ``compiler``.
+        Its result is returned, and is also cached in the folder **JSON/__cache__**.  As 
+        long as the files do not change, later calls unpickle the cached result instead 
+        of parsing and compiling the files again.  See :mod:`game2d.gcache`.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param compiler: The function to compile the parsed files
+        :type compiler:  callable, taking one argument per file
+        
+        :param extras: Additional file names
+        :type extras:  ``str``
+        """
+        from .gcache import load_compiled
+        names = (name,)+extras
+        for item in names:
+            if not cls.is_json(item):
+                Logger.info('GameApp: No json file named %s.' % repr(item))
+                return None
+        return load_compiled(cls.json,list(names),compiler)
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -309,6 +730,12 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        r = keywords.pop('retained', False)
+        t = keywords.pop('timestep', None)
+        m = keywords.pop('maxsteps', 5)
+        p = keywords.pop('profile', False)
+        o = keywords.pop('overlay', False)
+        c = keywords.pop('record', None)
         
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
@@ -321,6 +748,26 @@ class GameApp(kivy.app.App):
         
         self._fps = f
         
+        assert type(r) == bool, 'retained %s is not a bool' % repr(r)
+        self._retained = r
+        
+        self.timestep = t
+        self.maxsteps = m
+        
+        # The profile is either a bool or the file to dump it to on exit
+        assert type(p) in [bool,str], 'profile %s is not a bool or file name' % repr(p)
+        assert type(o) == bool, 'overlay %s is not a bool' % repr(o)
+        from .gprofile import GProfiler
+        self._profiler = GProfiler(enabled=bool(p),overlay=o)
+        self._profile_file = p if type(p) == str else None
+        self._overlay = None
+        self._view = None
+        self._frame = 0
+        
+        assert c is None or type(c) == str, 'record %s is not a file name' % repr(c)
+        self._record_file = c
+        self._recorder = None
+        
         x = keywords.pop('left', None)
         y = keywords.pop('top', None)
         assert x is None or type(x) in [int,float], 'left edge %s is not a number' % repr(x)
@@ -358,8 +805,12 @@ class GameApp(kivy.app.App):
         from .gview import GInput, GView
         self._view = GView()
         self._view.size_hint = (1,1)
+        self._view.retained = self._retained
         self._input = GInput()
         self._input._register(self._view)
+        if self._record_file:
+            from .greplay import GRecorder
+            self._recorder = GRecorder(self._input,self._timestep)
         return self.view
     
     def run(self):
@@ -380,6 +831,10 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         import sys
+        if self._profile_file and self._profiler.count > 0:
+            self._profiler.dump(self._profile_file)
+        if self._recorder and self._recorder.frames > 0:
+            self._recorder.save(self._record_file)
         kivy.app.App.stop(self)
         sys.exit(0)
     
@@ -443,13 +898,69 @@ class GameApp(kivy.app.App):
         This method a callback-proxy for the methods `update` and `draw`.  It handles
         important issues behind the scenes, particularly with clearing the window.
         
+        If :attr:`timestep` is set, this calls :meth:`update` zero or more times with
+        the fixed time step (see :attr:`timestep`), and then draws once.
+        
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
-        self.view.clear()
-        self.update(dt)
-        self.draw()
-        self.input.refresh()
+        self._frame += 1
+        profiler = self._profiler
+        profiler.begin()
+        with profiler.phase('clear'):
+            self.view.clear()
+        recorder = self._recorder
+        if self._timestep is None:
+            if recorder:
+                recorder.capture(dt)
+            with profiler.phase('update'):
+                self.update(dt)
+            with profiler.phase('input'):
+                self.input.refresh()
+        else:
+            self._accum += dt
+            steps = 0
+            while self._accum >= self._timestep and steps < self._maxsteps:
+                if recorder:
+                    recorder.capture(self._timestep)
+                with profiler.phase('update'):
+                    self.update(self._timestep)
+                with profiler.phase('input'):
+                    self.input.refresh()
+                self._accum -= self._timestep
+                steps += 1
+            if self._accum >= self._timestep:
+                self._accum %= self._timestep
+            self._alpha = self._accum/self._timestep
+        with profiler.phase('draw'):
+            self.draw()
+        if profiler.enabled and profiler.overlay:
+            self._draw_overlay()
+        with profiler.phase('commit'):
+            self.view._commit()
+        profiler.end()
+    
+    def _draw_overlay(self):
+        """
+        Draws the profiler summary in the top left corner of the window.
+        
+        The summary is a :class:`GText`, so updating it does not render a label (or
+        push a texture out of the label cache).  The text is only updated every 30
+        frames, so that it can be read.  The object is only made again when the summary
+        gains a line, as the size of a :class:`GText` is fixed.
+        """
+        from .gtext import GText
+        if self._overlay is None or self._profiler.count % 30 == 0:
+            text = self._profiler.report()
+            if self._overlay is None or self._overlay.text.count('\n') != text.count('\n'):
+                self._overlay = GText(text=text,font_name='RobotoMono-Regular',font_size=12,
+                                      halign='left',valign='top',linecolor=(1,1,1,1),
+                                      fillcolor=(0,0,0,0.6))
+            else:
+                self._overlay.text = text
+            self._overlay.left = 0
+            self._overlay.top = self.height
+        self._overlay.draw(self.view)
     
     def _setpaths(self):
         """
@@ -462,7 +973,20 @@ class GameApp(kivy.app.App):
         
         path = os.path.abspath(inspect.getfile(self.__class__))
         path = os.path.dirname(path)
+        GameApp.set_resources(path)
+    
+    @classmethod
+    def set_resources(cls,path):
+        """
+        Sets the resource folders (**JSON**, **Fonts**, **Sounds**, **Images**) to those
+        in the given directory.
         
+        This is done for you when a game is created.  It is only needed by scripts that
+        use game2d without creating a game (e.g. to time or test game objects).
+        
+        :param path: The application directory
+        :type path:  ``str``
+        """
         GameApp.json   = str(os.path.join(path, 'JSON'))
         GameApp.fonts  = str(os.path.join(path, 'Fonts'))
         GameApp.sounds = str(os.path.join(path, 'Sounds'))
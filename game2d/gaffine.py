@@ -0,0 +1,56 @@
+"""
+A module of 2D affine transforms as plain tuples.
+
+An affine tuple ``(a,b,c,d,tx,ty)`` maps the point (x,y) to ``(a*x+c*y+tx, b*x+d*y+ty)``.
+Tuples are much cheaper to build and combine than :class:`Matrix` objects, so these
+functions are used for collisions, where transforms are built and thrown away often.
+
+This module does not depend on Kivy, so it is shared by every game2d backend.
+"""
+import math
+
+
+# The affine tuple that changes nothing
+IDENTITY = (1.0,0.0,0.0,1.0,0.0,0.0)
+
+
+def affine(x,y,angle=0.0,sx=1.0,sy=1.0):
+    """
+    :return: The affine tuple that scales, then rotates (in degrees), then translates
+    :rtype:  ``tuple``
+    """
+    rad = math.radians(angle)
+    cos = math.cos(rad)
+    sin = math.sin(rad)
+    return (sx*cos,sx*sin,-sy*sin,sy*cos,x,y)
+
+
+def apply(m,x,y):
+    """
+    :return: The point (x,y) transformed by the affine tuple m
+    :rtype:  ``tuple``
+    """
+    return (m[0]*x+m[2]*y+m[4],m[1]*x+m[3]*y+m[5])
+
+
+def compose(m,n):
+    """
+    :return: The affine tuple applying m first and then n
+    :rtype:  ``tuple``
+    """
+    return (n[0]*m[0]+n[2]*m[1], n[1]*m[0]+n[3]*m[1],
+            n[0]*m[2]+n[2]*m[3], n[1]*m[2]+n[3]*m[3],
+            n[0]*m[4]+n[2]*m[5]+n[4], n[1]*m[4]+n[3]*m[5]+n[5])
+
+
+def invert(m):
+    """
+    :return: The inverse of the affine tuple m
+    :rtype:  ``tuple``
+    """
+    det = m[0]*m[3]-m[1]*m[2]
+    a =  m[3]/det
+    b = -m[1]/det
+    c = -m[2]/det
+    d =  m[0]/det
+    return (a,b,c,d,-(a*m[4]+c*m[5]),-(b*m[4]+d*m[5]))
@@ -0,0 +1,147 @@
+"""
+A module to support texture atlases.
+
+An atlas packs many small images into one or a few large images (pages).  Each of the
+original images becomes a region of a page.  Drawing from a single page lets the graphics
+card skip texture switches, and lets a :class:`GBatch` draw different images in one mesh.
+
+Atlases use the Kivy atlas format: a JSON file with extension ``.atlas``, together with
+the pages ``<name>-0.png``, ``<name>-1.png`` and so on.  Building an atlas requires the
+Python Imaging Library (Pillow).  Loading one does not.
+"""
+from kivy.logger import Logger
+import os.path
+import json
+
+
+# The largest atlas page to build
+ATLAS_SIZE = 2048
+
+# The padding (in pixels) around each region, to prevent filtering artifacts
+ATLAS_PADDING = 2
+
+
+def atlas_pages(path):
+    """
+    Returns the page files of the given atlas, or an empty list if it does not exist
+
+    :param path: The path to the atlas file
+    :type path:  ``str``
+    """
+    if not os.path.exists(path):
+        return []
+
+    try:
+        with open(path) as file:
+            return list(json.load(file).keys())
+    except:
+        return []
+
+
+def atlas_sources(path, folder):
+    """
+    Returns the image files in ``folder`` that belong in the given atlas
+
+    These are all of the PNG files in the folder, except for the pages of the atlas
+    itself and any image too large to fit on a page.
+
+    :param path: The path to the atlas file
+    :type path:  ``str``
+
+    :param folder: The folder of source images
+    :type folder:  ``str``
+    """
+    pages = set(atlas_pages(path))
+    prefix = os.path.splitext(os.path.split(path)[1])[0]+'-'
+
+    result = []
+    for name in sorted(os.listdir(folder)):
+        if name[-4:].lower() != '.png' or name in pages or name.startswith(prefix):
+            continue
+        size = _png_size(os.path.join(folder,name))
+        if size and max(size) <= ATLAS_SIZE-2*ATLAS_PADDING:
+            result.append(name)
+    return result
+
+
+def atlas_stale(path, folder):
+    """
+    Returns True if the given atlas is missing or out of date
+
+    An atlas is out of date if a source image is newer than the atlas, or if the
+    source images are not exactly the regions of the atlas.
+
+    :param path: The path to the atlas file
+    :type path:  ``str``
+
+    :param folder: The folder of source images
+    :type folder:  ``str``
+    """
+    pages = atlas_pages(path)
+    if not pages:
+        return True
+
+    sources = atlas_sources(path, folder)
+    stamp = os.path.getmtime(path)
+    if any(os.path.getmtime(os.path.join(folder,name)) > stamp for name in sources):
+        return True
+
+    try:
+        with open(path) as file:
+            data = json.load(file)
+        regions = set()
+        for page in data.values():
+            regions.update(page.keys())
+    except:
+        return True
+    return regions != set(os.path.splitext(name)[0] for name in sources)
+
+
+def build_atlas(path, folder):
+    """
+    Returns True if the atlas was built from the images in ``folder``
+
+    The atlas file and its pages are written next to each other, so ``path`` should
+    normally be in ``folder``.  If the atlas cannot be built (e.g. Pillow is not
+    installed or the folder is read-only), this function logs the reason and returns
+    False.
+
+    :param path: The path to the atlas file
+    :type path:  ``str``
+
+    :param folder: The folder of source images
+    :type folder:  ``str``
+    """
+    from kivy.atlas import Atlas
+    sources = [os.path.join(folder,name) for name in atlas_sources(path, folder)]
+    if not sources:
+        return False
+
+    try:
+        base = os.path.splitext(path)[0]
+        result = Atlas.create(base, sources, ATLAS_SIZE, padding=ATLAS_PADDING)
+    except:
+        result = False
+
+    if not result:
+        Logger.info('GameApp: Could not build atlas %s.' % repr(path))
+        return False
+    return True
+
+
+def _png_size(path):
+    """
+    Returns the (width,height) of a PNG file, or None if it is not a PNG file
+
+    :param path: The path to the image file
+    :type path:  ``str``
+    """
+    import struct
+    try:
+        with open(path,'rb') as file:
+            header = file.read(24)
+        if header[:8] != b'\x89PNG\r\n\x1a\n':
+            return None
+        return struct.unpack('>II',header[16:24])
+    except:
+        return None
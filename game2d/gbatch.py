@@ -0,0 +1,272 @@
+"""
+A module to support batched drawing of many images.
+
+Normally every :class:`GImage` has its own graphics instructions, so drawing a hundred
+cars costs a hundred draw calls.  A batch packs all of the images that share a texture
+into a single mesh, with four vertices per image.  Images that are regions of the same
+atlas page (see :meth:`GameApp.load_atlas`) share a texture, even if their sources
+differ.  The mesh is rewritten in place each time the batch is drawn, so the number of
+draw calls depends on the number of distinct textures, not on the number of objects.
+
+This module also has the Kivy version of :class:`GBody`, which can be drawn on its own
+as well as in a batch.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .gbody import GBody as _GBody
+from .app import GameApp
+import numpy as np
+
+
+class _Group(object):
+    """
+    The images of a batch that share a texture (or atlas page) and a tint.
+    """
+
+    def __init__(self,texture,color):
+        """
+        Creates a new, empty group.
+
+        :param texture: The shared texture
+        :type texture:  ``Texture``
+
+        :param color: The shared tint
+        :type color:  ``Color``
+        """
+        self.texture = texture
+        self.color = color
+        self.members = []
+        self.corners = np.zeros((0,4,2))
+        self.uvs = np.zeros((0,4,2))
+        self.meshes = []
+
+
+class GBatch(GObject):
+    """
+    A class representing a collection of images drawn as a few meshes.
+
+    Images are added with :meth:`add` and removed with :meth:`remove`.  The images
+    themselves are never drawn; instead, each time the batch is drawn it reads the
+    position and angle of every member and writes the corners of each image into the
+    mesh for its texture.  The size and scale of an image are read when it is added, so
+    an image that changes size should be removed and added again.  The meshes are only
+    rebuilt (once) at the next draw after images are added or removed, so adding many
+    images at once is cheap.
+
+    A batch is drawn like any other :class:`GObject`, and its own position, angle and
+    scale are applied to all of the members (so a batch at the origin draws each image
+    exactly where it would draw itself).
+    """
+    # The largest number of images in a single mesh (the limit on mesh indices)
+    CAPACITY = 16383
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of images in this batch.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return sum(len(group.members) for group in self._groups.values())
+
+    @property
+    def draws(self):
+        """
+        The number of meshes (and hence draw calls) used by this batch.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return sum(-(-len(group.members)//self.CAPACITY) for group in self._groups.values())
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty batch.
+
+        This class supports the same keywords as :class:`GObject`.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._groups = {}
+        self._owner  = {}
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+
+    # PUBLIC METHODS
+    def add(self,obj):
+        """
+        Adds an image to this batch.
+
+        The image must have a source (e.g. :class:`GImage` or :class:`GBody`).  Adding 
+        an image that is already in the batch does nothing.
+
+        :param obj: the image to add
+        :type obj:  :class:`GImage` or :class:`GBody`
+        """
+        if id(obj) in self._owner:
+            return
+
+        texture = GameApp.load_texture(obj.source)
+        assert not texture is None, '%s has no valid texture' % repr(obj)
+        tint = None if obj.fillcolor is None else tuple(obj.fillcolor)
+        key = (texture.id, tint)
+        if not key in self._groups:
+            color = Color(1,1,1) if tint is None else Color(*tint)
+            self._groups[key] = _Group(texture,color)
+
+        group = self._groups[key]
+        group.members.append(obj)
+        (sx, sy) = obj.scale
+        w = obj.width*sx/2.0
+        h = obj.height*sy/2.0
+        corner = np.array([[[-w,-h],[w,-h],[w,h],[-w,h]]],dtype=float)
+        group.corners = np.concatenate((group.corners,corner))
+        coords = np.array(texture.tex_coords,dtype=float).reshape(1,4,2)
+        group.uvs = np.concatenate((group.uvs,coords))
+        self._owner[id(obj)] = key
+        self._stale = True
+
+    def remove(self,obj):
+        """
+        Removes an image from this batch.
+
+        :param obj: the image to remove
+        :type obj:  :class:`GImage` or :class:`GBody`
+        """
+        key = self._owner.pop(id(obj))
+        group = self._groups[key]
+        pos = group.members.index(obj)
+        del group.members[pos]
+        group.corners = np.delete(group.corners,pos,axis=0)
+        group.uvs = np.delete(group.uvs,pos,axis=0)
+        if len(group.members) == 0:
+            del self._groups[key]
+        self._stale = True
+
+    def clear(self):
+        """
+        Removes all images from this batch.
+        """
+        self._groups = {}
+        self._owner  = {}
+        self._stale = True
+
+    def draw(self, view):
+        """
+        Draws every image in this batch in the provided view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        if self._stale:
+            self._reset()
+        self._refresh()
+        GObject.draw(self,view)
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache, making one mesh per texture (per CAPACITY images).
+        """
+        GObject._reset(self)
+        self._stale = False
+        for group in self._groups.values():
+            group.meshes = []
+            self._cache.add(group.color)
+            for start in range(0,len(group.members),self.CAPACITY):
+                size = min(self.CAPACITY,len(group.members)-start)
+                indices = (np.arange(size).reshape(size,1)*4+[0,1,2,2,3,0]).ravel()
+                mesh = Mesh(vertices=[0.0]*(16*size),indices=indices.tolist(),
+                            mode='triangles',texture=group.texture)
+                group.meshes.append(mesh)
+                self._cache.add(mesh)
+        self._cache.add(PopMatrix())
+
+    def _refresh(self):
+        """
+        Rewrites the mesh vertices from the current member positions and angles.
+        """
+        for group in self._groups.values():
+            size = len(group.members)
+            if size == 0:
+                continue
+
+            xs = np.fromiter((obj.x for obj in group.members),float,size)
+            ys = np.fromiter((obj.y for obj in group.members),float,size)
+            angles = np.radians(np.fromiter((obj.angle for obj in group.members),float,size))
+            cos = np.cos(angles).reshape(size,1)
+            sin = np.sin(angles).reshape(size,1)
+
+            verts = np.empty((size,4,4))
+            lx = group.corners[:,:,0]
+            ly = group.corners[:,:,1]
+            verts[:,:,0] = xs.reshape(size,1)+cos*lx-sin*ly
+            verts[:,:,1] = ys.reshape(size,1)+sin*lx+cos*ly
+            verts[:,:,2:] = group.uvs
+
+            verts = verts.reshape(size,16)
+            for (pos, mesh) in enumerate(group.meshes):
+                start = pos*self.CAPACITY
+                mesh.vertices = verts[start:start+self.CAPACITY].ravel().tolist()
+
+
+class GBody(_GBody):
+    """
+    A class representing a lightweight image that can also be drawn on its own.
+
+    This is the Kivy version of :class:`game2d.gbody.GBody`.  It is usually drawn as
+    part of a :class:`GBatch`, which costs it nothing.  If it is drawn on its own, it
+    builds a small group of instructions the first time, and afterwards only copies
+    its position and angle into them.  Changing the size, source or tint after the
+    first draw has no effect on the drawing.
+    """
+    __slots__ = ('_cache','_trans','_rotate')
+
+    def __init__(self,**keywords):
+        """
+        Creates a new body.
+
+        This class supports the same keywords as :class:`game2d.gbody.GBody`.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        _GBody.__init__(self,**keywords)
+        self._cache = None
+
+    def draw(self, view):
+        """
+        Draws this body in the provided view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        if self._cache is None:
+            self._reset()
+        self._trans.x = self.x
+        self._trans.y = self.y
+        self._rotate.angle = self.angle
+        view.draw(self._cache)
+
+    def _reset(self):
+        """
+        Builds the drawing cache.
+        """
+        self._trans  = Translate(self.x,self.y,0)
+        self._rotate = Rotate(angle=self.angle,axis=(0,0,1))
+        self._cache = InstructionGroup()
+        self._cache.add(PushMatrix())
+        self._cache.add(self._trans)
+        self._cache.add(self._rotate)
+        if not self.fillcolor is None:
+            self._cache.add(Color(*self.fillcolor))
+        x = -self.width/2.0
+        y = -self.height/2.0
+        texture = GameApp.load_texture(self.source)
+        self._cache.add(Rectangle(pos=(x,y),size=(self.width,self.height),texture=texture))
+        self._cache.add(PopMatrix())
@@ -0,0 +1,236 @@
+"""
+A module to support lightweight obstacles.
+
+A :class:`GImage` is a full graphics object: it owns Kivy transforms, colors and an
+instruction group, and every attribute goes through a property.  That is wasteful for
+the hundreds of identical obstacles in a large level, which only ever move.  A
+:class:`GBody` stores just what such an obstacle needs (position, size, angle, hitbox,
+source and tint) in ``__slots__``, with no per-instance dictionary and no graphics
+until it is drawn.  It has the same collision semantics as :class:`GObject`.
+
+Bodies are meant to be drawn with a :class:`GBatch`, which only reads these
+attributes.  A body can also be drawn on its own; it then builds its instructions the
+first time it is drawn.
+
+This module does not depend on Kivy, so it is shared by every game2d backend.  The
+class here never draws anything; the Kivy backend extends it with drawing.
+"""
+from .gaffine import affine, compose, invert
+from .gshape import bbox as _shape_bbox, collides as _shape_collides, contains as _shape_contains
+
+
+class GBody(object):
+    """
+    A class representing a lightweight image for collisions and batched drawing.
+
+    The attributes ``x``, ``y``, ``width``, ``height``, ``angle``, ``hitbox``,
+    ``source``, ``fillcolor`` and ``name`` are plain slots.  They have the same meaning
+    as the attributes of :class:`GImage`, but they are not checked when they are set,
+    and nothing is cached, so they may be changed freely.  Unlike an image, a body has
+    no line color and is never scaled, and its size must be given (it is not read from
+    the image file).  The tint ``fillcolor`` is None or a tuple of RGBA values in 0..1.
+
+    The methods :meth:`collides` and :meth:`contains` agree with those of
+    :class:`GObject`, including for rotated objects.  A body may collide with another
+    body or with any :class:`GObject`.
+    """
+    __slots__ = ('x','y','width','height','angle','hitbox','source','fillcolor','name')
+
+    # Bodies are never scaled (a class attribute, so it cannot be set on a body)
+    scale = (1.0,1.0)
+
+    # Class attribute for the collision test of rotated objects: 'edges' tests the edges
+    # of one hitbox against the other (the original test), 'sat' is exact (see gsat)
+    COLLIDER = 'edges'
+
+    # DERIVED PROPERTIES
+    @property
+    def left(self):
+        """
+        The left edge of this body (taking the hitbox into account).
+
+        **invariant**: Value is a ``float``.
+        """
+        return self._bbox()[0]
+
+    @property
+    def right(self):
+        """
+        The right edge of this body (taking the hitbox into account).
+
+        **invariant**: Value is a ``float``.
+        """
+        return self._bbox()[2]
+
+    @property
+    def top(self):
+        """
+        The top edge of this body (taking the hitbox into account).
+
+        **invariant**: Value is a ``float``.
+        """
+        return self._bbox()[1]
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge of this body (taking the hitbox into account).
+
+        **invariant**: Value is a ``float``.
+        """
+        return self._bbox()[3]
+
+    # BUILT-IN METHODS
+    def __init__(self,x=0.0,y=0.0,width=0.0,height=0.0,angle=0.0,hitbox=None,
+                 source=None,fillcolor=None,name=None):
+        """
+        Creates a new body.
+
+        :param x: The horizontal coordinate of the center
+        :type x:  ``int`` or ``float``
+
+        :param y: The vertical coordinate of the center
+        :type y:  ``int`` or ``float``
+
+        :param width: The width of the image
+        :type width:  ``int`` or ``float`` > 0
+
+        :param height: The height of the image
+        :type height:  ``int`` or ``float`` > 0
+
+        :param angle: The angle of rotation about the center, in degrees
+        :type angle:  ``int`` or ``float``
+
+        :param hitbox: The hitbox offsets (left, top, right, bottom), or None
+        :type hitbox:  4-element tuple of numbers, or None
+
+        :param source: The image file
+        :type source:  ``str`` or None
+
+        :param fillcolor: The tint of the image, or None
+        :type fillcolor:  tuple of RGBA values in 0..1, or None
+
+        :param name: The name of this body (for debugging)
+        :type name:  ``str`` or None
+        """
+        assert type(width) in [int,float] and width > 0, '%s is not a valid width' % repr(width)
+        assert type(height) in [int,float] and height > 0, '%s is not a valid height' % repr(height)
+        assert hitbox is None or len(hitbox) == 4, '%s is not a valid hitbox' % repr(hitbox)
+        self.x = float(x)
+        self.y = float(y)
+        self.width = float(width)
+        self.height = float(height)
+        self.angle = float(angle)
+        self.hitbox = (0,0,0,0) if hitbox is None else tuple(hitbox)
+        self.source = source
+        self.fillcolor = None if fillcolor is None else tuple(fillcolor)
+        self.name = name
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this body.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,center=(%s,%s),width=%s,height=%s,angle=%s]' \
+                % (s,repr(self.x),repr(self.y),repr(self.width),repr(self.height),repr(self.angle))
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this body.
+        :rtype:  ``str``
+        """
+        return str(self.__class__)+str(self)
+
+    # PUBLIC METHODS
+    def collides(self,obj):
+        """
+        Checks whether this body collides with another body or object.
+
+        This collision method takes hitboxes into account.
+
+        :param obj: the body or object to check for collision
+        :type obj: :class:`GBody` or :class:`GObject`
+
+        :return: True if this body collides with the object
+        :rtype:  ``bool``
+        """
+        return _shape_collides(self,obj)
+
+    def contains(self,point):
+        """
+        Checks whether this body contains the point
+
+        :param point: the point to check
+        :type point: a pair of numbers (or any object with x and y attributes)
+
+        :return: True if this body contains the point
+        :rtype:  ``bool``
+        """
+        if hasattr(point,'x'):
+            point = (point.x,point.y)
+        return _shape_contains(self,point)
+
+    def draw(self, view):
+        """
+        Does nothing, as a body has no graphics without the Kivy backend.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        pass
+
+    # HIDDEN PROPERTIES (SHARED WITH GObject, FOR COLLISIONS)
+    @property
+    def _aligned(self):
+        """
+        Whether this body is rotated by a multiple of 90 degrees.
+        """
+        return (self.angle % 360) in [0,90,180,270]
+
+    @property
+    def _box(self):
+        """
+        The cached bounding box (always None, as a body caches nothing).
+        """
+        return None
+
+    # HIDDEN METHODS
+    def _affine(self):
+        """
+        :return: The transform of this body as an affine tuple (a,b,c,d,tx,ty)
+        :rtype:  ``tuple``
+        """
+        return affine(self.x,self.y,self.angle)
+
+    def _inverse(self):
+        """
+        :return: The inverse of :meth:`_affine`
+        :rtype:  ``tuple``
+        """
+        return invert(self._affine())
+
+    def _composite(self,obj):
+        """
+        :param obj: the other body or object
+        :type obj:  :class:`GBody` or :class:`GObject`
+
+        :return: The transform from the space of obj to the space of this body
+        :rtype:  ``tuple``
+        """
+        return compose(obj._affine(),invert(self._affine()))
+
+    def _bbox(self):
+        """
+        Returns the bounding box of this rotated body
+
+        The bounding box is returned as a tuple (l,t,r,b), computed exactly as for a
+        :class:`GObject`.
+
+        :return: The bounding box for the body
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        return _shape_bbox(self)
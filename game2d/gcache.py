@@ -0,0 +1,166 @@
+"""
+A module to support compiled data files.
+
+Parsing a large JSON file and then walking it to build game objects can be slow.  This
+module lets a game compile its JSON files once, into whatever form is fastest to use,
+and keep the result in a pickle cache on disk.  The cache is keyed by the modification
+time, size and hash of every source file, so it is rebuilt whenever a source changes.
+
+This module does not depend on Kivy, so it is shared by every game2d backend.
+"""
+import os
+import os.path
+import json
+import pickle
+import hashlib
+import logging
+
+Logger = logging.getLogger('game2d')
+
+
+# The folder (inside the JSON folder) for compiled files
+CACHE_FOLDER = '__cache__'
+
+# The version of the cache format (changing this invalidates every cache file)
+CACHE_VERSION = 2
+
+
+def cache_path(folder, names):
+    """
+    Returns the path of the cache file for the given source files
+
+    :param folder: The folder containing the source files
+    :type folder:  ``str``
+
+    :param names: The source file names
+    :type names:  ``list`` of ``str``
+    """
+    stem = '+'.join(os.path.splitext(name)[0] for name in names)
+    return os.path.join(folder, CACHE_FOLDER, stem+'.pickle')
+
+
+def load_compiled(folder, names, compiler, tag=None):
+    """
+    Returns the compiled form of the given JSON files, or None if they cannot be loaded
+
+    The files are read from ``folder``, parsed as JSON, and passed (in order) to the
+    function ``compiler``, whose result is returned.  That result is also pickled to a
+    cache file.  The next time, if every source file has the same modification time and
+    size as before, the result is unpickled without reading the sources at all.  If
+    only the modification times changed, the sources are hashed, and the cache is still
+    used if the hashes agree.
+
+    The ``tag`` identifies the compiler.  Change it whenever the compiled format
+    changes, so that old cache files are not used.  By default it is the qualified name
+    of ``compiler``.
+
+    :param folder: The folder containing the source files
+    :type folder:  ``str``
+
+    :param names: The source file names
+    :type names:  ``list`` of ``str``
+
+    :param compiler: The function to compile the parsed files
+    :type compiler:  callable, taking one argument per file
+
+    :param tag: The identifier of the compiler (optional)
+    :type tag:  any picklable value
+    """
+    if tag is None:
+        tag = getattr(compiler,'__module__','')+'.'+getattr(compiler,'__qualname__','')
+
+    paths = [os.path.join(folder,name) for name in names]
+    for path in paths:
+        if not os.path.exists(path):
+            Logger.info('game2d: No json file named %s.' % repr(path))
+            return None
+
+    stamps = [_stamp(path) for path in paths]
+    cache = cache_path(folder,names)
+    entry = _read(cache)
+    if entry and entry['version'] == CACHE_VERSION and entry['tag'] == tag:
+        if entry['stamps'] == stamps:
+            return entry['data']
+
+        hashes = [_digest(path) for path in paths]
+        if entry['hashes'] == hashes:
+            entry['stamps'] = stamps
+            _write(cache,entry)
+            return entry['data']
+    else:
+        hashes = [_digest(path) for path in paths]
+
+    try:
+        sources = []
+        for path in paths:
+            with open(path) as file:
+                sources.append(json.load(file))
+    except:
+        Logger.info('game2d: JSON %s is not properly formatted.' % repr(path))
+        return None
+
+    data = compiler(*sources)
+    entry = {'version':CACHE_VERSION, 'tag':tag, 'stamps':stamps, 'hashes':hashes,
+             'data':data}
+    _write(cache,entry)
+    return data
+
+
+def _stamp(path):
+    """
+    Returns the (modification time, size) of a file
+
+    :param path: The file path
+    :type path:  ``str``
+    """
+    info = os.stat(path)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def _digest(path):
+    """
+    Returns the SHA-1 hash of the contents of a file
+
+    :param path: The file path
+    :type path:  ``str``
+    """
+    with open(path,'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def _read(cache):
+    """
+    Returns the contents of a cache file, or None if it is missing or unreadable
+
+    :param cache: The cache file path
+    :type cache:  ``str``
+    """
+    try:
+        with open(cache,'rb') as file:
+            entry = pickle.load(file)
+        return entry if type(entry) == dict and 'version' in entry else None
+    except:
+        return None
+
+
+def _write(cache, entry):
+    """
+    Writes a cache file, ignoring any failures (e.g. a read-only folder)
+
+    The file is written to a temporary name first and then renamed, so a reader never
+    sees a partial file.
+
+    :param cache: The cache file path
+    :type cache:  ``str``
+
+    :param entry: The contents of the cache file
+    :type entry:  ``dict``
+    """
+    try:
+        os.makedirs(os.path.dirname(cache),exist_ok=True)
+        temp = cache+'.%d.tmp' % os.getpid()
+        with open(temp,'wb') as file:
+            pickle.dump(entry,file,pickle.HIGHEST_PROTOCOL)
+        os.replace(temp,cache)
+    except:
+        Logger.info('game2d: Could not write cache file %s.' % repr(cache))
@@ -0,0 +1,214 @@
+"""
+The key-state base class for input handlers.
+
+An input handler keeps a dictionary of the keys that are held down this animation frame
+and another for the previous frame.  Everything that the game asks of the keyboard is
+answered from these two dictionaries, which is all that :class:`GKeyInput` provides.
+Subclasses decide where the key states come from: the Kivy keyboard, keys pressed by a
+program, or a recorded game (see :mod:`game2d.greplay`).
+
+This module does not depend on Kivy, so it is shared by every game2d backend.
+"""
+
+
+class GKeyInput(object):
+    """
+    A class representing the key state of an input handler.
+
+    A subclass changes the attribute ``_keystate`` (a dictionary of key name to bool)
+    whenever a key goes up or down, keeping ``_keycount`` in step with it.  The game
+    application calls :meth:`refresh` at the end of each update, so that the methods
+    :meth:`is_key_pressed` and :meth:`is_key_released` can see what changed.
+
+    Code that only reads keys (such as a game level) can use any subclass, so a game
+    can be played from a recording or a script as easily as from the keyboard.
+    """
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def touch(self):
+        """
+        The current (x,y) coordinate of the mouse, if pressed.
+
+        A key state has no mouse, so this is always None.  Subclasses with a mouse
+        override this attribute.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be None for this class.
+        """
+        return None
+
+    @property
+    def key_count(self):
+        """
+        The number of keys currently held down.
+
+        This attribute is a quick way to check whether the user has pressed any keys.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int > 0."""
+        return self._keycount
+
+    @property
+    def keys(self):
+        """
+        The list of keys that are currently held down.
+
+        Using this attribute is much slower than the method :meth:`is_key_down`.  You
+        should use that method when you want to test a specific key. This attribute is
+        primarily for debugging.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a list of strings (possibly empty)
+        """
+        return tuple(k for (k,v) in self._keystate.items() if v)
+
+    # BUILT-IN METHODS
+    def __init__(self):
+        """
+        Creates a new key state with no keys held down
+        """
+        self._prvstate = {}
+        self._keystate = {}
+        self._keycount = 0
+
+
+    # PUBLIC METHODS
+    def refresh(self):
+        """
+        Ends the current animation frame for this input.
+
+        The keys held down now become the keys held down in the previous frame, which
+        :meth:`is_key_pressed` and :meth:`is_key_released` compare against.  The game
+        application calls this method after each update.
+        """
+        self._prvstate.clear()
+        self._prvstate.update(self._keystate)
+    
+    
+    def is_key_down(self,key):
+        """
+        Checks wether the key is currently held down.
+        
+        The key is a string describing the key pressed.  For example, to determine
+        whether the right-arrow key is held down, use the method call::
+        
+            input.is_key_down('right')
+        
+        Similarly the method call::
+        
+            input.is_key_down('w')
+        
+        will indicate whether the W key is held down.
+        
+        For a complete list of key names, see the
+        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
+        
+        :param key: the key to test
+        :type key:  ``str``
+        
+        :return: True if ``key`` is currently held down
+        :rtype:  ``bool``
+        """
+        return key in self._keystate and self._keystate[key]
+
+
+    def is_key_up(self,key):
+        """
+        Checks wether the key is not currently helpd down
+        
+        The key is a string describing the key pressed.  For example, to determine
+        whether the right-arrow key is currently up, use the method call::
+        
+            input.is_key_up('right')
+        
+        Similarly the method call::
+        
+            input.is_key_up('w')
+        
+        will indicate whether the W key is up.
+        
+        For a complete list of key names, see the
+        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
+        
+        :param key: the key to test
+        :type key:  ``str``
+        
+        :return: True if ``key`` is not currently held down
+        :rtype:  ``bool``
+        """
+        return key in self._keystate and not self._keystate[key]
+
+
+    def is_key_pressed(self,key):
+        """
+        Checks wether the key was just pressed.
+        
+        A key is pressed if it is held down this animation frame and was not held down 
+        the previous animation frame. The key is a string describing the key pressed. For 
+        example, to determine whether the right-arrow key was just pressed, use the 
+        method call::
+        
+            input.is_key_pressed('right')
+        
+        Similarly the method call::
+        
+            input.is_key_pressed('w')
+        
+        will indicate whether the W key was just pressed.
+        
+        For a complete list of key names, see the
+        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
+        
+        :param key: the key to test
+        :type key:  ``str``
+        
+        :return: True if ``key`` was pressed this frame
+        :rtype:  ``bool``
+        """
+        return key in self._keystate and self._keystate[key] and not (key in self._prvstate and self._prvstate[key])
+
+
+    def is_key_released(self,key):
+        """
+        Checks wether the key is currently held down.
+        
+        A key is released if it is not held down this animation frame but was held down 
+        the previous animation frame. The key is a string describing the key pressed. For 
+        example, to determine whether the right-arrow key was just released, use the 
+        method call::
+        
+            input.is_key_released('right')
+        
+        Similarly the method call::
+        
+            input.is_key_released('w')
+        
+        will indicate whether the W key was just released.
+        
+        For a complete list of key names, see the
+        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
+        
+        :param key: the key to test
+        :type key:  ``str``
+        
+        :return: True if ``key`` was released this frame
+        :rtype:  ``bool``
+        """
+        return key in self._keystate and not self._keystate[key] and (key in self._prvstate and self._prvstate[key])
+
+
+    def is_touch_down(self):
+        """
+        Checks wether the mouse is currently held down.
+
+        A key state has no mouse, so this is always False.  Subclasses with a mouse
+        override this method.
+
+        :return: True if the mouse is currently held down; False otherwise
+        :rtype:  ``bool``
+        """
+        return False
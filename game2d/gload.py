@@ -0,0 +1,259 @@
+"""
+A module to support loading without dropping frames.
+
+Loading a level usually has two parts: reading and parsing files, and then building the
+game objects from the result.  Doing both inside one update stalls the game for as long
+as they take.  A :class:`GLoader` spreads them out instead.  The first part runs on a
+worker thread, while the game keeps animating.  The second part must make graphics
+objects, so it runs on the main thread, but it is written as a generator that yields
+after each small step.  Every call to :meth:`GLoader.update` advances the generator
+until a per-frame time budget is used up, and then returns, so each frame only spends
+that budget on loading.  A game with a fixed time step may update several times in
+one frame, so it should pass the frame number (:attr:`GameApp.frame`) to
+:meth:`GLoader.update`; the calls in one frame then share a single budget.
+
+The generator may yield its progress as a number in 0..1 (anything else is ignored), so
+a game can draw a progress bar while it waits.  The value it returns is the result of
+the loader.  If either part raises an exception, :meth:`GLoader.update` raises it again
+on the main thread, so a failed load is never silent.
+
+The worker only helps with work that releases the interpreter lock (such as reading
+files).  Parsing in Python still shares the interpreter with the main thread, so it
+should be kept small (see :meth:`GameApp.load_compiled`).
+
+This module does not depend on Kivy, so it is shared by every game2d backend.
+"""
+import threading
+import time
+
+
+class GLoader(object):
+    """
+    A class representing a load that is spread over several frames.
+
+    A loader is made from two functions.  The function ``work`` takes no arguments, and
+    is called on a worker thread.  The function ``build`` takes the result of ``work``
+    and returns a generator, which is advanced on the main thread by :meth:`update`.
+    Either may be None: without ``work``, ``build`` is called with no arguments, and
+    without ``build``, the result of ``work`` is the result of the loader.
+
+    Call :meth:`update` once per frame until it returns True, and then read
+    :attr:`result`.  To load everything at once instead (for example, when frames do not
+    matter), call :meth:`finish`.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def budget(self):
+        """
+        The seconds of each frame to spend building, or None for no limit
+
+        A frame is a single call to :meth:`update`, unless the calls are given a frame
+        number (then it is every call with the same number).  At least one step is
+        taken in every frame, so a step that is longer than the budget still finishes.
+
+        **invariant**: Value is a float > 0 or None.
+        """
+        return self._budget
+
+    @budget.setter
+    def budget(self,value):
+        assert value is None or (type(value) in [int,float] and value > 0), \
+            '%s is not a valid time budget' % repr(value)
+        self._budget = None if value is None else float(value)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def done(self):
+        """
+        Whether the load has finished.
+
+        **invariant**: Value is a bool.
+        """
+        return self._done
+
+    @property
+    def result(self):
+        """
+        The result of the load, or None if it has not finished.
+
+        **invariant**: Value is the value returned by the build generator (or by
+        ``work``, if there is no ``build``).
+        """
+        return self._result
+
+    @property
+    def progress(self):
+        """
+        The last progress reported by the build generator.
+
+        This is 0 while the worker thread is running, and 1 when the load has finished.
+
+        **invariant**: Value is a float in 0..1.
+        """
+        return self._progress
+
+    @property
+    def steps(self):
+        """
+        The number of steps of the build generator taken so far.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return self._steps
+
+    # BUILT-IN METHODS
+    def __init__(self,work=None,build=None,budget=0.004,threaded=True):
+        """
+        Creates a new loader, and starts its work.
+
+        :param work: The function to call on the worker thread (or None)
+        :type work:  callable with no arguments
+
+        :param build: The function making the generator to advance on the main thread
+        :type build:  callable returning a generator (or None)
+
+        :param budget: The seconds of each frame to spend building (None for no limit)
+        :type budget:  ``int`` or ``float`` > 0, or None
+
+        :param threaded: Whether to call ``work`` on a thread (instead of in the first update)
+        :type threaded:  ``bool``
+        """
+        assert work is None or callable(work), '%s is not callable' % repr(work)
+        assert build is None or callable(build), '%s is not callable' % repr(build)
+        self.budget = budget
+        self._work = work
+        self._build = build
+        self._done = False
+        self._result = None
+        self._progress = 0.0
+        self._steps = 0
+
+        # The frame being built in, and the seconds of its budget spent so far
+        self._frame = None
+        self._spent = 0.0
+
+        # Written by the worker thread, and only read once it has finished
+        self._data = None
+        self._error = None
+        self._generator = None
+
+        self._thread = None
+        if work is not None and threaded:
+            self._thread = threading.Thread(target=self._run,daemon=True)
+            self._thread.start()
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this loader.
+        :rtype:  ``str``
+        """
+        return '%s[progress=%s,done=%s]' % (str(self.__class__),repr(self._progress),repr(self._done))
+
+    # PUBLIC METHODS
+    def update(self,frame=None):
+        """
+        Advances the load by one frame, returning True if it has finished.
+
+        If the worker thread is still running, this returns at once.  Otherwise, this
+        takes steps of the build generator until :attr:`budget` seconds have passed.
+
+        If ``frame`` is given, the budget is for every call with that frame number, and
+        not for this call alone.  A game with a fixed time step (see
+        :attr:`GameApp.timestep`) can call this several times in one frame, and should
+        pass :attr:`GameApp.frame`, so that the frame is not slowed down by several
+        budgets.  Once the budget of a frame is spent, later calls in it take no steps.
+
+        :param frame: The number of the current frame (or None)
+        :type frame:  ``int`` or None
+
+        :return: True if the load has finished
+        :rtype:  ``bool``
+        """
+        if self._done:
+            return True
+
+        if self._generator is None:
+            if self._thread is not None:
+                if self._thread.is_alive():
+                    return False
+                self._thread.join()
+            elif self._work is not None:
+                self._run()
+            if self._error is not None:
+                raise self._error
+            self._start()
+            if self._done:
+                return True
+
+        budget = self._budget
+        if frame is None or frame != self._frame:
+            self._frame = frame
+            self._spent = 0.0
+        elif budget is not None and self._spent >= budget:
+            return False
+
+        generator = self._generator
+        start = time.perf_counter()-self._spent
+        while True:
+            try:
+                value = next(generator)
+            except StopIteration as e:
+                self._finished(e.value)
+                return True
+            self._steps += 1
+            if type(value) in [int,float]:
+                self._progress = min(max(float(value),0.0),1.0)
+            if budget is not None:
+                self._spent = time.perf_counter()-start
+                if self._spent >= budget:
+                    return False
+
+    def finish(self):
+        """
+        Finishes the load now, no matter how long it takes, and returns the result.
+
+        :return: The result of the load
+        """
+        budget = self._budget
+        self._budget = None
+        try:
+            if self._thread is not None and self._generator is None:
+                self._thread.join()
+            self.update()
+        finally:
+            self._budget = budget
+        return self._result
+
+    # HIDDEN METHODS
+    def _run(self):
+        """
+        Calls the work function, keeping its result or its exception.
+        """
+        try:
+            self._data = self._work()
+        except Exception as e:
+            self._error = e
+
+    def _start(self):
+        """
+        Makes the build generator from the result of the work (or finishes the load).
+        """
+        if self._build is None:
+            self._finished(self._data)
+        elif self._work is None:
+            self._generator = self._build()
+        else:
+            self._generator = self._build(self._data)
+        self._data = None
+
+    def _finished(self,result):
+        """
+        Records the result of the load.
+
+        :param result: The result of the load
+        """
+        self._result = result
+        self._progress = 1.0
+        self._done = True
+        self._generator = None
@@ -11,6 +11,9 @@ Date:   November 1, 2020
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from introcs.geom import Point2, Matrix
+from .gaffine import affine as _affine, apply as _apply, compose as _compose, invert as _invert
+from .gbody import GBody
+from .gshape import bbox as _shape_bbox, collides as _shape_collides, contains as _shape_contains
 
 
 def is_color(c):
@@ -91,6 +94,10 @@ class GObject(object):
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
     """
 
+    # Class attribute for the collision test of rotated objects: 'edges' tests the edges
+    # of one hitbox against the other (the original test), 'sat' is exact (see gsat)
+    COLLIDER = 'edges'
+
     # MUTABLE PROPERTIES
     @property
     def x(self):
@@ -106,6 +113,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.x = float(value)
         self._mtrue = False
+        self._box = None
 
     @property
     def y(self):
@@ -121,6 +129,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.y = float(value)
         self._mtrue = False
+        self._box = None
 
     @property
     def width(self):
@@ -138,6 +147,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
+        self._box = None
         if self._defined:
             self._reset()
 
@@ -157,6 +167,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
+        self._box = None
         if self._defined:
             self._reset()
     
@@ -184,6 +195,7 @@ class GObject(object):
 
     @hitbox.setter
     def hitbox(self,value):
+        self._box = None
         if value is None:
             self._hitbox = None
             return
@@ -225,6 +237,8 @@ class GObject(object):
             self._scale.x = float(value[0])
             self._scale.y = float(value[1])
         self._mtrue = False
+        self._linear = None
+        self._box = None
 
     @property
     def angle(self):
@@ -243,8 +257,11 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         diff = np.allclose([self._rotate.angle],[value])
         self._rotate.angle = float(value)
+        self._aligned = (value % 360) in [0,90,180,270]
+        self._box = None
         if not diff:
             self._mtrue = False
+            self._linear = None
 
     @property
     def linecolor(self):
@@ -365,10 +382,11 @@ class GObject(object):
         elif (self._rotate.angle % 360) == 270:
             return self.x-self.height/2.0+self._hitbox[1]
         
-        p0 = tuple(self.matrix._transform(-self.width/2.0+self._hitbox[0], -self.height/2.0+self._hitbox[3]))[0]
-        p1 = tuple(self.matrix._transform( self.width/2.0+self._hitbox[2], -self.height/2.0+self._hitbox[3]))[0]
-        p2 = tuple(self.matrix._transform( self.width/2.0+self._hitbox[2],  self.height/2.0+self._hitbox[1]))[0]
-        p3 = tuple(self.matrix._transform(-self.width/2.0+self._hitbox[0],  self.height/2.0+self._hitbox[1]))[0]
+        affine = self._affine()
+        p0 = _apply(affine,-self.width/2.0+self._hitbox[0], -self.height/2.0+self._hitbox[3])[0]
+        p1 = _apply(affine, self.width/2.0+self._hitbox[2], -self.height/2.0+self._hitbox[3])[0]
+        p2 = _apply(affine, self.width/2.0+self._hitbox[2],  self.height/2.0+self._hitbox[1])[0]
+        p3 = _apply(affine,-self.width/2.0+self._hitbox[0],  self.height/2.0+self._hitbox[1])[0]
         return min(p0,p1,p2,p3)
 
     @left.setter
@@ -402,10 +420,11 @@ class GObject(object):
         elif (self._rotate.angle % 360) == 270:
             return self.x+self.height/2.0-self._hitbox[3]
         
-        p0 = tuple(self.matrix._transform(-self.width/2.0+self._hitbox[0], -self.height/2.0+self._hitbox[3]))[0]
-        p1 = tuple(self.matrix._transform( self.width/2.0+self._hitbox[2], -self.height/2.0+self._hitbox[3]))[0]
-        p2 = tuple(self.matrix._transform( self.width/2.0+self._hitbox[2],  self.height/2.0+self._hitbox[1]))[0]
-        p3 = tuple(self.matrix._transform(-self.width/2.0+self._hitbox[0],  self.height/2.0+self._hitbox[1]))[0]
+        affine = self._affine()
+        p0 = _apply(affine,-self.width/2.0+self._hitbox[0], -self.height/2.0+self._hitbox[3])[0]
+        p1 = _apply(affine, self.width/2.0+self._hitbox[2], -self.height/2.0+self._hitbox[3])[0]
+        p2 = _apply(affine, self.width/2.0+self._hitbox[2],  self.height/2.0+self._hitbox[1])[0]
+        p3 = _apply(affine,-self.width/2.0+self._hitbox[0],  self.height/2.0+self._hitbox[1])[0]
         return max(p0,p1,p2,p3)
 
     @right.setter
@@ -439,10 +458,11 @@ class GObject(object):
         elif (self._rotate.angle % 360) == 270:
             return self.y+self.width/2.0-self._hitbox[2]
         
-        p0 = tuple(self.matrix._transform(-self.width/2.0+self._hitbox[0], -self.height/2.0+self._hitbox[3]))[1]
-        p1 = tuple(self.matrix._transform( self.width/2.0+self._hitbox[2], -self.height/2.0+self._hitbox[3]))[1]
-        p2 = tuple(self.matrix._transform( self.width/2.0+self._hitbox[2],  self.height/2.0+self._hitbox[1]))[1]
-        p3 = tuple(self.matrix._transform(-self.width/2.0+self._hitbox[0],  self.height/2.0+self._hitbox[1]))[1]
+        affine = self._affine()
+        p0 = _apply(affine,-self.width/2.0+self._hitbox[0], -self.height/2.0+self._hitbox[3])[1]
+        p1 = _apply(affine, self.width/2.0+self._hitbox[2], -self.height/2.0+self._hitbox[3])[1]
+        p2 = _apply(affine, self.width/2.0+self._hitbox[2],  self.height/2.0+self._hitbox[1])[1]
+        p3 = _apply(affine,-self.width/2.0+self._hitbox[0],  self.height/2.0+self._hitbox[1])[1]
         return max(p0,p1,p2,p3)
 
     @top.setter
@@ -476,10 +496,11 @@ class GObject(object):
         elif (self._rotate.angle % 360) == 270:
             return self.y-self.width/2.0+self._hitbox[0]
         
-        p0 = tuple(self.matrix._transform(-self.width/2.0+self._hitbox[0], -self.height/2.0+self._hitbox[3]))[1]
-        p1 = tuple(self.matrix._transform( self.width/2.0+self._hitbox[2], -self.height/2.0+self._hitbox[3]))[1]
-        p2 = tuple(self.matrix._transform( self.width/2.0+self._hitbox[2],  self.height/2.0+self._hitbox[1]))[1]
-        p3 = tuple(self.matrix._transform(-self.width/2.0+self._hitbox[0],  self.height/2.0+self._hitbox[1]))[1]
+        affine = self._affine()
+        p0 = _apply(affine,-self.width/2.0+self._hitbox[0], -self.height/2.0+self._hitbox[3])[1]
+        p1 = _apply(affine, self.width/2.0+self._hitbox[2], -self.height/2.0+self._hitbox[3])[1]
+        p2 = _apply(affine, self.width/2.0+self._hitbox[2],  self.height/2.0+self._hitbox[1])[1]
+        p3 = _apply(affine,-self.width/2.0+self._hitbox[0],  self.height/2.0+self._hitbox[1])[1]
         return min(p0,p1,p2,p3)
 
 
@@ -544,8 +565,18 @@ class GObject(object):
         # Set the properties.
         self._defined = False
 
+        # The bounding box is cached until a setter changes it
+        self._box = None
+        self._aligned = True
+
         # Create the Kivy transforms for position and size
         self._mtrue  = False
+
+        # The affine tuples used for collisions (see _affine)
+        self._linear = None
+        self._aff    = None
+        self._inv    = None
+        self._pair   = None
         self._trans  = Translate(0,0,0)
         self._rotate = Rotate(angle=0,axis=(0,0,1))
         self._scale  = Scale(1,1,1)
@@ -614,49 +645,13 @@ class GObject(object):
         This collision method takes hitboxes into account
         
         :param obj: the object to check for collision
-        :type obj: :class:`GObject`
+        :type obj: :class:`GObject` or :class:`GBody`
 
         :return: True if the shape collides with object
         :rtype:  ``bool``
         """
-        assert isinstance(obj,GObject), '%s is not an instance of GObject' % repr(object)
-        
-        # Get the hitboxes
-        h1 = (0,0,0,0) if self._hitbox is None else self._hitbox
-        h2 = (0,0,0,0) if obj._hitbox is None else obj._hitbox
-
-        # Optimize for 90 degree turns
-        if (self.angle % 360) in [0,90,180,270] and (obj.angle % 360) in [0,90,180,270]:
-            (l0,t0,r0,b0) = obj._bbox()
-            (l1,t1,r1,b1) = self._bbox()
-            isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
-            isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
-            return isx and isy
-        
-        comp = obj.matrix*self.matrix.inverse()
-        w = obj.width/2.0
-        h = obj.height/2.0
-        p0 = tuple(comp._transform(-w+h2[0], h-h2[1]))
-        p1 = tuple(comp._transform( w-h2[2], h-h2[1]))
-        p2 = tuple(comp._transform( w-h2[2],-h+h2[3]))
-        p3 = tuple(comp._transform(-w+h2[0],-h+h2[3]))
-        
-        sides = ((p0,p1),(p1,p2),(p2,p3),(p3,p0))
-        l1 = -self.width/2.0  + h1[0]
-        r1 =  self.width/2.0  - h1[2]
-        t1 =  self.height/2.0 - h1[1]
-        b1 = -self.height/2.0 + h1[3]
-        for s in sides:
-            l0 = min(s[0][0],s[1][0])
-            r0 = max(s[0][0],s[1][0])
-            b0 = min(s[0][1],s[1][1])
-            t0 = max(s[0][1],s[1][1])
-            isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
-            isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
-            if isx and isy:
-                return True
-    
-        return False
+        assert isinstance(obj,(GObject,GBody)), '%s is not an instance of GObject' % repr(obj)
+        return _shape_collides(self,obj)
     
     def contains(self,point):
         """
@@ -675,19 +670,7 @@ class GObject(object):
         if isinstance(point,Point2):
             point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-        
-        # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) in [0,90,180,270]:
-            (l,t,r,b) = self._bbox()
-            return l <= point[0] <= r and b <= point[1] <= t
-        
-        # Transform this to the right space.
-        point = tuple(self.matrix.inverse()._transform(point[0],point[1]))
-        w = self.width/2.0 
-        h = self.height/2.0
-        isx = - w + self._hitbox[0] <= point[0] <= w - self._hitbox[2]
-        isy = - h + self._hitbox[3] <= point[1] <= h - self._hitbox[1]
-        return isx and isy
+        return _shape_contains(self,point)
 
     def transform(self,point):
         """
@@ -750,55 +733,92 @@ class GObject(object):
         self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
         self._mtrue = True
 
+    def _affine(self):
+        """
+        Returns the transform of this object as an affine tuple (a,b,c,d,tx,ty)
+
+        Collisions use affine tuples instead of the matrices, as they are much cheaper
+        to build.  The rotation and scale part is cached until the angle or scale
+        changes.  The translation is compared against the current position, so moving
+        the object only builds a new tuple (and only when it is asked for).
+
+        :return: The transform of this object
+        :rtype:  ``tuple``
+        """
+        x = self._trans.x
+        y = self._trans.y
+        linear = self._linear
+        if linear is None:
+            linear = _affine(0,0,self._rotate.angle,self._scale.x,self._scale.y)[:4]
+            self._linear = linear
+            aff = None
+        else:
+            aff = self._aff
+        if aff is None or aff[4] != x or aff[5] != y:
+            aff = linear+(x,y)
+            self._aff = aff
+        return aff
+
+    def _inverse(self):
+        """
+        Returns the inverse of :meth:`_affine`, cached until the transform changes
+
+        :return: The inverse transform of this object
+        :rtype:  ``tuple``
+        """
+        aff = self._affine()
+        inv = self._inv
+        if inv is None or inv[0] is not aff:
+            inv = (aff,_invert(aff))
+            self._inv = inv
+        return inv[1]
+
+    def _composite(self,obj):
+        """
+        Returns the transform from the space of obj to the space of this object
+
+        The result is cached for the last object, until either transform changes, so
+        testing the same pair again costs nothing.
+
+        :param obj: the other object
+        :type obj:  :class:`GObject` or :class:`GBody`
+
+        :return: The composite transform
+        :rtype:  ``tuple``
+        """
+        other = obj._affine()
+        inv = self._inverse()
+        pair = self._pair
+        if pair is None or pair[0] is not obj or pair[1] != other or pair[2] is not inv:
+            pair = (obj,other,inv,_compose(other,inv))
+            self._pair = pair
+        return pair[3]
+
     def _bbox(self):
         """
-        Computes the bounding box of this rotated object
+        Returns the bounding box of this rotated object
         
         The bounding box is returned as a tuple (l,t,r,b). This function allows for 
         fast(er) collisions when the object is rotated in 90 degree increments.
         
+        The box is cached, and only recomputed after a change to the position, size,
+        angle, scale or hitbox of this object.
+        
         :return: The bounding box for the shape
         :rtype:  ``tuple`` of four ``float`` values
         """
-        oangle = self.angle % 360
-        hit = (0,0,0,0) if self._hitbox is None else self._hitbox
-        w = self.width/2
-        h = self.height/2
-        if oangle == 0:
-            l = self.x + hit[0] - w
-            r = self.x - hit[2] + w
-            t = self.y - hit[1] + h
-            b = self.y + hit[3] - h
-        elif oangle == 90:
-            t = self.y + hit[2] - w
-            b = self.y - hit[0] + w
-            r = self.x - hit[3] + h
-            l = self.x + hit[1] - h
-        elif oangle == 180:
-            l = self.x + hit[2] - w
-            r = self.x - hit[0] + w
-            t = self.y - hit[3] + h
-            b = self.y + hit[1] - h
-        elif oangle == 270:
-            t = self.y + hit[0] - w
-            b = self.y - hit[2] + w
-            r = self.x - hit[1] + h
-            l = self.x + hit[3] - h
-        else:
-            comp = self.matrix
-            w = self.width/2.0
-            h = self.height/2.0
-            p0 = tuple(comp._transform(-w+hit[0], h-hit[1]))
-            p1 = tuple(comp._transform( w-hit[2], h-hit[1]))
-            p2 = tuple(comp._transform( w-hit[2],-h+hit[3]))
-            p3 = tuple(comp._transform(-w+hit[0],-h+hit[3]))
-            
-            l = min(p0[0],p1[0],p2[0],p3[0])
-            r = max(p0[0],p1[0],p2[0],p3[0])
-            b = min(p0[1],p1[1],p2[1],p3[1])
-            t = max(p0[1],p1[1],p2[1],p3[1])
-        
-        return (l,t,r,b)
+        if self._box is None:
+            self._box = self._make_bbox()
+        return self._box
+    
+    def _make_bbox(self):
+        """
+        Computes the bounding box of this rotated object
+        
+        :return: The bounding box for the shape
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        return _shape_bbox(self)
 
 
 #mark -
@@ -932,6 +952,18 @@ class GScene(GObject):
 
 
     # HIDDEN METHODS
+    def _bbox(self):
+        """
+        Computes the bounding box of this scene
+        
+        The size of a scene depends on its children, which can move without telling
+        the scene.  Hence this box is never cached.
+        
+        :return: The bounding box for the shape
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        return self._make_bbox()
+    
     def _reset(self):
         """
         Resets the drawing cache
@@ -544,7 +544,7 @@ class GPolygon(GPath):
         """
         Creates the mesh for this polygon
         """
-        size = len(self.points)/2
+        size = len(self.points)//2
         try:
             texture = Image(source=self.source).texture
             texture.wrap = 'repeat'
@@ -557,7 +557,7 @@ class GPolygon(GPath):
             # Create the fan.
             for x in range(size):
                 pt = self.points[2*x:2*x+2]
-                self._verts += pt+(pt[0]/tw+0.5,pt[1]/th+0.5)
+                verts += pt+(pt[0]/tw+0.5,pt[1]/th+0.5)
             
             # Come back to the beginning
             pt = self.points[0:2]
@@ -0,0 +1,270 @@
+"""
+A module to support frame-time profiling.
+
+A profiler records how long each phase of an animation frame takes (e.g. update and
+draw, or finer phases inside of them).  The most recent frames are kept in a ring buffer,
+so profiling can stay on in a running game without using more and more memory.  The
+buffer can be summarized (for an on-screen overlay) or dumped to a CSV or JSON file.
+
+This module does not depend on Kivy, so it is shared by every game2d backend.
+"""
+import time
+import json
+import csv
+import collections
+
+
+class _Phase(object):
+    """
+    A context manager that adds its running time to a phase of the current frame.
+    """
+
+    def __init__(self,profiler,name):
+        """
+        Creates a new phase timer.
+
+        :param profiler: The profiler to report to
+        :type profiler:  :class:`GProfiler`
+
+        :param name: The phase name
+        :type name:  ``str``
+        """
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self._profiler.record(self._name,time.perf_counter()-self._start)
+        return False
+
+
+class _NoPhase(object):
+    """
+    A context manager that does nothing (for a disabled profiler).
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        return False
+
+
+class GProfiler(object):
+    """
+    A class representing a frame-time profiler.
+
+    Each frame starts with :meth:`begin` and ends with :meth:`end`.  In between, code
+    is timed with the context manager returned by :meth:`phase`::
+
+        with profiler.phase('update'):
+            self.update(dt)
+
+    Times for the same phase in one frame are added together.  Phases may be nested
+    (e.g. ``'level.movefrog'`` inside of ``'update'``), but a phase may not be nested
+    inside itself.  The total time from :meth:`begin` to :meth:`end` is recorded as
+    the phase ``'frame'``.
+
+    A disabled profiler records nothing, and its phases cost almost nothing, so code
+    can always be instrumented.
+    """
+    # The phase name for the total frame time
+    FRAME = 'frame'
+
+    # MUTABLE PROPERTIES
+    @property
+    def enabled(self):
+        """
+        Whether this profiler is recording.
+
+        **invariant**: Value is a bool.
+        """
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._enabled = value
+
+    @property
+    def overlay(self):
+        """
+        Whether the game should show a summary of this profiler on screen.
+
+        **invariant**: Value is a bool.
+        """
+        return self._overlay
+
+    @overlay.setter
+    def overlay(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._overlay = value
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The number of frames kept in the ring buffer.
+
+        **invariant**: Value is an int > 0.
+        """
+        return self._frames.maxlen
+
+    @property
+    def names(self):
+        """
+        The phase names recorded so far, in the order they were first seen.
+
+        **invariant**: Value is a tuple of str.
+        """
+        return tuple(self._names)
+
+    @property
+    def count(self):
+        """
+        The total number of frames recorded (including those no longer in the buffer).
+
+        **invariant**: Value is an int >= 0.
+        """
+        return self._count
+
+    # BUILT-IN METHODS
+    def __init__(self,capacity=600,enabled=True,overlay=False):
+        """
+        Creates a new profiler.
+
+        :param capacity: The number of frames to keep
+        :type capacity:  ``int`` > 0
+
+        :param enabled: Whether to start recording immediately
+        :type enabled:  ``bool``
+
+        :param overlay: Whether the game should show a summary on screen
+        :type overlay:  ``bool``
+        """
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        self._frames = collections.deque(maxlen=capacity)
+        self._names  = []
+        self._phases = {}
+        self._nophase = _NoPhase()
+        self._current = None
+        self._start = 0.0
+        self._count = 0
+        self.enabled = enabled
+        self.overlay = overlay
+
+    # PUBLIC METHODS
+    def begin(self):
+        """
+        Starts recording a new frame.
+        """
+        if self._enabled:
+            self._current = {}
+            self._start = time.perf_counter()
+
+    def end(self):
+        """
+        Finishes recording the current frame, adding it to the ring buffer.
+        """
+        if self._enabled and not self._current is None:
+            self.record(self.FRAME,time.perf_counter()-self._start)
+            self._frames.append(self._current)
+            self._current = None
+            self._count += 1
+
+    def phase(self,name):
+        """
+        Returns a context manager that times the given phase of the current frame.
+
+        :param name: The phase name
+        :type name:  ``str``
+        """
+        if not self._enabled or self._current is None:
+            return self._nophase
+        if not name in self._phases:
+            self._phases[name] = _Phase(self,name)
+        return self._phases[name]
+
+    def record(self,name,seconds):
+        """
+        Adds the given time to a phase of the current frame.
+
+        :param name: The phase name
+        :type name:  ``str``
+
+        :param seconds: The time to add
+        :type seconds:  ``float``
+        """
+        if self._current is None:
+            return
+        if not name in self._current:
+            if not name in self._names:
+                self._names.append(name)
+            self._current[name] = seconds
+        else:
+            self._current[name] += seconds
+
+    def clear(self):
+        """
+        Removes every recorded frame.
+        """
+        self._frames.clear()
+        self._current = None
+        self._count = 0
+
+    def stats(self):
+        """
+        Returns a dictionary of (mean, max, last) times in seconds for each phase.
+
+        The statistics are over the frames in the ring buffer.  A frame that skipped a
+        phase counts as 0 for that phase.
+        """
+        result = {}
+        size = len(self._frames)
+        if size == 0:
+            return result
+
+        last = self._frames[-1]
+        for name in self._names:
+            values = [frame.get(name,0.0) for frame in self._frames]
+            result[name] = (sum(values)/size, max(values), last.get(name,0.0))
+        return result
+
+    def report(self):
+        """
+        Returns a short text summary of the ring buffer (in milliseconds).
+
+        There is one line per phase, with the mean, maximum and last time.
+        """
+        stats = self.stats()
+        lines = ['%-16s %6s %6s %6s' % ('ms', 'mean', 'max', 'last')]
+        for name in self._names:
+            if name in stats:
+                (mean, most, last) = stats[name]
+                lines.append('%-16s %6.2f %6.2f %6.2f' % (name, mean*1000, most*1000, last*1000))
+        return '\n'.join(lines)
+
+    def dump(self,path):
+        """
+        Writes every frame in the ring buffer to a file.
+
+        If ``path`` ends in ``.json``, the file is a JSON object with the phase names
+        and one list of times (in seconds) per frame.  Otherwise, it is a CSV file with
+        one row per frame and one column per phase.
+
+        :param path: The file to write
+        :type path:  ``str``
+        """
+        rows = [[frame.get(name,0.0) for name in self._names] for frame in self._frames]
+        if path[-5:].lower() == '.json':
+            with open(path,'w') as file:
+                json.dump({'phases':self._names, 'frames':rows},file)
+        else:
+            with open(path,'w',newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(self._names)
+                writer.writerows(rows)
@@ -10,9 +10,11 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from kivy.uix.label import Label
+from kivy.metrics import sp
 from kivy.uix.image import Image
-from .gobject import GObject
+from introcs.geom import Point2
+from .gobject import GObject, is_num_tuple
+from .gaffine import apply as _apply
 from .app import GameApp
 
 class GRectangle(GObject):
@@ -142,9 +144,9 @@ class GEllipse(GRectangle):
         **Warning**: Using this method on a rotated object may slow down your framerate.
         
         :param point: the point to check
-        :type point: :class:`GPoint`` or a pair of numbers
+        :type point: :class:`Point2` or a pair of numbers
         """
-        if isinstance(point,GPoint):
+        if isinstance(point,Point2):
             point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
         
@@ -154,7 +156,7 @@ class GEllipse(GRectangle):
             dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
             dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
         else:
-            p = self.matrix.inverse()._transform(point[0],point[1])
+            p = _apply(self._inverse(),point[0],point[1])
             dx = p[0]*p[0]/(rx*rx)
             dy = p[1]*p[1]/(ry*ry)
         
@@ -300,7 +302,10 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    Labels with the same text, font and alignment share one rendered texture (see
+    :meth:`GameApp.load_label`), so making the same label again is cheap."""
     
     # MUTABLE PROPERTIES
     @property
@@ -315,8 +320,9 @@ class GLabel(GRectangle):
     def font_size(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
-        self._label.font_size = value
-        self._label.texture_update()
+        self._texture = False
+        if self._defined:
+            self._reset()
     
     @property
     def font_name(self):
@@ -324,14 +330,15 @@ class GLabel(GRectangle):
         The file name for the .ttf file to use as a font
         
         **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
-        return self._label.font_name
+        return self._fname
     
     @font_name.setter
     def font_name(self,value):
-        from .app import GameApp
         assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
-        self._label.font_name = value
-        self._label.texture_update()
+        self._fname = value
+        self._texture = False
+        if self._defined:
+            self._reset()
     
     @property
     def bold(self):
@@ -343,13 +350,15 @@ class GLabel(GRectangle):
         `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
         
         **Invariant**: Must be a boolean"""
-        return self._label.bold
+        return self._bold
 
     @bold.setter
     def bold(self,value):
         assert type(value) == bool, repr(value)+' is not a bool'
-        self._label.bold = value
-        self._label.texture_update()
+        self._bold = value
+        self._texture = False
+        if self._defined:
+            self._reset()
 
     @property
     def text(self):
@@ -361,13 +370,15 @@ class GLabel(GRectangle):
         this label will grow to ensure that the text will fit in the rectangle.
         
         **Invariant**: Must be a string"""
-        return self._label.text
+        return self._text
     
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
-        self._label.text = value
-        self._label.texture_update()
+        self._text = value
+        self._texture = False
+        if self._defined:
+            self._reset()
     
     @property
     def halign(self):
@@ -389,7 +400,7 @@ class GLabel(GRectangle):
     def halign(self,value):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
-        self._label.halign = value
+        self._texture = False
         if self._defined:
             self._reset()
     
@@ -413,7 +424,6 @@ class GLabel(GRectangle):
     def valign(self,value):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
-        self._label.valign = value
         if self._defined:
             self._reset()
     
@@ -432,6 +442,7 @@ class GLabel(GRectangle):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.x = float(value)
         self._mtrue = False
+        self._box = None
         self._hanchor = 'center'
         self._ha = value
     
@@ -448,6 +459,7 @@ class GLabel(GRectangle):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.y = float(value)
         self._mtrue = False
+        self._box = None
         self._vanchor = 'center'
         self._hv = value
     
@@ -593,19 +605,18 @@ class GLabel(GRectangle):
         
         This class supports the all same keywords as :class:`GRectangle`, as well as 
         additional attributes for the text properties (e.g. font size and name).
+        The text is only rendered once, after all of the keywords are set.
         """
         self._defined = False
         self._hanchor = 'center'
         self._vanchor = 'center'
         
-        sanitized = {}
-        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom']
-        for key in keywords:
-            if not key in excludes:
-                sanitized[key] = keywords[key]
-        
-        self._label = Label(**sanitized)
-        self._label.size_hint = (None,None)
+        # The text properties (no setters, so nothing is rendered until _reset)
+        self._text  = keywords['text'] if 'text' in keywords else ''
+        self._fname = keywords['font_name'] if 'font_name' in keywords else 'Roboto'
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else sp(15)
+        self._bold  = keywords['bold'] if 'bold' in keywords else False
+        self._texture = False
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.halign = keywords['halign'] if 'halign' in keywords else 'center'
@@ -616,7 +627,6 @@ class GLabel(GRectangle):
             self.linecolor = (0,0,0,1)
         self._reset()
         self._defined = True
-        self._label.bind(texture_size=self._callback)
     
     def __str__(self):
         """
@@ -631,27 +641,27 @@ class GLabel(GRectangle):
                 % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
     
     # HIDDEN METHODS
-    def _callback(self,instance=None,value=None):
-        """
-        A workaround to deal with parameter requirements for callbacks
-        """
-        if self._defined:
-            self._reset()
-    
     def _reset(self):
         """
         Resets the drawing cache.
+        
+        The text is rendered (or taken from the label cache) only if a text property
+        changed since the last reset.
         """
-        # Set up the label at the center.
-        self._label.size = self._label.texture_size
-        self._label.center = (0,0)
-        if self.linecolor:
-            self._label.color = self.linecolor
+        # The attribute _texture is False when the text must be rendered again
+        if self._texture is False:
+            self._texture = GameApp.load_label(self._text,self._fname,self._fsize,
+                                               self._bold,self._halign)
+        if self._texture is None:
+            (tw, th) = (0, 0)
+        else:
+            (tw, th) = self._texture.size
         
         # Resize the outside if necessary
         self._defined = False
-        self._width  = max(self.width, self._label.width)
-        self._height = max(self.height,self._label.height)
+        self._width  = max(self.width, tw)
+        self._height = max(self.height,th)
+        self._box = None
         self._defined = True
         
         # Reset the absolute anchor
@@ -666,17 +676,19 @@ class GLabel(GRectangle):
         elif self._vanchor == 'bottom':
             self._trans.y = self._hv+self.height/2.0
         
-        # Reset the label anchor.
+        # Anchor the text inside the label (at whole pixels, like a Kivy label)
         if self.halign == 'left':
-            self._label.x = -self.width/2.0
+            tx = -self.width/2.0
         elif self.halign == 'right':
-            self._label.right = self.width/2.0
-        
-        # Reset the label anchor.
+            tx = self.width/2.0-tw
+        else:
+            tx = -tw/2.0
         if self.valign == 'top':
-            self._label.top = self.height/2.0
+            ty = self.height/2.0-th
         elif self.valign == 'bottom':
-            self._label.bottom = -self.height/2.0
+            ty = -self.height/2.0
+        else:
+            ty = -th/2.0
         
         GObject._reset(self)
         x = -self.width/2.0
@@ -687,7 +699,10 @@ class GLabel(GRectangle):
             self._cache.add(self._fillcolor)
             self._cache.add(fill)
         
-        self._cache.add(self._label.canvas)
+        # The text is rendered in white, so the line color tints it
+        if not self._texture is None:
+            self._cache.add(self._linecolor or Color(0,0,0,1))
+            self._cache.add(Rectangle(texture=self._texture,pos=(int(tx),int(ty)),size=(tw,th)))
         
         if self._linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
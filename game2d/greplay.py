@@ -0,0 +1,371 @@
+"""
+A module to support recorded input.
+
+A :class:`GRecorder` watches the key state of an input handler while a game is played,
+and writes every change (a key going down or up) to a compact binary log.  A
+:class:`GReplayInput` reads that log back as an input handler, so the same game can be
+played again without a keyboard.  If the game is deterministic, the replay is an exact
+copy of the original, which makes replays useful for regression tests.  A replay does
+not have to run in real time either: with the headless backend it runs as fast as the
+game can update.
+
+The log starts with a header (a magic number, a version, the fixed time step and a tag
+naming what was recorded).  It is followed by a stream of small records, in the order
+the frames were played.  Key names are stored once, the first time each key is used,
+and key changes refer to them by number.  If the game did not use a fixed time step,
+there is also one record per frame with its time step.  The log ends with the number of
+frames that were recorded.
+
+This module does not depend on Kivy, so it is shared by every game2d backend.
+"""
+import struct
+
+from .gkeys import GKeyInput
+
+
+# The header: magic number, version, time step (0 if not fixed), tag length
+HEADER  = struct.Struct('<4sHdH')
+MAGIC   = b'G2DR'
+VERSION = 1
+
+# The record kinds (each record starts with its kind as a single byte)
+RECORD_NAME = 1     # A new key name: length, then the name in UTF-8
+RECORD_DOWN = 2     # A key went down: frame, key number
+RECORD_UP   = 3     # A key went up: frame, key number
+RECORD_TIME = 4     # The time step of a frame: frame, seconds
+RECORD_END  = 5     # The end of the log: number of frames
+
+# The layout of each record (after the kind)
+_NAME = struct.Struct('<B')
+_KEY  = struct.Struct('<IH')
+_TIME = struct.Struct('<Id')
+_END  = struct.Struct('<I')
+
+
+class GRecorder(object):
+    """
+    A class representing a recording of the keys of an input handler.
+
+    Call :meth:`capture` once per update, **before** the game reads the input for that
+    update.  The recorder compares the key state of its input with the state it saw
+    last time, and adds a record for every key that changed.  It never changes the
+    input, so it can record a game while it is being played.
+
+    The recording is kept in memory until it is saved with :meth:`save` (or taken as
+    bytes with :meth:`tobytes`).  It is very small: seven bytes per key change, plus
+    thirteen bytes per frame if the game does not use a fixed time step.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def tag(self):
+        """
+        A short description of what was recorded (e.g. the level file).
+
+        **invariant**: Value is a str.
+        """
+        return self._tag
+
+    @tag.setter
+    def tag(self,value):
+        assert type(value) == str, '%s is not a string' % repr(value)
+        self._tag = value
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def input(self):
+        """
+        The input handler being recorded.
+
+        **invariant**: Value is a :class:`GKeyInput`.
+        """
+        return self._input
+
+    @property
+    def timestep(self):
+        """
+        The fixed time step of every frame, or None if each frame records its own.
+
+        **invariant**: Value is a float > 0 or None.
+        """
+        return self._timestep
+
+    @property
+    def frames(self):
+        """
+        The number of frames captured so far.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return self._frames
+
+    # BUILT-IN METHODS
+    def __init__(self,input,timestep=None,tag=''):
+        """
+        Creates a new recorder for the given input handler.
+
+        :param input: The input handler to record
+        :type input:  :class:`GKeyInput`
+
+        :param timestep: The fixed time step of every frame (None if not fixed)
+        :type timestep:  ``int`` or ``float`` > 0, or None
+
+        :param tag: A short description of what is recorded
+        :type tag:  ``str``
+        """
+        assert isinstance(input,GKeyInput), '%s is not an input handler' % repr(input)
+        assert timestep is None or (type(timestep) in [int,float] and timestep > 0), \
+            '%s is not a valid time step' % repr(timestep)
+        self._input = input
+        self._timestep = None if timestep is None else float(timestep)
+        self.tag = tag
+        self.clear()
+
+    # PUBLIC METHODS
+    def capture(self,dt=None):
+        """
+        Records the key changes since the last capture, and starts a new frame.
+
+        :param dt: The time step of this frame (ignored if the time step is fixed)
+        :type dt:  ``int`` or ``float``
+        """
+        state = self._input._keystate
+        last  = self._last
+        frame = self._frames
+        buffer = self._buffer
+        for key in state:
+            down = bool(state[key])
+            if down != last.get(key,False):
+                self._write_key(key,frame,down)
+                last[key] = down
+        for key in last:
+            if last[key] and not key in state:
+                self._write_key(key,frame,False)
+                last[key] = False
+        if self._timestep is None:
+            buffer.append(RECORD_TIME)
+            buffer += _TIME.pack(frame,0.0 if dt is None else dt)
+        self._frames += 1
+
+    def clear(self):
+        """
+        Removes everything recorded so far.
+
+        Keys that are held down at the next capture are recorded as going down then.
+        """
+        self._buffer = bytearray()
+        self._names = {}
+        self._last = {}
+        self._frames = 0
+
+    def tobytes(self):
+        """
+        Returns the recording as a binary log.
+        """
+        tag = self._tag.encode('utf-8')
+        step = 0.0 if self._timestep is None else self._timestep
+        data = bytearray(HEADER.pack(MAGIC,VERSION,step,len(tag)))
+        data += tag
+        data += self._buffer
+        data.append(RECORD_END)
+        data += _END.pack(self._frames)
+        return bytes(data)
+
+    def save(self,path):
+        """
+        Writes the recording to a binary log file.
+
+        :param path: The file to write
+        :type path:  ``str``
+        """
+        with open(path,'wb') as file:
+            file.write(self.tobytes())
+
+    # HIDDEN METHODS
+    def _write_key(self,key,frame,down):
+        """
+        Adds a key change to the recording (and the key name, if it is new).
+
+        :param key: The key name
+        :type key:  ``str``
+
+        :param frame: The frame of the change
+        :type frame:  ``int`` >= 0
+
+        :param down: Whether the key went down (instead of up)
+        :type down:  ``bool``
+        """
+        buffer = self._buffer
+        if not key in self._names:
+            name = key.encode('utf-8')
+            self._names[key] = len(self._names)
+            buffer.append(RECORD_NAME)
+            buffer += _NAME.pack(len(name))
+            buffer += name
+        buffer.append(RECORD_DOWN if down else RECORD_UP)
+        buffer += _KEY.pack(frame,self._names[key])
+
+
+class GReplayInput(GKeyInput):
+    """
+    A class representing an input handler that plays back a recording.
+
+    The handler starts at frame 0 of the recording, with the keys that were held down
+    in that frame.  Each call to :meth:`refresh` (which the game makes after every
+    update) moves it to the next frame.  The property :attr:`dt` is the time step of
+    the current frame, so a replay can be stepped with the same times as the original.
+
+    There is no mouse, so :attr:`touch` is always None.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def tag(self):
+        """
+        The description of what was recorded.
+
+        **invariant**: Value is a str.
+        """
+        return self._tag
+
+    @property
+    def timestep(self):
+        """
+        The fixed time step of every frame, or None if each frame has its own.
+
+        **invariant**: Value is a float > 0 or None.
+        """
+        return self._timestep
+
+    @property
+    def frames(self):
+        """
+        The number of frames in the recording.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def frame(self):
+        """
+        The current frame of the recording.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return self._frame
+
+    @property
+    def done(self):
+        """
+        Whether every frame of the recording has been played.
+
+        **invariant**: Value is a bool.
+        """
+        return self._frame >= self._frames
+
+    @property
+    def dt(self):
+        """
+        The time step of the current frame in seconds.
+
+        This is 0 once the recording is done.
+
+        **invariant**: Value is a float >= 0.
+        """
+        if self._timestep is None:
+            return self._times[self._frame] if self._frame < self._frames else 0.0
+        return self._timestep if self._frame < self._frames else 0.0
+
+    # BUILT-IN METHODS
+    def __init__(self,source):
+        """
+        Creates a new input handler from a recording.
+
+        :param source: The binary log file, or its contents
+        :type source:  ``str`` or ``bytes``
+        """
+        GKeyInput.__init__(self)
+        if type(source) == str:
+            with open(source,'rb') as file:
+                source = file.read()
+        self._parse(bytes(source))
+        self.rewind()
+
+    # PUBLIC METHODS
+    def refresh(self):
+        """
+        Ends the current animation frame, and moves to the next frame of the recording.
+        """
+        GKeyInput.refresh(self)
+        if self._frame < self._frames:
+            self._frame += 1
+            self._apply()
+
+    def rewind(self):
+        """
+        Returns to the first frame of the recording, with its keys held down.
+        """
+        self._prvstate.clear()
+        self._keystate.clear()
+        self._keycount = 0
+        self._frame = 0
+        self._apply()
+
+    # HIDDEN METHODS
+    def _apply(self):
+        """
+        Changes the key state to the keys of the current frame.
+        """
+        for (key, down) in self._changes.get(self._frame,()):
+            if down != self._keystate.get(key,False):
+                self._keycount += 1 if down else -1
+            self._keystate[key] = down
+
+    def _parse(self,data):
+        """
+        Reads a binary log into this handler.
+
+        :param data: The contents of the log
+        :type data:  ``bytes``
+        """
+        assert len(data) >= HEADER.size, 'the recording is too short'
+        (magic, version, step, size) = HEADER.unpack_from(data,0)
+        assert magic == MAGIC, 'the data is not a game2d recording'
+        assert version == VERSION, 'recording version %d is not supported' % version
+
+        pos = HEADER.size
+        self._tag = data[pos:pos+size].decode('utf-8')
+        self._timestep = step if step > 0 else None
+        pos += size
+
+        names = []
+        changes = {}
+        times = []
+        frames = None
+        while frames is None:
+            assert pos < len(data), 'the recording is truncated'
+            kind = data[pos]
+            pos += 1
+            if kind == RECORD_NAME:
+                (size,) = _NAME.unpack_from(data,pos)
+                pos += _NAME.size
+                names.append(data[pos:pos+size].decode('utf-8'))
+                pos += size
+            elif kind == RECORD_DOWN or kind == RECORD_UP:
+                (frame, key) = _KEY.unpack_from(data,pos)
+                pos += _KEY.size
+                changes.setdefault(frame,[]).append((names[key],kind == RECORD_DOWN))
+            elif kind == RECORD_TIME:
+                (frame, dt) = _TIME.unpack_from(data,pos)
+                pos += _TIME.size
+                times.append(dt)
+            elif kind == RECORD_END:
+                (frames,) = _END.unpack_from(data,pos)
+                pos += _END.size
+            else:
+                assert False, 'the recording has an unknown record %d' % kind
+
+        self._changes = changes
+        self._times = times
+        self._frames = frames
@@ -0,0 +1,141 @@
+"""
+A module of the geometry shared by every game object.
+
+Objects in both backends, as well as bodies, answer the same geometric questions: the
+bounding box of their hitbox, whether they collide with another object, and whether
+they contain a point.  The answers must agree exactly between the backends (a headless
+simulation is only useful if it plays the same game), so they are computed once, here.
+
+The functions in this module work on any object with the attributes ``x``, ``y``,
+``width``, ``height``, ``angle`` and ``hitbox`` (None or a 4-element tuple of
+offsets), the attributes ``COLLIDER``, ``_aligned`` and ``_box`` (the cached bounding
+box, or None), and the methods ``_bbox``, ``_affine``, ``_inverse`` and
+``_composite``.  Each class decides what to cache; these functions only compute.
+
+This module does not depend on Kivy, so it is shared by every game2d backend.
+"""
+from .gaffine import apply
+from .gsat import collides as _sat_collides
+
+
+def bbox(obj):
+    """
+    Computes the bounding box of the hitbox of obj
+
+    The bounding box is returned as a tuple (l,t,r,b).  Objects rotated by a multiple
+    of 90 degrees do not need their transform, which makes their box cheap.
+
+    :param obj: the object
+    :type obj:  :class:`GObject` or :class:`GBody`
+
+    :return: The bounding box for the object
+    :rtype:  ``tuple`` of four ``float`` values
+    """
+    oangle = obj.angle % 360
+    hit = (0,0,0,0) if obj.hitbox is None else obj.hitbox
+    x = obj.x
+    y = obj.y
+    w = obj.width/2.0
+    h = obj.height/2.0
+    if oangle == 0:
+        return (x + hit[0] - w, y - hit[1] + h, x - hit[2] + w, y + hit[3] - h)
+    elif oangle == 90:
+        return (x + hit[1] - h, y + hit[2] - w, x - hit[3] + h, y - hit[0] + w)
+    elif oangle == 180:
+        return (x + hit[2] - w, y - hit[3] + h, x - hit[0] + w, y + hit[1] - h)
+    elif oangle == 270:
+        return (x + hit[3] - h, y + hit[0] - w, x - hit[1] + h, y - hit[2] + w)
+
+    comp = obj._affine()
+    p0 = apply(comp,-w+hit[0], h-hit[1])
+    p1 = apply(comp, w-hit[2], h-hit[1])
+    p2 = apply(comp, w-hit[2],-h+hit[3])
+    p3 = apply(comp,-w+hit[0],-h+hit[3])
+    return (min(p0[0],p1[0],p2[0],p3[0]), max(p0[1],p1[1],p2[1],p3[1]),
+            max(p0[0],p1[0],p2[0],p3[0]), min(p0[1],p1[1],p2[1],p3[1]))
+
+
+def collides(obj1,obj2):
+    """
+    Returns True if the hitboxes of the two objects collide
+
+    If both objects are rotated by a multiple of 90 degrees, this compares their
+    bounding boxes.  Otherwise it uses the test selected by ``obj1.COLLIDER``: 'sat'
+    is exact (see :mod:`game2d.gsat`), while 'edges' moves the edges of the hitbox of
+    ``obj2`` into the space of ``obj1``, and checks whether the bounding box of each
+    edge overlaps the hitbox of ``obj1``.
+
+    :param obj1: the first object
+    :type obj1:  :class:`GObject` or :class:`GBody`
+
+    :param obj2: the second object
+    :type obj2:  :class:`GObject` or :class:`GBody`
+
+    :return: True if the objects collide
+    :rtype:  ``bool``
+    """
+    # Optimize for 90 degree turns (using the cached bounding boxes)
+    if obj1._aligned and obj2._aligned:
+        (l0,t0,r0,b0) = obj2._box or obj2._bbox()
+        (l1,t1,r1,b1) = obj1._box or obj1._bbox()
+        return (l1 <= l0 <= r1 or l0 <= l1 <= r0) and (b1 <= b0 <= t1 or b0 <= b1 <= t0)
+
+    # The exact test, if selected
+    if obj1.COLLIDER == 'sat':
+        return _sat_collides(obj1,obj2)
+
+    h1 = (0,0,0,0) if obj1.hitbox is None else obj1.hitbox
+    h2 = (0,0,0,0) if obj2.hitbox is None else obj2.hitbox
+
+    comp = obj1._composite(obj2)
+    w = obj2.width/2.0
+    h = obj2.height/2.0
+    p0 = apply(comp,-w+h2[0], h-h2[1])
+    p1 = apply(comp, w-h2[2], h-h2[1])
+    p2 = apply(comp, w-h2[2],-h+h2[3])
+    p3 = apply(comp,-w+h2[0],-h+h2[3])
+
+    sides = ((p0,p1),(p1,p2),(p2,p3),(p3,p0))
+    l1 = -obj1.width/2.0  + h1[0]
+    r1 =  obj1.width/2.0  - h1[2]
+    t1 =  obj1.height/2.0 - h1[1]
+    b1 = -obj1.height/2.0 + h1[3]
+    for s in sides:
+        l0 = min(s[0][0],s[1][0])
+        r0 = max(s[0][0],s[1][0])
+        b0 = min(s[0][1],s[1][1])
+        t0 = max(s[0][1],s[1][1])
+        isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
+        isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
+        if isx and isy:
+            return True
+
+    return False
+
+
+def contains(obj,point):
+    """
+    Returns True if the hitbox of obj contains the point
+
+    :param obj: the object
+    :type obj:  :class:`GObject` or :class:`GBody`
+
+    :param point: the point to check
+    :type point:  a pair of numbers
+
+    :return: True if the object contains the point
+    :rtype:  ``bool``
+    """
+    # Optimize for 90 degree turns
+    if obj._aligned:
+        (l,t,r,b) = obj._box or obj._bbox()
+        return l <= point[0] <= r and b <= point[1] <= t
+
+    # Transform the point to the space of the object
+    hit = (0,0,0,0) if obj.hitbox is None else obj.hitbox
+    point = apply(obj._inverse(),point[0],point[1])
+    w = obj.width/2.0
+    h = obj.height/2.0
+    isx = - w + hit[0] <= point[0] <= w - hit[2]
+    isy = - h + hit[3] <= point[1] <= h - hit[1]
+    return isx and isy
@@ -130,7 +130,7 @@ class GSprite(GRectangle):
     def hitboxes(self,value):
         if value is None:
             self._hitboxes = None
-            self._hitbox   = None
+            self.hitbox    = None
             return
         
         try:
@@ -182,23 +182,16 @@ class GSprite(GRectangle):
         """
         GObject._reset(self)
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
+        # The frames are shared by every sprite on this sheet (see GameApp.load_regions)
+        regions = GameApp.load_regions(self.source,self._format)
+        if regions:
+            texture = GameApp.load_texture(self.source)
             if (self.width == 0 or self.height == 0):
-                self.width  = width
-                self.height = height
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+                self.width  = texture.width/self._format[1]
+                self.height = texture.height/self._format[0]
+            self._images = regions
         else:
-            print('Failed to load',repr(self.source))
+            raise IOError('Cannot load sprite sheet %s' % repr(self.source))
         
         x = -self.width/2.0
         y = -self.height/2.0
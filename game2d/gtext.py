@@ -0,0 +1,352 @@
+"""
+A module to support text that changes every frame.
+
+A :class:`GLabel` renders its whole text into a texture, so a label whose text changes
+every frame (a score, a timer, a frame rate) renders a new texture every frame.  A
+:class:`GText` draws from a glyph atlas instead: every character of a font is rendered
+once, side by side, into a single texture.  The text is then laid out as one quad per
+character in a single mesh, so changing the text only rewrites the vertices of the
+mesh, and no font is rendered at all.
+
+Atlases are shared through :meth:`GameApp.load_glyphs`, so every :class:`GText` with
+the same font, size and characters draws from the same texture.  Characters are placed
+by their advance, without kerning, which suits short readouts.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .app import GameApp
+import numpy as np
+
+
+# The characters in an atlas by default (printable ASCII)
+GLYPHS = ''.join(chr(code) for code in range(32,127))
+
+# The widest row of glyphs in an atlas texture
+GLYPH_WIDTH = 1024
+
+# The padding (in pixels) around each glyph, to prevent filtering artifacts
+GLYPH_PADDING = 2
+
+
+class GlyphAtlas(object):
+    """
+    A class representing the characters of one font, rendered into a single texture.
+
+    The characters are rendered in white, so that they can be drawn in any color.  The
+    attribute ``glyphs`` maps each character to a tuple ``(advance, height, u0, v0, u1,
+    v1)``, where ``advance`` and ``height`` are its size in pixels, (u0,v0) are the
+    texture coordinates of its bottom left corner and (u1,v1) are those of its top right
+    corner.  Glyphs share their top edge, but a few (such as parentheses) may be taller
+    than the others.  The attribute ``height`` is the tallest, and it is used as the
+    height of every line, so that a line does not move when its characters change.
+
+    Atlases are built by :meth:`GameApp.load_glyphs`, which caches them.
+    """
+
+    def __init__(self,font_name,font_size,chars=GLYPHS):
+        """
+        Renders the given characters of a font into a new atlas.
+
+        :param font_name: The font file name (or the name of a Kivy font)
+        :type font_name:  ``str``
+
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float``
+
+        :param chars: The characters to render
+        :type chars:  ``str``
+        """
+        from kivy.core.text import Label
+        from kivy.graphics.texture import Texture
+
+        # Render each character on its own (pixel rows are top first)
+        images = []
+        for char in dict.fromkeys(chars):
+            label = Label(text=char,font_name=font_name,font_size=font_size)
+            label.refresh()
+            texture = label.texture
+            if texture is None:
+                continue
+            (w, h) = texture.size
+            pixels = np.frombuffer(texture.pixels,dtype=np.uint8).reshape(h,w,4)
+            images.append((char,pixels))
+
+        # Pack them in rows, left to right
+        height = max([pixels.shape[0] for (char,pixels) in images]+[1])
+        places = []
+        x = GLYPH_PADDING
+        y = GLYPH_PADDING
+        for (char,pixels) in images:
+            w = pixels.shape[1]
+            if x+w+GLYPH_PADDING > GLYPH_WIDTH and x > GLYPH_PADDING:
+                x = GLYPH_PADDING
+                y += height+GLYPH_PADDING
+            places.append((x,y))
+            x += w+GLYPH_PADDING
+        size = (GLYPH_WIDTH, y+height+GLYPH_PADDING)
+
+        data = np.zeros((size[1],size[0],4),dtype=np.uint8)
+        self.glyphs = {}
+        for ((char,pixels),(x,y)) in zip(images,places):
+            (h, w) = pixels.shape[:2]
+            data[y:y+h,x:x+w] = pixels
+            # The texture is drawn upside down (row 0 at the top of each glyph)
+            self.glyphs[char] = (float(w),float(h),x/size[0],(y+h)/size[1],(x+w)/size[0],y/size[1])
+
+        self.texture = Texture.create(size=size,colorfmt='rgba')
+        self.texture.blit_buffer(data.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+        self.height = float(height)
+
+    def measure(self,text):
+        """
+        Returns the size (width, height) of the given text in this font
+
+        Lines are separated by ``'\\n'``.  Characters that are not in the atlas take no
+        space.
+
+        :param text: The text to measure
+        :type text:  ``str``
+
+        :return: The width and height in pixels
+        :rtype:  ``tuple`` of two ``float``
+        """
+        glyphs = self.glyphs
+        lines = text.split('\n')
+        width = 0.0
+        for line in lines:
+            width = max(width,sum(glyphs[char][0] for char in line if char in glyphs))
+        return (width, self.height*len(lines))
+
+
+#mark -
+class GText(GObject):
+    """
+    A class representing text that can change every frame.
+
+    This object is like a :class:`GLabel`, except that it draws from a glyph atlas, so
+    that changing :attr:`text` is cheap.  The font and size are fixed when the object is
+    made, and so are the characters it can draw (the attribute ``chars``, which is
+    printable ASCII by default).  Characters that are not in the atlas are left out.
+
+    The size of this object does not change with its text, so that a changing readout
+    does not move.  If the ``width`` and ``height`` are not given, they are the size of
+    the initial text.  The text is aligned inside of the rectangle by :attr:`halign`
+    and :attr:`valign`.  As with :class:`GLabel`, `linecolor` is the color of the text
+    and `fillcolor` is the background color.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text for this object.
+
+        Lines are separated by the escape character `'\\n'`.  Changing the text only
+        rewrites the vertices of the mesh.
+
+        **Invariant**: Must be a string"""
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value == self._text:
+            return
+        self._text = value
+        if self._defined:
+            self._layout()
+
+    @property
+    def halign(self):
+        """
+        The horizontal alignment of the text inside of this object.
+
+        **Invariant**: Must be one of 'left', 'right', or 'center'"""
+        return self._halign
+
+    @halign.setter
+    def halign(self,value):
+        assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
+        self._halign = value
+        if self._defined:
+            self._layout()
+
+    @property
+    def valign(self):
+        """
+        The vertical alignment of the text inside of this object.
+
+        **Invariant**: Must be one of 'top', 'bottom', or 'middle'"""
+        return self._valign
+
+    @valign.setter
+    def valign(self,value):
+        assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
+        self._valign = value
+        if self._defined:
+            self._layout()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def font_name(self):
+        """
+        The file name for the .ttf file of the font.
+
+        **Immutable**: This value cannot be changed after the object is made.
+
+        **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
+        return self._fname
+
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+
+        **Immutable**: This value cannot be changed after the object is made.
+
+        **Invariant**: Must be a positive number (int or float)"""
+        return self._fsize
+
+    @property
+    def chars(self):
+        """
+        The characters that this object can draw.
+
+        **Immutable**: This value cannot be changed after the object is made.
+
+        **Invariant**: Must be a nonempty string"""
+        return self._chars
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new text object.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example::
+
+            GText(text='SCORE 0',font_name='AlloyInk.ttf',font_size=24,width=200)
+
+        This class supports the all same keywords as :class:`GObject`, as well as
+        ``text``, ``font_name``, ``font_size``, ``chars``, ``halign`` and ``valign``.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._text  = ''
+        self._fname = keywords['font_name'] if 'font_name' in keywords else 'Roboto'
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else 15
+        self._chars = keywords['chars'] if 'chars' in keywords else GLYPHS
+        assert type(self._fsize) in [int,float] and self._fsize > 0, \
+            'value %s is not a valid font size' % repr(self._fsize)
+        assert type(self._chars) == str and self._chars, \
+            'value %s is not a valid string of characters' % repr(self._chars)
+        self._atlas = GameApp.load_glyphs(self._fname,self._fsize,self._chars)
+
+        self.text   = keywords['text'] if 'text' in keywords else ''
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
+        self.valign = keywords['valign'] if 'valign' in keywords else 'middle'
+
+        # The size is that of the initial text, unless it is given
+        keywords = dict(keywords)
+        (w, h) = self._atlas.measure(self._text)
+        if not 'width' in keywords:
+            keywords['width'] = max(w,1.0)
+        if not 'height' in keywords:
+            keywords['height'] = max(h,1.0)
+
+        GObject.__init__(self,**keywords)
+        if not self.linecolor:
+            self.linecolor = (0,0,0,1)
+        self._reset()
+        self._defined = True
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        x = -self.width/2.0
+        y = -self.height/2.0
+
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+            self._cache.add(Rectangle(pos=(x,y),size=(self.width,self.height)))
+
+        # The glyphs are white, so the line color tints them
+        self._mesh = Mesh(mode='triangles',texture=self._atlas.texture)
+        self._cache.add(self._linecolor or Color(0,0,0,1))
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
+        self._layout()
+
+    def _layout(self):
+        """
+        Writes a quad for every character of the text into the mesh.
+
+        Each line is aligned by :attr:`halign`, and the block of lines by :attr:`valign`.
+        The corners are rounded to whole pixels, so the glyphs are not blurred.
+        """
+        glyphs = self._atlas.glyphs
+        height = self._atlas.height
+        lines = self._text.split('\n')
+
+        if self._valign == 'top':
+            top = self.height/2.0
+        elif self._valign == 'bottom':
+            top = -self.height/2.0+height*len(lines)
+        else:
+            top = height*len(lines)/2.0
+
+        vert = []
+        for (pos, line) in enumerate(lines):
+            width = sum(glyphs[char][0] for char in line if char in glyphs)
+            if self._halign == 'left':
+                x = -self.width/2.0
+            elif self._halign == 'right':
+                x = self.width/2.0-width
+            else:
+                x = -width/2.0
+            x = int(x)
+            y1 = int(top-(pos+1)*height)+height
+            for char in line:
+                if char in glyphs:
+                    (w, h, u0, v0, u1, v1) = glyphs[char]
+                    y0 = y1-h
+                    vert.extend((x,y0,u0,v0, x+w,y0,u1,v0, x+w,y1,u1,v1, x,y1,u0,v1))
+                    x += w
+
+        count = len(vert)//16
+        self._mesh.vertices = vert
+        self._mesh.indices = _indices(count)
+
+
+def _indices(count):
+    """
+    Returns the mesh indices for the given number of quads (two triangles each)
+
+    :param count: The number of quads
+    :type count:  ``int`` >= 0
+    """
+    global _INDICES
+    if count*6 > len(_INDICES):
+        _INDICES = (np.arange(max(count,2*len(_INDICES)//6)).reshape(-1,1)*4+[0,1,2,2,3,0]).ravel().tolist()
+    return _INDICES[:count*6]
+
+# The shared indices of the quads in every mesh (grown as needed)
+_INDICES = []
@@ -118,6 +118,10 @@ class GTile(GObject):
         rng_x = size_x+1 if rem_x > 0 else size_x
         rng_y = size_y+1 if rem_y > 0 else size_y
         
+        # The texture may be a region of an atlas, so map through its coordinates
+        (u0, v0, u1, v1, u2, v2, u3, v3) = self._texture.tex_coords
+        uv = lambda i, j : (u0+i*(u1-u0)+j*(u3-u0), v0+i*(v1-v0)+j*(v3-v0))
+        
         vert = []
         indx = []
         pos = 0
@@ -125,10 +129,10 @@ class GTile(GObject):
             for jj in range(rng_y):
                 ni = 1 if ii < size_x else rem_x/grid_x
                 nj = 1 if jj < size_y else rem_y/grid_y
-                vert.extend([x+ii*grid_x,      y+jj*grid_y,         0, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+jj*grid_y,        ni, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+(jj+nj)*grid_y,   ni, 1-nj])
-                vert.extend([x+ii*grid_x,      y+(jj+nj)*grid_y,    0, 1-nj])
+                vert.extend([x+ii*grid_x,      y+jj*grid_y,      *uv(0,0)])
+                vert.extend([x+(ii+ni)*grid_x, y+jj*grid_y,      *uv(ni,0)])
+                vert.extend([x+(ii+ni)*grid_x, y+(jj+nj)*grid_y, *uv(ni,nj)])
+                vert.extend([x+ii*grid_x,      y+(jj+nj)*grid_y, *uv(0,nj)])
                 indx.extend([pos,pos+1,pos+2,pos+2,pos+3,pos])
                 pos += 4
         
@@ -16,14 +16,17 @@ from kivy.metrics import dp
 
 from introcs.geom import Point2
 
+from .gkeys import GKeyInput
 
-class GInput(object):
+
+class GInput(GKeyInput):
     """
     A class representing an input handler
 
     An input handler receives mouse and keyboard information, and makes it available
     to the user.  To access mouse information, simply access the attribute ``touch``.
-    To access keyboard information, use the method :meth:`is_key_down`.
+    To access keyboard information, use the method :meth:`is_key_down` (and the other
+    key methods inherited from :class:`GKeyInput`).
 
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly hook it up to the keyboard and mouse.  Instead,
@@ -97,33 +100,6 @@ class GInput(object):
 
         return Point2(self._touch.x/dp(1),self._touch.y/dp(1))
 
-    @property
-    def key_count(self):
-        """
-        The number of keys currently held down.
-
-        This attribute is a quick way to check whether the user has pressed any keys.
-
-        **Immutable**: This value cannot be altered.
-
-        **Invariant**: Must be an int > 0."""
-        return self._keycount
-
-    @property
-    def keys(self):
-        """
-        The list of keys that are currently held down.
-
-        Using this attribute is much slower than the method :meth:`is_key_down`.  You
-        should use that method when you want to test a specific key. This attribute is
-        primarily for debugging.
-
-        **Immutable**: This value cannot be altered.
-
-        **Invariant**: Must be a list of strings (possibly empty)
-        """
-        return tuple(k for (k,v) in self._keystate.items() if v)
-
 
     # BUILT-IN METHODS
     def __init__(self):
@@ -135,6 +111,7 @@ class GInput(object):
         methods.  You should only use  use the object provided in the ``input`` attribute
         of :class:`GameApp`. See the documentation of that class for more information.
         """
+        GKeyInput.__init__(self)
         self._view  = None
         self._touch = None
         self._keyboard = None
@@ -142,129 +119,8 @@ class GInput(object):
         self._touch_enabled = True
         self._keyboard_enabled = True
 
-        self._prvstate = {}
-        self._keystate = {}
-        self._keycount = 0
-
 
     # PUBLIC METHODS
-    def refresh(self):
-        self._prvstate.clear()
-        self._prvstate.update(self._keystate)
-    
-    
-    def is_key_down(self,key):
-        """
-        Checks wether the key is currently held down.
-        
-        The key is a string describing the key pressed.  For example, to determine
-        whether the right-arrow key is held down, use the method call::
-        
-            input.is_key_down('right')
-        
-        Similarly the method call::
-        
-            input.is_key_down('w')
-        
-        will indicate whether the W key is held down.
-        
-        For a complete list of key names, see the
-        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
-        
-        :param key: the key to test
-        :type key:  ``str``
-        
-        :return: True if ``key`` is currently held down
-        :rtype:  ``bool``
-        """
-        return key in self._keystate and self._keystate[key]
-
-
-    def is_key_up(self,key):
-        """
-        Checks wether the key is not currently helpd down
-        
-        The key is a string describing the key pressed.  For example, to determine
-        whether the right-arrow key is currently up, use the method call::
-        
-            input.is_key_up('right')
-        
-        Similarly the method call::
-        
-            input.is_key_up('w')
-        
-        will indicate whether the W key is up.
-        
-        For a complete list of key names, see the
-        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
-        
-        :param key: the key to test
-        :type key:  ``str``
-        
-        :return: True if ``key`` is not currently held down
-        :rtype:  ``bool``
-        """
-        return key in self._keystate and not self._keystate[key]
-
-
-    def is_key_pressed(self,key):
-        """
-        Checks wether the key was just pressed.
-        
-        A key is pressed if it is held down this animation frame and was not held down 
-        the previous animation frame. The key is a string describing the key pressed. For 
-        example, to determine whether the right-arrow key was just pressed, use the 
-        method call::
-        
-            input.is_key_pressed('right')
-        
-        Similarly the method call::
-        
-            input.is_key_pressed('w')
-        
-        will indicate whether the W key was just pressed.
-        
-        For a complete list of key names, see the
-        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
-        
-        :param key: the key to test
-        :type key:  ``str``
-        
-        :return: True if ``key`` was pressed this frame
-        :rtype:  ``bool``
-        """
-        return key in self._keystate and self._keystate[key] and not (key in self._prvstate and self._prvstate[key])
-
-
-    def is_key_released(self,key):
-        """
-        Checks wether the key is currently held down.
-        
-        A key is released if it is not held down this animation frame but was held down 
-        the previous animation frame. The key is a string describing the key pressed. For 
-        example, to determine whether the right-arrow key was just released, use the 
-        method call::
-        
-            input.is_key_released('right')
-        
-        Similarly the method call::
-        
-            input.is_key_released('w')
-        
-        will indicate whether the W key was just released.
-        
-        For a complete list of key names, see the
-        `Kivy documentation <http://kivy.org/docs/_modules/kivy/core/window.html>`_.
-        
-        :param key: the key to test
-        :type key:  ``str``
-        
-        :return: True if ``key`` was released this frame
-        :rtype:  ``bool``
-        """
-        return key in self._keystate and not self._keystate[key] and (key in self._prvstate and self._prvstate[key])
-
-
     def is_touch_down(self):
         """
         Checks wether the mouse is currently held down.
@@ -411,12 +267,40 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    By default, the view rebuilds its graphics instructions every animation frame.  If
+    ``retained`` is True, the view instead remembers what was drawn in the last frame.
+    You still draw every object each frame, but the view only compares the new frame
+    against the old one, and touches the graphics instructions only where they differ
+    (an object was added, removed or reordered).  Objects that are drawn every frame
+    in the same order, like background tiles, cost nothing to redraw.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
 
+    # MUTABLE ATTRIBUTES
+    @property
+    def retained(self):
+        """
+        Whether this view keeps its graphics instructions between frames.
+
+        Changing this value clears the view.
+
+        **Invariant**: Must be a bool
+        """
+        return self._retained
+
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._retained = value
+        self._frame.clear()
+        self._contents.clear()
+        self._shown = []
+        self._pending = []
+
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -433,6 +317,9 @@ class GView(FloatLayout):
         self.bind(size=self._reset)
         self._reset()
         self._contents = set()
+        self._retained = False
+        self._shown = []
+        self._pending = []
 
 
     # PUBLIC METHODS
@@ -447,7 +334,10 @@ class GView(FloatLayout):
         :type cmd:  A Kivy graphics command
         """
         if not cmd in self._contents:
-            self._frame.add(cmd)
+            if not self._retained:
+                self._frame.add(cmd)
+            else:
+                self._pending.append(cmd)
             self._contents.add(cmd)
 
     def clear(self):
@@ -456,11 +346,46 @@ class GView(FloatLayout):
 
         This method is called for you automatically at the start of the animation
         frame.  That way, you are not drawing images on top of one another.
+
+        In retained mode, this only starts a new frame.  The old frame stays on screen
+        until the new one is committed.
         """
-        self._frame.clear()
+        if not self._retained:
+            self._frame.clear()
+        self._pending = []
         self._contents.clear()
 
     # HIDDEN METHODS
+    def _commit(self):
+        """
+        Replaces the last frame with the commands drawn since the view was cleared.
+
+        This method is called for you automatically at the end of the animation frame.
+        It only applies to retained mode.  The two frames are compared, and only the
+        commands between their common start and common end are replaced.
+        """
+        if not self._retained:
+            return
+
+        old = self._shown
+        new = self._pending
+        size = min(len(old),len(new))
+
+        start = 0
+        while start < size and old[start] is new[start]:
+            start += 1
+
+        end = 0
+        while end < size-start and old[-1-end] is new[-1-end]:
+            end += 1
+
+        for cmd in old[start:len(old)-end]:
+            self._frame.remove(cmd)
+        for pos in range(start,len(new)-end):
+            self._frame.insert(pos,new[pos])
+
+        self._shown = new
+
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
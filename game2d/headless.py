@@ -0,0 +1,1357 @@
+"""
+A geometry-only backend for 2D game support.
+
+This module provides drop-in replacements for the drawables, sounds, input and
+application classes of this package that never touch Kivy.  Objects keep their
+position, size, rotation and hitboxes, and collisions use the same geometry as the
+graphical backend (see :mod:`game2d.gshape`), so they behave exactly the same.  But
+objects build no graphics instructions, load no textures and play no audio.  This makes it possible to simulate a game on machines with no
+window, GPU or audio device, and at far more than real time.
+
+The backend is selected by setting the environment variable ``GAME2D_HEADLESS``
+before the package is first imported.  Image sizes are read directly from the PNG
+headers in the **Images** folder, so objects get the same default sizes that they
+would get from their textures.
+"""
+import os.path
+import struct
+import json
+import logging
+
+from .gkeys import GKeyInput
+from .gaffine import affine as _affine, compose as _compose, invert as _invert
+from .gshape import bbox as _shape_bbox, collides as _shape_collides, contains as _shape_contains
+from .gbody import GBody
+
+Logger = logging.getLogger('game2d')
+
+
+class _Texture(object):
+    """
+    A stand-in for a Kivy texture that only knows its size.
+    """
+
+    def __init__(self,width,height):
+        """
+        Creates a new texture size record.
+
+        :param width: The texture width in pixels
+        :type width:  ``int`` > 0
+
+        :param height: The texture height in pixels
+        :type height:  ``int`` > 0
+        """
+        self.width  = width
+        self.height = height
+
+
+class GameApp(object):
+    """
+    A headless replacement for the resource management of the game application.
+
+    This class only provides the class methods that the drawables rely on (file
+    lookup and JSON loading).  It does not open a window or schedule a clock; a
+    headless game is stepped by calling the update method of its subcontroller
+    directly.
+    """
+    # Class attribute for tracking textures (to reduce file access)
+    TEXTURE_CACHE = {}
+
+    # Class attribute for sharing silent sounds (each a SoundPool), keyed by file
+    SOUND_CACHE = {}
+
+    # CLASS METHODS
+    @classmethod
+    def is_image(cls,name):
+        """
+        Checks if ``name`` refers to an image file
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :return: True if ``name`` refers to an image file; False otherwise
+        :rtype:  ``bool``
+        """
+        if type(name) != str:
+            return False
+        return os.path.exists(os.path.join(cls.images,name))
+
+    @classmethod
+    def is_font(cls,name):
+        """
+        Checks if ``name`` refers to a font file
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :return: True if ``name`` refers to a font file; False otherwise
+        :rtype:  ``bool``
+        """
+        if type(name) != str:
+            return False
+        return os.path.exists(os.path.join(cls.fonts,name))
+
+    @classmethod
+    def is_sound(cls,name):
+        """
+        Checks if ``name`` refers to a sound file
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :return: True if ``name`` refers to a sound file; False otherwise
+        :rtype:  ``bool``
+        """
+        if type(name) != str:
+            return False
+        return os.path.exists(os.path.join(cls.sounds,name))
+
+    @classmethod
+    def is_json(cls,name):
+        """
+        Checks if ``name`` refers to a JSON file
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :return: True if ``name`` refers to a JSON file; False otherwise
+        :rtype:  ``bool``
+        """
+        if type(name) != str:
+            return False
+        elif name[-4:].lower() != 'json':
+            return False
+        return os.path.exists(os.path.join(cls.json,name))
+
+    @classmethod
+    def load_texture(cls,name):
+        """
+        Returns: The texture size for the given file name, or None if it cannot be read
+
+        Only the PNG header is read, so this is very fast.  Results are cached.
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if name in cls.TEXTURE_CACHE:
+            return cls.TEXTURE_CACHE[name]
+        elif not cls.is_image(name):
+            Logger.info('GameApp: No image file named %s.' % repr(name))
+            return None
+
+        with open(os.path.join(cls.images,name),'rb') as f:
+            header = f.read(24)
+
+        if header[:8] != b'\x89PNG\r\n\x1a\n' or header[12:16] != b'IHDR':
+            Logger.info('GameApp: Image %s is not a PNG file.' % repr(name))
+            return None
+
+        texture = _Texture(*struct.unpack('>II',header[16:24]))
+        cls.TEXTURE_CACHE[name] = texture
+        return texture
+
+    @classmethod
+    def load_atlas(cls,name,build=True):
+        """
+        Returns None, as there are no textures to pack into an atlas.
+
+        :param name: The atlas file name
+        :type name:  ``str``
+
+        :param build: Whether to build the atlas if it is missing or out of date
+        :type build:  ``bool``
+        """
+        return None
+
+    @classmethod
+    def load_glyphs(cls,font_name='Roboto',font_size=15,chars=None):
+        """
+        Returns None, as there are no glyphs to render into an atlas.
+
+        :param font_name: The font file name (or the name of a Kivy font)
+        :type font_name:  ``str``
+
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float``
+
+        :param chars: The characters to render (None for printable ASCII)
+        :type chars:  ``str`` or None
+        """
+        return None
+
+    @classmethod
+    def load_sound(cls,name,voices=1):
+        """
+        Returns: The silent sound pool for the given file name, or None if there is none
+
+        Results are cached, as in the graphical backend.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param voices: The number of voices, if the sound is not loaded yet
+        :type voices:  ``int`` > 0
+        """
+        if name in cls.SOUND_CACHE:
+            return cls.SOUND_CACHE[name]
+        elif not cls.is_sound(name):
+            Logger.info('GameApp: No sound file named %s.' % repr(name))
+            return None
+
+        sound = SoundPool(name,voices)
+        cls.SOUND_CACHE[name] = sound
+        return sound
+
+    @classmethod
+    def load_sounds(cls,voices=None):
+        """
+        Returns: The list of sound names in the **Sounds** folder, after loading them
+
+        :param voices: The number of voices for each file name
+        :type voices:  ``dict`` or None
+        """
+        assert voices is None or type(voices) == dict, '%s is not a dictionary' % repr(voices)
+        voices = {} if voices is None else voices
+        if not os.path.isdir(cls.sounds):
+            return []
+
+        result = []
+        for name in sorted(os.listdir(cls.sounds)):
+            if name[-4:].lower() in ('.wav','.mp3'):
+                if not cls.load_sound(name,voices.get(name,1)) is None:
+                    result.append(name)
+        return result
+
+    @classmethod
+    def unload_sound(cls,name):
+        """
+        Returns: The sound pool for the given file name, or None if it does not exist
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        assert type(name) == str, '%s is not a valid sound name' % repr(name)
+        if name in cls.SOUND_CACHE:
+            sound = cls.SOUND_CACHE[name]
+            del cls.SOUND_CACHE[name]
+            return sound
+        return None
+
+    @classmethod
+    def load_compiled(cls,name,compiler,*extras):
+        """
+        Returns: The compiled form of the given JSON files, or None if they cannot be loaded
+
+        The ``name`` (and each of the ``extras``) must refer to a file in the **JSON**
+        folder.  The files are parsed and passed, in order, to the function ``compiler``.
+        Its result is returned, and is also cached in the folder **JSON/__cache__**.  As 
+        long as the files do not change, later calls unpickle the cached result instead 
+        of parsing and compiling the files again.  See :mod:`game2d.gcache`.
+
+        :param name: The file name
+        :type name:  ``str``
+
+        :param compiler: The function to compile the parsed files
+        :type compiler:  callable, taking one argument per file
+
+        :param extras: Additional file names
+        :type extras:  ``str``
+        """
+        from .gcache import load_compiled
+        names = (name,)+extras
+        for item in names:
+            if not cls.is_json(item):
+                Logger.info('GameApp: No json file named %s.' % repr(item))
+                return None
+        return load_compiled(cls.json,list(names),compiler)
+    
+    @classmethod
+    def load_json(cls,name):
+        """
+        Returns: The JSON for the given file name, or None if it cannot be loaded
+
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if not cls.is_json(name):
+            Logger.info('GameApp: No json file named %s.' % repr(name))
+            return None
+
+        with open(os.path.join(cls.json,name)) as f:
+            data = f.read()
+
+        try:
+            return json.loads(data)
+        except Exception as e:
+            Logger.info('GameApp: JSON %s is not properly formatted.' % repr(name))
+            Logger.info(str(e))
+        return None
+
+    @classmethod
+    def _setpaths(cls,path=None):
+        """
+        Sets the resource paths to the application directory.
+
+        :param path: The application directory (default is the parent of this package)
+        :type path:  ``str`` or ``None``
+        """
+        if path is None:
+            path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        cls.set_resources(path)
+
+    @classmethod
+    def set_resources(cls,path):
+        """
+        Sets the resource folders (**JSON**, **Fonts**, **Sounds**, **Images**) to those
+        in the given directory.
+
+        :param path: The application directory
+        :type path:  ``str``
+        """
+        GameApp.json   = str(os.path.join(path, 'JSON'))
+        GameApp.fonts  = str(os.path.join(path, 'Fonts'))
+        GameApp.sounds = str(os.path.join(path, 'Sounds'))
+        GameApp.images = str(os.path.join(path, 'Images'))
+
+
+GameApp._setpaths()
+
+
+#mark -
+class GObject(object):
+    """
+    A headless graphics object.
+
+    This class has the same geometric attributes as the graphical version (position,
+    size, rotation, scale and hitbox) and the same collision semantics, but nothing is
+    ever drawn.
+    """
+
+    # Class attribute for the collision test of rotated objects: 'edges' tests the edges
+    # of one hitbox against the other (the original test), 'sat' is exact (see gsat)
+    COLLIDER = 'edges'
+
+    # MUTABLE PROPERTIES
+    @property
+    def x(self):
+        """
+        The horizontal coordinate of the object center.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return self._x
+
+    @x.setter
+    def x(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._x = float(value)
+        self._box = None
+
+    @property
+    def y(self):
+        """
+        The vertical coordinate of the object center.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return self._y
+
+    @y.setter
+    def y(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._y = float(value)
+        self._box = None
+
+    @property
+    def width(self):
+        """
+        The horizontal width of this shape.
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._width
+
+    @width.setter
+    def width(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value > 0, '%s is not positive' % repr(value)
+        self._width = float(value)
+        self._box = None
+
+    @property
+    def height(self):
+        """
+        The vertical height of this shape.
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._height
+
+    @height.setter
+    def height(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value > 0, '%s is not positive' % repr(value)
+        self._height = float(value)
+        self._box = None
+
+    @property
+    def hitbox(self):
+        """
+        The hitbox for this object.
+
+        **Invariant**: Value is either ``None`` or a 4-element tuple of numbers.
+        """
+        return self._hitbox
+
+    @hitbox.setter
+    def hitbox(self,value):
+        self._box = None
+        if value is None:
+            self._hitbox = None
+            return
+
+        try:
+            size = len(value)
+        except:
+            size = 0
+        assert size == 4, '%s is not a tuple or list of size 4' % repr(value)
+        assert all(map(lambda x : type(x) in [int,float], value)), '%s has non-numerical elements' % repr(value)
+        self._hitbox = tuple(value)
+
+    @property
+    def scale(self):
+        """
+        The scaling factor of this shape.
+
+        **invariant**: Value must be either a number (``int`` or ``float``) or a pair of numbers.
+        """
+        return self._scale
+
+    @scale.setter
+    def scale(self,value):
+        if type(value) in [int,float]:
+            self._scale = (float(value),float(value))
+        else:
+            assert len(value) == 2, '%s is not a valid scaling factor' % repr(value)
+            self._scale = (float(value[0]),float(value[1]))
+        self._box = None
+
+    @property
+    def angle(self):
+        """
+        The angle of rotation about the center.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return self._angle
+
+    @angle.setter
+    def angle(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._angle = float(value)
+        self._aligned = (value % 360) in [0,90,180,270]
+        self._box = None
+
+    @property
+    def linecolor(self):
+        """
+        The object line color (stored, but never drawn)
+        """
+        return self._linecolor
+
+    @linecolor.setter
+    def linecolor(self,value):
+        self._linecolor = value
+
+    @property
+    def fillcolor(self):
+        """
+        The object fill color (stored, but never drawn)
+        """
+        return self._fillcolor
+
+    @fillcolor.setter
+    def fillcolor(self,value):
+        self._fillcolor = value
+
+    @property
+    def name(self):
+        """
+        The name of this object.
+
+        **invariant**: Value must be a ``str`` or ``None``
+        """
+        return self._name
+
+    @name.setter
+    def name(self,value):
+        assert value is None or type(value) == str, '%s is not a valid name' % repr(value)
+        self._name = value
+
+    # DERIVED PROPERTIES
+    @property
+    def left(self):
+        """
+        The left edge of this shape (taking the hitbox into account).
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        return self._bbox()[0]
+
+    @left.setter
+    def left(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self.x += value-self.left
+
+    @property
+    def right(self):
+        """
+        The right edge of this shape (taking the hitbox into account).
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        return self._bbox()[2]
+
+    @right.setter
+    def right(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self.x += value-self.right
+
+    @property
+    def top(self):
+        """
+        The top edge of this shape (taking the hitbox into account).
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        return self._bbox()[1]
+
+    @top.setter
+    def top(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self.y += value-self.top
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge of this shape (taking the hitbox into account).
+
+        **invariant**: Value must be an ``int`` or ``float``.
+        """
+        return self._bbox()[3]
+
+    @bottom.setter
+    def bottom(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self.y += value-self.bottom
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new headless object.
+
+        This constructor accepts the same keywords as the graphical version.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._box = None
+        self._aligned = True
+        self._x = 0.0
+        self._y = 0.0
+        self._angle = 0.0
+        self._scale = (1.0,1.0)
+        self._width  = keywords['width']  if 'width'  in keywords else 0
+        self._height = keywords['height'] if 'height' in keywords else 0
+
+        self.hitbox =  keywords['hitbox']  if 'hitbox'  in keywords else (0,0,0,0)
+        if 'angle' in keywords:
+            self.angle = keywords['angle']
+        if 'scale' in keywords:
+            self.scale = keywords['scale']
+
+        if 'x' in keywords:
+            self.x = keywords['x']
+        elif 'left' in keywords:
+            self.left = keywords['left']
+        elif 'right' in keywords:
+            self.right = keywords['right']
+
+        if 'y' in keywords:
+            self.y = keywords['y']
+        elif 'bottom' in keywords:
+            self.bottom = keywords['bottom']
+        elif 'top' in keywords:
+            self.top = keywords['top']
+
+        self.fillcolor = keywords['fillcolor'] if 'fillcolor' in keywords else None
+        self.linecolor = keywords['linecolor'] if 'linecolor' in keywords else None
+        self.name = keywords['name'] if 'name' in keywords else None
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,center=(%s,%s),width=%s,height=%s,angle=%s]' \
+                % (s,repr(self.x),repr(self.y),repr(self.width),repr(self.height),repr(self.angle))
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this object.
+        :rtype:  ``str``
+        """
+        return str(self.__class__)+str(self)
+
+    # PUBLIC METHODS
+    def collides(self,obj):
+        """
+        Checks whether this object collides with another.
+
+        This collision method takes hitboxes into account, and agrees with the
+        graphical backend.
+
+        :param obj: the object to check for collision
+        :type obj: :class:`GObject` or :class:`GBody`
+
+        :return: True if the shape collides with object
+        :rtype:  ``bool``
+        """
+        assert isinstance(obj,(GObject,GBody)), '%s is not an instance of GObject' % repr(obj)
+        return _shape_collides(self,obj)
+
+    def contains(self,point):
+        """
+        Checks whether this shape contains the point
+
+        :param point: the point to check
+        :type point: a pair of numbers
+
+        :return: True if the shape contains this point
+        :rtype:  ``bool``
+        """
+        return _shape_contains(self,point)
+
+    def draw(self, view):
+        """
+        Does nothing, as there is nothing to draw in a headless game.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        pass
+
+    # HIDDEN METHODS
+    def _affine(self):
+        """
+        :return: The transform of this object as an affine tuple (a,b,c,d,tx,ty)
+        :rtype:  ``tuple``
+        """
+        return _affine(self._x,self._y,self._angle,*self._scale)
+
+    def _inverse(self):
+        """
+        :return: The inverse of :meth:`_affine`
+        :rtype:  ``tuple``
+        """
+        return _invert(self._affine())
+
+    def _composite(self,obj):
+        """
+        :param obj: the other object
+        :type obj:  :class:`GObject` or :class:`GBody`
+
+        :return: The transform from the space of obj to the space of this object
+        :rtype:  ``tuple``
+        """
+        return _compose(obj._affine(),_invert(self._affine()))
+
+    def _bbox(self):
+        """
+        Returns the bounding box of this rotated object
+
+        The bounding box is returned as a tuple (l,t,r,b).  It is cached until the
+        position, size, angle, scale or hitbox changes.
+
+        :return: The bounding box for the shape
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        if self._box is None:
+            self._box = self._make_bbox()
+        return self._box
+
+    def _make_bbox(self):
+        """
+        Computes the bounding box of this rotated object
+
+        :return: The bounding box for the shape
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        return _shape_bbox(self)
+
+
+#mark -
+class GRectangle(GObject):
+    """
+    A headless rectangle.
+    """
+
+    @property
+    def linewidth(self):
+        """
+        The width of the exterior line of this shape.
+
+        **invariant**: Value must be an ``int`` or ``float`` >= 0.
+        """
+        return self._linewidth
+
+    @linewidth.setter
+    def linewidth(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value >= 0, '%s is negative' % repr(value)
+        self._linewidth = value
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless rectangle
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+
+    def _reset(self):
+        """
+        Resets the (empty) drawing state.
+        """
+        pass
+
+
+#mark -
+class GImage(GRectangle):
+    """
+    A headless image.
+
+    If no size is given, the size is taken from the PNG header of the source file.
+    """
+
+    @property
+    def source(self):
+        """
+        The source file for this image.
+
+        **invariant**. Value be a string refering to a valid file.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        self._source = value
+        if self._defined:
+            self._reset()
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless image.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self.source = keywords['source'] if 'source' in keywords else None
+        self._texture = None
+        GRectangle.__init__(self,**keywords)
+
+    def _reset(self):
+        """
+        Resets the image size from the source file.
+        """
+        self._texture = GameApp.load_texture(self.source)
+        if not self._texture is None and (self.width == 0 or self.height == 0):
+            self.width  = self._texture.width
+            self.height = self._texture.height
+
+
+#mark -
+class GLabel(GRectangle):
+    """
+    A headless text label.
+
+    As nothing is rasterized, the size of the text is only an estimate based on the
+    font size.  The label is never smaller than the given width and height.
+    """
+
+    @property
+    def text(self):
+        """
+        The text for this label.
+
+        **Invariant**: Must be a string"""
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        self._text = value
+        if self._defined:
+            self._reset()
+
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+
+        **Invariant**: Must be a positive number (int or float)"""
+        return self._fsize
+
+    @font_size.setter
+    def font_size(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._fsize = value
+        if self._defined:
+            self._reset()
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless text label.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._text  = keywords['text'] if 'text' in keywords else ''
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else 15
+        self.font_name = keywords['font_name'] if 'font_name' in keywords else None
+        self.bold   = keywords['bold'] if 'bold' in keywords else False
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
+        self.valign = keywords['valign'] if 'valign' in keywords else 'middle'
+        GRectangle.__init__(self,**keywords)
+
+    def _reset(self):
+        """
+        Grows the label to (roughly) fit its text.
+        """
+        lines = self._text.split('\n')
+        self._width  = max(self._width, 0.6*self._fsize*max(map(len,lines)))
+        self._height = max(self._height,1.2*self._fsize*len(lines))
+        self._box = None
+
+
+#mark -
+class GText(GObject):
+    """
+    A headless text object for changing text.
+
+    As nothing is rendered, the size of the text is only an estimate based on the font
+    size (as for :class:`GLabel`).  The size does not change with the text.
+    """
+
+    @property
+    def text(self):
+        """
+        The text for this object.
+
+        **Invariant**: Must be a string"""
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        self._text = value
+
+    @property
+    def font_name(self):
+        """
+        The file name for the .ttf file of the font.
+
+        **Invariant**: Must be a string"""
+        return self._fname
+
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+
+        **Invariant**: Must be a positive number (int or float)"""
+        return self._fsize
+
+    @property
+    def chars(self):
+        """
+        The characters that this object can draw.
+
+        **Invariant**: Must be a nonempty string"""
+        return self._chars
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless text object.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._text  = keywords['text'] if 'text' in keywords else ''
+        self._fname = keywords['font_name'] if 'font_name' in keywords else 'Roboto'
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else 15
+        self._chars = keywords['chars'] if 'chars' in keywords else ''.join(chr(code) for code in range(32,127))
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
+        self.valign = keywords['valign'] if 'valign' in keywords else 'middle'
+
+        keywords = dict(keywords)
+        lines = self._text.split('\n')
+        if not 'width' in keywords:
+            keywords['width'] = max(0.6*self._fsize*max(map(len,lines)),1.0)
+        if not 'height' in keywords:
+            keywords['height'] = 1.2*self._fsize*len(lines)
+        GObject.__init__(self,**keywords)
+        self._defined = True
+
+
+#mark -
+class GSprite(GRectangle):
+    """
+    A headless filmstrip.
+
+    Changing the frame changes the hitbox, exactly as in the graphical version.
+    """
+
+    @property
+    def count(self):
+        """
+        The number of frames in this filmstrip
+
+        **invariant**. Value is an int > 0.
+        """
+        return self._format[0]*self._format[1]
+
+    @property
+    def source(self):
+        """
+        The source file for this image.
+
+        **invariant**. Value is a string refering to a valid file.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        self._source = value
+        if self._defined:
+            self._reset()
+
+    @property
+    def format(self):
+        """
+        The grid size of this sprite as (rows, columns).
+
+        **Invariant**: Value is a 2-element tuple of ints > 0
+        """
+        return self._format
+
+    @format.setter
+    def format(self,value):
+        assert type(value) in [tuple,list] and len(value) == 2, '%s does is not a tuple pair' % repr(value)
+        assert type(value[0]) == int and type(value[1]) == int, '%s does not have int values' % repr(value)
+        assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
+        self._format = tuple(value)
+        count = value[0]*value[1]
+
+        if not self.hitboxes is None:
+            if len(self.hitboxes) != count:
+                self.hitboxes = None
+
+        if self.frame >= count:
+            self.frame = 0
+
+    @property
+    def frame(self):
+        """
+        The current animation frame of this filmstrip
+
+        **invariant**. Value is an int 0..count-1.
+        """
+        return self._frame
+
+    @frame.setter
+    def frame(self,value):
+        assert type(value) == int, '%s is not an int' % repr(value)
+        assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
+        self._frame = value
+        if not self._hitboxes is None:
+            self.hitbox = self._hitboxes[value]
+
+    @property
+    def hitboxes(self):
+        """
+        The hitbox list for this object, one per frame.
+
+        **Invariant**: Value is either ``None`` or a tuple of ``count`` 4-element
+        tuples of numbers.
+        """
+        return self._hitboxes
+
+    @hitboxes.setter
+    def hitboxes(self,value):
+        if value is None:
+            self._hitboxes = None
+            self.hitbox    = None
+            return
+
+        assert len(value) == self.count, '%s is not a tuple or list of size %s' % (repr(value),repr(self.count))
+        self._hitboxes = tuple(map(tuple,value))
+        self.hitbox = self._hitboxes[self.frame]
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless sprite
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._hitboxes = None
+        self._frame  = 0
+        self.source = keywords['source'] if 'source' in keywords else None
+        self.format = keywords['format'] if 'format' in keywords else (1,1)
+        GRectangle.__init__(self,**keywords)
+        self.hitboxes = keywords['hitboxes'] if 'hitboxes' in keywords else None
+
+    def _reset(self):
+        """
+        Resets the frame size from the source file.
+        """
+        texture = GameApp.load_texture(self.source)
+        if texture and (self.width == 0 or self.height == 0):
+            self.width  = texture.width/self._format[1]
+            self.height = texture.height/self._format[0]
+
+
+#mark -
+class GTile(GObject):
+    """
+    A headless tiled image.
+
+    As with the graphical version, the ``width`` and ``height`` are required.
+    """
+
+    @property
+    def source(self):
+        """
+        The source file for this image.
+
+        **invariant**. Value be a string refering to a valid file.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        self._source = value
+
+    @property
+    def rows(self):
+        """
+        The number of times this image appears vertically
+        """
+        texture = GameApp.load_texture(self.source)
+        if texture is None:
+            return 0
+        return self.height/texture.height
+
+    @property
+    def columns(self):
+        """
+        The number of times this image appears horizontally
+        """
+        texture = GameApp.load_texture(self.source)
+        if texture is None:
+            return 0
+        return self.width/texture.width
+
+    def __init__(self,**keywords):
+        """
+        Creates a new headless tiled image.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names, including 'width' and 'height'
+        """
+        self._defined = False
+        self.source = keywords['source'] if 'source' in keywords else None
+        if not 'width' in keywords:
+            raise ValueError("The 'width' argument must be specified.")
+        if not 'height' in keywords:
+            raise ValueError("The 'height' argument must be specified.")
+        GObject.__init__(self,**keywords)
+        self._defined = True
+
+
+#mark -
+class GBatch(GObject):
+    """
+    A headless batch of images.
+
+    The batch only keeps track of its members, as there is nothing to draw.
+    """
+
+    @property
+    def count(self):
+        """
+        The number of images in this batch.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return len(self._members)
+
+    @property
+    def draws(self):
+        """
+        The number of meshes (and hence draw calls) used by this batch.
+
+        **invariant**: Value is an int >= 0.
+        """
+        return len(set((obj.source, None if obj.fillcolor is None else tuple(obj.fillcolor))
+                       for obj in self._members.values()))
+
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty headless batch.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._members = {}
+        GObject.__init__(self,**keywords)
+
+    def add(self,obj):
+        """
+        Adds an image to this batch.
+
+        :param obj: the image to add
+        :type obj:  :class:`GImage`
+        """
+        self._members[id(obj)] = obj
+
+    def remove(self,obj):
+        """
+        Removes an image from this batch.
+
+        :param obj: the image to remove
+        :type obj:  :class:`GImage`
+        """
+        del self._members[id(obj)]
+
+    def clear(self):
+        """
+        Removes all images from this batch.
+        """
+        self._members = {}
+
+
+#mark -
+class Sound(object):
+    """
+    A silent sound.
+
+    The source file is still validated, so that errors are caught headlessly, but
+    nothing is loaded or played.
+    """
+
+    @property
+    def volume(self):
+        """
+        The current sound volume.
+
+        **Invariant**: Must float in the range 0..1.
+        """
+        return self._volume
+
+    @volume.setter
+    def volume(self,value):
+        assert type(value) in [int, float] and value >= 0 and value <= 1, \
+            'value %s is not a valid volume' % repr(value)
+        self._volume = value
+
+    @property
+    def source(self):
+        """
+        The source file for this sound.
+
+        **Invariant**: Must be a nonempty string.
+        """
+        return self._source
+
+    @property
+    def playing(self):
+        """
+        Whether or not the sound is currently playing (always False).
+        """
+        return False
+
+    def __init__(self,source):
+        """
+        Creates a new silent sound.
+
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+        """
+        assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
+        self._source = source
+        self._volume = 1
+
+    def play(self,loop=False):
+        """
+        Does nothing.
+
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        pass
+
+    def stop(self):
+        """
+        Does nothing.
+        """
+        pass
+
+
+class SoundPool(Sound):
+    """
+    A silent sound with several voices.
+
+    The voices are only counted, as nothing is ever played.
+    """
+
+    @property
+    def voices(self):
+        """
+        The number of voices, which is the most plays of this sound that can overlap.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._count
+
+    def __init__(self,source,voices=1):
+        """
+        Creates a new silent sound pool.
+
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+
+        :param voices: The number of voices
+        :type voices:  ``int`` > 0
+        """
+        assert type(voices) == int and voices > 0, '%s is not a valid voice count' % repr(voices)
+        Sound.__init__(self,source)
+        self._count = voices
+
+
+class SoundLibrary(object):
+    """
+    A dictionary that maps keys to silent sounds.
+    """
+
+    def __init__(self):
+        """
+        Creates a new, empty sound library.
+        """
+        self._data = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, filename):
+        self._data[key] = Sound(filename)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data.keys())
+
+    def keys(self):
+        return self._data.keys()
+
+
+#mark -
+class GInput(GKeyInput):
+    """
+    A headless input handler.
+
+    There is no keyboard, so keys are pressed and released programmatically with the
+    methods :meth:`press` and :meth:`release`.  Queries behave as in the graphical
+    version (see :class:`GKeyInput`).
+    """
+
+    def __init__(self):
+        """
+        Creates a new input handler with no keys held down
+        """
+        GKeyInput.__init__(self)
+
+    def press(self,key):
+        """
+        Holds down the given key.
+
+        :param key: the key to press
+        :type key:  ``str``
+        """
+        if not key in self._keystate or not self._keystate[key]:
+            self._keycount += 1
+        self._keystate[key] = True
+
+    def release(self,key):
+        """
+        Releases the given key.
+
+        :param key: the key to release
+        :type key:  ``str``
+        """
+        if key in self._keystate and self._keystate[key]:
+            self._keycount -= 1
+        self._keystate[key] = False
+
+
+class GView(object):
+    """
+    A headless view that discards everything drawn to it.
+
+    The ``retained`` attribute is accepted for compatibility, but has no effect.
+    """
+
+    def __init__(self):
+        """
+        Creates a new headless view.
+        """
+        self.retained = False
+
+    def draw(self,cmd):
+        """
+        Discards the given drawing command.
+        """
+        pass
+
+    def clear(self):
+        """
+        Does nothing.
+        """
+        pass
+
+    def _commit(self):
+        """
+        Does nothing.
+        """
+        pass
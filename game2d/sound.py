@@ -19,9 +19,9 @@ class Sound(object):
     platforms. In order for Kivy to find a WAV or MP3 file, you should put it in the
     **Sounds** directory.  Sounds in that folder can be referenced directly by name.
     
-    When a sound is played, it cannot be played again until it finishes, or is stopped.  
-    This means that if you want multiple, simultaneous sound effects from the same WAV 
-    file.you will need to create multiple Sound objects.
+    When a sound is played, it cannot be played again until it finishes, or is stopped.
+    This means that if you want multiple, simultaneous sound effects from the same WAV
+    file.you will need to create multiple Sound objects (or use a :class:`SoundPool`).
     """
     # This class is a simply replacement for the built-in Kivy Sound class.  It is a
     # little better with error handling, since GStreamer appears to be quite unreliable.
@@ -104,6 +104,137 @@ class Sound(object):
         self._sound.stop()
 
 
+# #mark -
+class SoundPool(object):
+    """
+    A class representing a sound that can be played several times at once.
+
+    A pool loads the sound file into a fixed number of voices when it is created, so
+    playing it never touches the disk.  Each call to :meth:`play` starts the sound on
+    a voice that is not playing, and the audio backend mixes the voices together.
+    Playing the sound again therefore does not cut off a play that is still going.
+    If every voice is busy, the voice that started first is stopped and reused, so the
+    number of voices is a limit on how many plays of this sound can overlap.
+
+    A pool has the same interface as :class:`Sound`, so one can be used in place of
+    the other.  Pools are normally shared through :meth:`GameApp.load_sound`.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def volume(self):
+        """
+        The current sound volume of every voice.
+
+        1 means full volume, 0 means mute.  The default value is 1.
+
+        **Invariant**: Must float in the range 0..1.
+        """
+        return self._volume
+
+    @volume.setter
+    def volume(self,value):
+        assert type(value) in [int, float] and value >= 0 and value <= 1, \
+            'value %s is not a valid volume' % repr(value)
+        self._volume = value
+        for sound in self._voices:
+            sound.volume = value
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file for this sound.
+
+        **Immutable**: This value cannot be changed after the sound is loaded.
+
+        **Invariant**: Must be a nonempty string.
+        """
+        return self._source
+
+    @property
+    def voices(self):
+        """
+        The number of voices, which is the most plays of this sound that can overlap.
+
+        **Immutable**: This value cannot be changed after the sound is loaded.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return len(self._voices)
+
+    @property
+    def playing(self):
+        """
+        Whether or not any voice of this sound is currently playing.
+
+        **Immutable**: This value cannot be changed.  You should use the :meth:`play`
+        and :meth:`stop` methods to alter its value.
+
+        **Invariant**: Must be a boolean.
+        """
+        for sound in self._voices:
+            if sound.state == 'play':
+                return True
+        return False
+
+    def __init__(self,source,voices=1):
+        """
+        Creates a new sound pool from a file.
+
+        :param source: The string providing the name of a sound file
+        :type source:  ``str``
+
+        :param voices: The number of voices to load
+        :type voices:  ``int`` > 0
+        """
+        assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
+        assert type(voices) == int and voices > 0, '%s is not a valid voice count' % repr(voices)
+        self._source = source
+        self._volume = 1
+        self._voices = []
+        for pos in range(voices):
+            sound = SoundLoader.load(source)
+            if sound is None:
+                raise IOError('Module game2d cannot read the file %s' % repr(source))
+            sound.load()
+            self._voices.append(sound)
+        # The voices in the order they were last started (the first is reused first)
+        self._order = list(self._voices)
+
+    def play(self,loop=False):
+        """
+        Plays this sound on a free voice.
+
+        If every voice is playing, the one that started first is stopped and reused.
+
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        order = self._order
+        voice = None
+        for sound in order:
+            if sound.state != 'play':
+                voice = sound
+                break
+        if voice is None:
+            voice = order[0]
+            voice.stop()
+        order.remove(voice)
+        order.append(voice)
+        voice.loop = loop
+        voice.play()
+
+    def stop(self):
+        """
+        Stops every voice of this sound.
+
+        This will stop the sound immediately, even if it is looping.
+        """
+        for sound in self._voices:
+            sound.stop()
+
+
 # #mark -
 class SoundLibrary(object):
     """
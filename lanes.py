@@ -11,7 +11,8 @@ a bunch of lane objects (and this is exactly how the level files are organized).
 You should think of each lane as a secondary subcontroller.  The level is a subcontroller
 to app, but then that subcontroller is broken up into several other subcontrollers, one
 for each lane.  That means that lanes need to have a traditional subcontroller set-up.
-They need their own initializer, update, and draw methods.
+They need their own initializer and draw methods.  They do not move themselves: the
+Traffic class (below the lanes) moves the obstacles of every lane at once.
 
 There are potentially a lot of classes here -- one for each type of lane.  But this is
 another place where using subclasses is going to help us A LOT.  Most of your code will
@@ -29,6 +30,9 @@ December 20 2020
 from game2d import *
 from consts import *
 from models import *
+import numpy as np
+import bisect
+import math
 
 # PRIMARY RULE: Lanes are not allowed to access anything in any level.py or app.py.
 # They can only access models.py and const.py. If you need extra information from the
@@ -57,11 +61,71 @@ class Lane(object):         # You are permitted to change the parent class if yo
     # Invariant: _tile is a GTile
 
     # Attribute _objs: List of objects in the lane instance
-    # Invariant: _objs is a list or None
+    # Invariant: _objs is a list of GBody objects (lightweight images) or None
 
     # Attribute _lanespeed: Speed the lane moves in number of pixels/second, if it moves.
     # Invariant: _lanespeed is a number or None
 
+    # Attribute _xs: The horizontal positions of the objects in _objs (in order)
+    # Invariant: _xs is a 1d float numpy array with one element per object
+
+    # Attribute _synced: Whether the x attribute of each object agrees with _xs
+    # Invariant: _synced is a bool
+
+    # Attribute _lefts: Offsets from each object center to its hitbox left edge
+    # Invariant: _lefts is a 1d float numpy array with one element per object
+
+    # Attribute _rights: Offsets from each object center to its hitbox right edge
+    # Invariant: _rights is a 1d float numpy array with one element per object
+
+    # Attribute _bottoms: The bottom hitbox edge of each object
+    # Invariant: _bottoms is a 1d float numpy array with one element per object
+
+    # Attribute _tops: The top hitbox edge of each object
+    # Invariant: _tops is a 1d float numpy array with one element per object
+
+    # Attribute _reach: The widest object hitbox in the lane
+    # Invariant: _reach is a number >= 0
+
+    # Attribute _order: The object indices, sorted by the left edge of their hitbox
+    # Invariant: _order is a list of ints (a permutation of the object indices)
+
+    # Attribute _keys: The hitbox left edges in _order, as of the last sort
+    # Invariant: _keys is a sorted list of floats the same size as _order
+
+    # Attribute _anchor: The position of the first object as of the last sort
+    # Invariant: _anchor is a float (or None if the lane is empty)
+
+    # Attribute _sorted: Whether _order is still correct (no object has wrapped)
+    # Invariant: _sorted is a bool
+
+    # Attribute _batch: The batch that draws the objects of this lane, if any
+    # Invariant: _batch is a GBatch object (or None to draw each object separately)
+
+    # Attribute _display: The positions to draw the objects at, if not their actual ones
+    # Invariant: _display is a 1d float numpy array like _xs (or None)
+
+    # Attribute _x0: The positions of the objects at time 0, if they are timed
+    # Invariant: _x0 is a 1d float numpy array like _xs (or None if _xs is updated)
+
+    # Attribute _low: The left edge of the offscreen buffer, if the objects are timed
+    # Invariant: _low is a number
+
+    # Attribute _period: The distance an object moves before it wraps back around
+    # Invariant: _period is a number > 0
+
+    # Attribute _time: The time in seconds that the objects should be at, if timed
+    # Invariant: _time is a float >= 0
+
+    # Attribute _placed: The time that _xs was last computed for, if timed
+    # Invariant: _placed is a float >= 0
+
+    # Attribute _laps: The number of times each object had wrapped at time _placed
+    # Invariant: _laps is a 1d float numpy array like _xs
+
+    # Attribute _schedule: When each grid column is occupied, for a frog resting there
+    # Invariant: _schedule is a Schedule object (or None if there is no table)
+
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getTile(self):
@@ -73,9 +137,204 @@ class Lane(object):         # You are permitted to change the parent class if yo
     def getObjs(self):
         """
         Returns a list of objects for a lane instance if any
+
+        The positions of the objects are brought up to date first.
         """
+        self._sync()
         return self._objs
 
+    def getPositions(self):
+        """
+        Returns the array of horizontal object positions for this lane
+        """
+        self._place()
+        return self._xs
+
+    def getPositionsAt(self, t):
+        """
+        Returns a new array of the horizontal object positions at time t
+
+        This does not move the objects.  It is only possible if the lane is timed.
+
+        Parameter t: The time in seconds
+        Precondition: t is a number >= 0, and the lane is timed (see setTimed)
+        """
+        xs = np.empty(len(self._x0))
+        self._positions(t, xs)
+        return xs
+
+    def setTimed(self, w, buffer):
+        """
+        Makes the object positions a function of time, starting from the current ones
+
+        Objects in a moving lane all move at the same speed and wrap around the
+        offscreen buffer, so the position of each one at time t is
+
+            low + (x0 - low + speed*t) mod period
+
+        where x0 is its position at time 0, low is the left edge of the buffer and
+        period is the width of the lane plus both buffers.  A timed lane keeps x0 and
+        only computes the positions when they are needed (for a collision or for
+        drawing) at the time set with setTime.  Positions never drift, however long
+        the lane runs, and lanes that nothing looks at cost nothing.
+
+        Parameter w: The width of a lane in pixels
+        Precondition: w is a number (int or float)
+
+        Parameter buffer: The offscreen buffer for obstacles in a lane
+        Precondition: buffer is a number (int or float)
+        """
+        self._x0 = self._xs.copy()
+        self._low = -buffer*GRID_SIZE
+        self._period = w + 2*buffer*GRID_SIZE
+        self._time = 0.0
+        self._placed = 0.0
+        self._laps = self._positions(0.0, self._xs)
+        self._synced = False
+        self._sorted = False
+
+    def setTime(self, t):
+        """
+        Sets the time that the objects of a timed lane should be at
+
+        The positions are not computed until they are needed.
+
+        Parameter t: The time in seconds
+        Precondition: t is a number >= 0, and the lane is timed (see setTimed)
+        """
+        self._time = t
+
+    def getSchedule(self):
+        """
+        Returns the time-to-collision table of this lane (None if it has none)
+        """
+        return self._schedule
+
+    def setSchedule(self, box, columns):
+        """
+        Builds the time-to-collision table of this lane for a frog at rest
+
+        The table records, for every grid column, the times (over one lap of the lane)
+        when an object overlaps a frog resting in the middle of that column of this
+        lane.  The frog's box is normalized and compared with the object hitboxes just
+        as in _hits (see normalize and overlaps), so the table always agrees with it.
+        Only timed lanes that move can have a table.
+
+        Parameter box: The frog's box (left, top, right, bottom) relative to its center
+        Precondition: box is a tuple of four numbers
+
+        Parameter columns: The number of grid columns in the lane
+        Precondition: columns is an int > 0
+        """
+        if self._x0 is None or not self._lanespeed:
+            self._schedule = None
+            return
+
+        y = self._tile.y
+        busy = []
+        for column in range(columns):
+            x = GRID_SIZE*(column+0.5)
+            edges = normalize((x+box[0], y+box[1], x+box[2], y+box[3]))
+            busy.append(self._occupancy(*edges))
+        lap = self._period/abs(self._lanespeed)
+        self._schedule = Schedule(busy, lap, box, y)
+
+    def isSafe(self, column, delay=0):
+        """
+        Returns True if a frog resting in the given column would be safe from this
+        lane, delay seconds from now (None if the lane has no table)
+
+        Parameter column: The grid column
+        Precondition: column is an int in the lane
+
+        Parameter delay: The time from now in seconds
+        Precondition: delay is a number >= 0
+        """
+        if not self._schedule is None:
+            return not self._schedule.isBusy(column, self._time+delay)
+
+    def timeToCollision(self, column):
+        """
+        Returns the seconds until a frog resting in the given column would no longer be
+        safe from this lane (0 if it is not safe now, None if the lane has no table)
+
+        The result is infinite if the column is always safe.
+
+        Parameter column: The grid column
+        Precondition: column is an int in the lane
+        """
+        if not self._schedule is None:
+            return self._schedule.timeToBusy(column, self._time)
+
+    def setPositions(self, xs):
+        """
+        Replaces the array of horizontal object positions (typically with a view
+        into a larger array shared by several lanes)
+
+        Parameter xs: The new position array, with the current positions
+        Precondition: xs is a 1d float numpy array with one element per object
+        """
+        assert len(xs) == len(self._objs), '%s has the wrong size' % repr(xs)
+        self._xs = xs
+        self._synced = False
+
+    def setDisplay(self, xs):
+        """
+        Sets the horizontal positions to draw the objects at (e.g. when interpolating)
+
+        This does not move the obstacles.  Collisions still use the actual positions.
+
+        Parameter xs: The positions to draw at, or None to draw at the actual positions
+        Precondition: xs is None or a 1d float numpy array with one element per object
+        """
+        self._display = xs
+
+    def markMoved(self):
+        """
+        Records that the position array was changed outside of this lane
+        """
+        self._synced = False
+
+    def markWrapped(self):
+        """
+        Records that an object in this lane wrapped around the offscreen buffer
+
+        Objects in a lane all move together, so their left-to-right order only
+        changes when one of them wraps around.
+        """
+        self._sorted = False
+
+    def getExtent(self):
+        """
+        Returns the vertical extent (bottom, top) of the lane and its objects
+        """
+        bottom = self._tile.bottom
+        top = self._tile.top
+        if len(self._objs) > 0:
+            bottom = min(bottom, float(self._bottoms.min()))
+            top = max(top, float(self._tops.max()))
+        return (bottom, top)
+
+    def setBatch(self, batch):
+        """
+        Draws the objects of this lane with the given batch from now on
+
+        The objects are added to the batch.  The lane still draws its tile, but the
+        objects are only drawn when the batch is drawn (after the lane is drawn).
+
+        Parameter batch: The batch to draw the objects with
+        Precondition: batch is a GBatch object
+        """
+        self._batch = batch
+        for obj in self._objs:
+            batch.add(obj)
+
+    def isMoving(self):
+        """
+        Returns True if the obstacles in this lane move (roads and water)
+        """
+        return self._tile.source == "road.png" or self._tile.source == "water.png"
+
     def getLaneSpeed(self):
         """
         Returns the speed of the lane, if there is one.
@@ -110,31 +369,260 @@ class Lane(object):         # You are permitted to change the parent class if yo
 
         self._objs = []
 
-        if "objects" in lanes_list[pos]:
-            objects_list = lanes_list[pos]["objects"]
+        if "compiled" in lanes_list[pos]:
+            objects_list = lanes_list[pos]["compiled"]
+        else:
+            objects_list = compile_objects(dic, pos, hitdic)
+
+        for obj in objects_list:
+            self._objs.append(GBody(**obj))
+
+        self._xs = np.array([obj.x for obj in self._objs],dtype=float)
+        self._lefts = np.array([obj.left-obj.x for obj in self._objs],dtype=float)
+        self._rights = np.array([obj.right-obj.x for obj in self._objs],dtype=float)
+        self._bottoms = np.array([obj.bottom for obj in self._objs],dtype=float)
+        self._tops = np.array([obj.top for obj in self._objs],dtype=float)
+        self._reach = float((self._rights-self._lefts).max()) if self._objs else 0.0
+        self._synced = True
+        self._sorted = False
+        self._batch = None
+        self._display = None
+        self._x0 = None
+        self._schedule = None
 
-            for obj in objects_list:
-                position = obj["position"]
-                pic = obj["type"] + '.png'
-                file = obj["type"]
-                hitbox = hitdic["images"][file]["hitbox"]
+    # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
 
-                if "speed" in lanes_list[pos] and lanes_list[pos]["speed"] < 0:
-                    self._objs.append(GImage(x = GRID_SIZE*(position+0.5), \
-                    y = self._tile.y, source=pic, angle = 180, hitbox = hitbox))
+    def draw(self, view):
+        """
+        To draw the background tiles and objects for the lane
 
-                else:
-                    self._objs.append(GImage(x = GRID_SIZE*(position+0.5), \
-                    y = self._tile.y, source=pic, hitbox = hitbox))
+        If the lane has a batch, the objects are only brought up to date here, and are
+        drawn when the batch is drawn.
 
-    # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
+        Parameter view: The game view, used in drawing
+        Precondition: view is an instance of GView
+        """
+        self._tile.draw(view)
+        if self._display is None:
+            self._sync()
+        else:
+            for obj, x in zip(self._objs, self._display.tolist()):
+                obj.x = x
+            self._synced = False
+
+        if self._batch is None:
+            for object in self._objs:
+                object.draw(view)
 
-    def update(self, dt, w, buffer):
+    def _sync(self):
         """
-        Updates all of the obstacles in the lane
+        Copies the positions in _xs to the x attribute of each object.
 
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float)
+        Positions are only copied when they have changed since the last sync, so
+        obstacle attributes are only touched when they are needed (e.g. drawing).
+        """
+        self._place()
+        if not self._synced:
+            for obj, x in zip(self._objs, self._xs.tolist()):
+                obj.x = x
+            self._synced = True
+
+    def _place(self):
+        """
+        Computes the positions in _xs for the current time, if the lane is timed
+
+        The objects only need a new sort if one of them has wrapped around since the
+        positions were last computed.
+        """
+        if not self._x0 is None and self._placed != self._time:
+            laps = self._positions(self._time, self._xs)
+            if not np.array_equal(laps, self._laps):
+                self._sorted = False
+                self._laps = laps
+            self._placed = self._time
+            self._synced = False
+
+    def _positions(self, t, out):
+        """
+        Computes the positions of the objects of a timed lane at time t into out
+
+        Returns the number of times each object has wrapped around.
+
+        Parameter t: The time in seconds
+        Precondition: t is a number >= 0
+
+        Parameter out: The array for the positions
+        Precondition: out is a 1d float numpy array like _x0
+        """
+        shifted = self._x0 + (self._lanespeed*t - self._low)
+        laps = np.floor_divide(shifted, self._period)
+        np.subtract(shifted, laps*self._period, out=out)
+        out += self._low
+        return laps
+
+    def _occupancy(self, left, top, right, bottom):
+        """
+        Returns the times (over one lap) when an object hitbox overlaps the given box
+
+        An object overlaps the box when the test in overlaps holds for the two.  The
+        result is a sorted list of disjoint closed intervals [start, end] in
+        0..lap, where lap is the time it takes the lane to move a full period.  An
+        object overlaps the box when its position is in a range, and its position is a
+        linear function of time (until it wraps), so each object adds at most one
+        interval per lap (split in two if it crosses the end of the lap).
+
+        Parameter left, top, right, bottom: The edges of the box
+        Precondition: each is a number, with left <= right and bottom <= top
+        """
+        speed = self._lanespeed
+        lap = self._period/abs(speed)
+        spans = []
+        for k in range(len(self._objs)):
+            if self._bottoms[k] > top or bottom > self._tops[k]:
+                continue
+
+            # The phases (position - low, in 0..period) where the object overlaps
+            first = max(left-self._rights[k]-self._low, 0.0)
+            last = min(right-self._lefts[k]-self._low, self._period)
+            if first > last:
+                continue
+
+            phase = float(self._x0[k])-self._low
+            first = float(first)
+            last = float(last)
+            if speed > 0:
+                start = (first-phase)/speed
+            else:
+                start = (last-phase)/speed
+            start = start % lap
+            end = start+(last-first)/abs(speed)
+            if end > lap:
+                spans.append([0.0, end-lap])
+                end = lap
+            spans.append([start, end])
+
+        # Join intervals that touch (up to rounding), as the column never frees up
+        spans.sort()
+        result = []
+        for span in spans:
+            if result and span[0] <= result[-1][1]+1e-9:
+                result[-1][1] = max(result[-1][1], span[1])
+            else:
+                result.append(span)
+        return [tuple(span) for span in result]
+
+    def _column(self, box):
+        """
+        Returns the grid column of a frog resting with the given box in this lane, or
+        None if the box is not that of a frog at rest (or there is no table)
+
+        Parameter box: The frog's box (left, top, right, bottom)
+        Precondition: box is a tuple of four numbers
+        """
+        if self._schedule is None:
+            return None
+        return self._schedule.findColumn(box)
+
+    def _resort(self):
+        """
+        Sorts the objects by the left edge of their hitboxes
+        """
+        lefts = self._xs+self._lefts
+        self._order = np.argsort(lefts,kind='stable').tolist()
+        self._keys = lefts[self._order].tolist()
+        self._anchor = float(self._xs[0]) if len(self._objs) > 0 else None
+        self._sorted = True
+
+    def _nearby(self, left, right):
+        """
+        Returns the indices of the objects whose hitbox might overlap [left, right]
+
+        The search uses the sorted hitbox edges, so it only looks at objects near the
+        given interval.  Because every object in a lane moves by the same amount, the
+        edges from the last sort are still correct once shifted by the movement of the
+        first object (unless something has wrapped, which forces a new sort).
+
+        Parameter left: The left edge of the interval
+        Precondition: left is a number
+
+        Parameter right: The right edge of the interval
+        Precondition: right is a number >= left
+        """
+        if len(self._objs) == 0:
+            return []
+        self._place()
+        if not self._sorted:
+            self._resort()
+
+        # Pad by a pixel so that rounding in the shift never drops a candidate
+        shift = float(self._xs[0])-self._anchor
+        first = bisect.bisect_left(self._keys, left-self._reach-shift-1)
+        last = bisect.bisect_right(self._keys, right-shift+1)
+        return self._order[first:last]
+
+    def _boxes(self, left, right, step=0, w=0, buffer=0):
+        """
+        Yields the hitbox (left, top, right, bottom) of each object that might meet the
+        interval [left, right] while the objects move by step
+
+        This is the one edge query behind every collision test of a lane.  If step is
+        0, the boxes are those from _nearby.  Otherwise they are those from _moving, at
+        the start of the move (so an object that wraps around is given a box one
+        buffer period away from where it is).
+
+        Parameter left: The left edge of the interval
+        Precondition: left is a number
+
+        Parameter right: The right edge of the interval
+        Precondition: right is a number >= left
+
+        Parameter step: The distance the objects move (negative for left)
+        Precondition: step is a number
+
+        Parameter w: The width of a lane in pixels (only needed if step is not 0)
+        Precondition: w is a number (int or float)
+
+        Parameter buffer: The offscreen buffer for obstacles in a lane (only needed if
+        step is not 0)
+        Precondition: buffer is a number (int or float)
+        """
+        if step == 0:
+            found = [(k, float(self._xs[k])) for k in self._nearby(left, right)]
+        else:
+            found = self._moving(left, right, step, w, buffer)
+        for (k, x) in found:
+            yield (x+self._lefts[k], self._tops[k], x+self._rights[k], self._bottoms[k])
+
+    def _hits(self, box):
+        """
+        Returns True if any object hitbox overlaps the given box
+
+        Parameter box: The box (left, top, right, bottom) to test
+        Precondition: box is a tuple of four numbers
+        """
+        box = normalize(box)
+        for other in self._boxes(box[0], box[2]):
+            if overlaps(box, other):
+                return True
+        return False
+
+    def _moving(self, left, right, step, w, buffer):
+        """
+        Returns (index, start) for each object whose hitbox might meet [left, right]
+        while the objects move by step
+
+        An object that wraps around the offscreen buffer during the move is given a
+        start one buffer period away from its position, so that it moves continuously
+        to where it ends up.
+
+        Parameter left: The left edge of the interval
+        Precondition: left is a number
+
+        Parameter right: The right edge of the interval
+        Precondition: right is a number >= left
+
+        Parameter step: The distance the objects move (negative for left)
+        Precondition: step is a number
 
         Parameter w: The width of a lane in pixels
         Precondition: w is a number (int or float)
@@ -142,34 +630,75 @@ class Lane(object):         # You are permitted to change the parent class if yo
         Parameter buffer: The offscreen buffer for obstacles in a lane
         Precondition: buffer is a number (int or float)
         """
+        lo = -buffer*GRID_SIZE
+        hi = w + buffer*GRID_SIZE
+        period = hi-lo if step >= 0 else lo-hi
+        result = []
+        for shift in (0, period):
+            for k in self._nearby(left+shift-max(step,0), right+shift-min(step,0)):
+                x = float(self._xs[k])
+                if (lo <= x+step <= hi) == (shift == 0):
+                    result.append((k, x-shift))
+        return result
+
+    def _sweeps(self, before, after, step, w, buffer):
+        """
+        Returns True if any object hitbox meets a box moving from before to after,
+        while the objects move by step
 
-        if self._tile.source == "road.png" or self._tile.source == "water.png":
+        Parameter before: The box (left, top, right, bottom) at the start of the move
+        Precondition: before is a tuple of four numbers
 
-            for object in self._objs:
+        Parameter after: The box (left, top, right, bottom) at the end of the move
+        Precondition: after is a tuple of four numbers
 
-                if self._lanespeed >= 0:
-                    object.x = object.x + self._lanespeed * dt
-                    if object.x > w + buffer*GRID_SIZE:
-                        d = object.x - (w + buffer*GRID_SIZE)
-                        object.x = -buffer*GRID_SIZE + d
+        Parameter step: The distance the objects move (negative for left)
+        Precondition: step is a number
 
-                else:
-                    object.x = object.x + self._lanespeed * dt
-                    if object.x < -buffer*GRID_SIZE:
-                        d = object.x - (-buffer*GRID_SIZE)
-                        object.x = w+buffer*GRID_SIZE - d
+        Parameter w: The width of a lane in pixels
+        Precondition: w is a number (int or float)
 
-    def draw(self, view):
+        Parameter buffer: The offscreen buffer for obstacles in a lane
+        Precondition: buffer is a number (int or float)
         """
-        To draw the background tiles and objects for the lane
+        left = min(before[0], after[0])
+        right = max(normalize(before)[2], normalize(after)[2])
+        for box in self._boxes(left, right, step, w, buffer):
+            if sweep(before, after, box, step):
+                return True
+        return False
+
+    def _covers(self, point, step, w, buffer):
+        """
+        Returns True if any object hitbox will contain the given point once the
+        objects move by step
 
-        Parameter view: The game view, used in drawing
-        Precondition: view is an instance of GView
+        Parameter point: The point to test
+        Precondition: point is a tuple of two numbers
+
+        Parameter step: The distance the objects move (negative for left)
+        Precondition: step is a number
+
+        Parameter w: The width of a lane in pixels
+        Precondition: w is a number (int or float)
+
+        Parameter buffer: The offscreen buffer for obstacles in a lane
+        Precondition: buffer is a number (int or float)
         """
-        self._tile.draw(view)
+        box = point+point
+        for (left, top, right, bottom) in self._boxes(point[0]-step, point[0]-step, step, w, buffer):
+            if overlaps(box, (left+step, top, right+step, bottom)):
+                return True
+        return False
+
+    def _holds(self, point):
+        """
+        Returns True if any object hitbox contains the given point
 
-        for object in self._objs:
-            object.draw(view)
+        Parameter point: The point to test
+        Precondition: point is a tuple of two numbers
+        """
+        return self._hits(point+point)
 
 
 class Grass(Lane):                           # We recommend AGAINST changing this one
@@ -205,7 +734,42 @@ class Road(Lane):                           # We recommend AGAINST changing this
         """
 
         if not frog is None:
-            return any (car.collides(frog) for car in self.getObjs())
+            box = frog.getBox()
+            column = self._column(box)
+            if not column is None:
+                return self._schedule.isBusy(column, self._time)
+            return self._hits(box)
+
+    def car_sweeps_frog(self, before, frog, dt, w, buffer):
+        """
+        Returns True if any car meets the frog at any time during the next dt seconds.
+
+        The frog has already moved for this step, from the box before to where it is
+        now, and the cars are about to move for dt seconds.  Both are taken to move at
+        a constant speed, so a fast car (or a long step) cannot pass through the frog
+        without touching it.
+
+        Parameter before: The frog's box (left, top, right, bottom) before it moved
+        Precondition: before is a tuple of four numbers
+
+        Parameter frog: An instance of a Frog GSprite
+        Precondition: frog is a Frog (GSprite) object (or None)
+
+        Parameter dt: The time in seconds of the step
+        Precondition: dt is a number (int or float)
+
+        Parameter w: The width of a lane in pixels
+        Precondition: w is a number (int or float)
+
+        Parameter buffer: The offscreen buffer for obstacles in a lane
+        Precondition: buffer is a number (int or float)
+        """
+        if not frog is None:
+            after = frog.getBox()
+            column = self._column(after) if before == after else None
+            if not column is None:
+                return self._schedule.isBusyDuring(column, self._time, self._time+dt)
+            return self._sweeps(before, after, self._lanespeed*dt, w, buffer)
 
 
 class Water(Lane):
@@ -230,18 +794,89 @@ class Water(Lane):
         Precondition: frog is a Frog (GSprite) object (or None)
         """
         point = (frog.x, frog.y)
+        column = self._column(point+point)
+        if not column is None:
+            return self._schedule.isBusy(column, self._time)
 
-        return any (log.contains(point) for log in self.getObjs())
+        return self._holds(point)
 
-    def frogDrown(self, frog):
+    def setSchedule(self, box, columns):
+        """
+        Builds the time-to-collision table of this lane for a frog at rest
+
+        A frog in the water is safe when a log hitbox holds its center (see
+        frog_on_log and frogDrown), and not its whole box.  So the table is built for
+        the box of the frog's center, which is the box (0, 0, 0, 0) relative to the
+        center.  It records, for every grid column, the times when a log hitbox holds
+        the middle of that column, exactly as _holds would find.
+
+        Parameter box: The frog's box (left, top, right, bottom) relative to its center
+        (unused, as only the center matters)
+        Precondition: box is a tuple of four numbers
+
+        Parameter columns: The number of grid columns in the lane
+        Precondition: columns is an int > 0
+        """
+        super().setSchedule((0.0, 0.0, 0.0, 0.0), columns)
+
+    def isSafe(self, column, delay=0):
+        """
+        Returns True if a frog resting in the given column would be on a log, delay
+        seconds from now (None if the lane has no table)
+
+        Parameter column: The grid column
+        Precondition: column is an int in the lane
+
+        Parameter delay: The time from now in seconds
+        Precondition: delay is a number >= 0
+        """
+        if not self._schedule is None:
+            return self._schedule.isBusy(column, self._time+delay)
+
+    def timeToCollision(self, column):
+        """
+        Returns the seconds until a frog resting in the given column would no longer be
+        on a log (0 if it is not on one now, None if the lane has no table)
+
+        The result is infinite if the column always has a log.
+
+        Parameter column: The grid column
+        Precondition: column is an int in the lane
+        """
+        if not self._schedule is None:
+            return self._schedule.timeToFree(column, self._time)
+
+    def frogDrown(self, frog, dt=0, w=0, buffer=0):
         """
         Returns True if the frog is on a water tile and not on a log.
 
+        If dt is given, the frog has already moved for the next dt seconds, and the
+        logs are tested where they will be once they have moved too, so that the frog
+        and the logs are compared at the same time.
+
         Parameter frog: An instance of a Frog GSprite
         Precondition: frog is a Frog (GSprite) object (or None)
+
+        Parameter dt: The time in seconds of the step (0 to test the logs as they are)
+        Precondition: dt is a number (int or float)
+
+        Parameter w: The width of a lane in pixels (only needed if dt is not 0)
+        Precondition: w is a number (int or float)
+
+        Parameter buffer: The offscreen buffer for obstacles in a lane (only needed if
+        dt is not 0)
+        Precondition: buffer is a number (int or float)
         """
         if not frog is None:
-            return (self.getTile().collides(frog) and not self.frog_on_log(frog))
+            point = (frog.x, frog.y)
+            column = self._column(point+point)
+            if dt == 0:
+                safe = self.frog_on_log(frog)
+            elif not column is None:
+                safe = self._schedule.isBusy(column, self._time+dt)
+            else:
+                safe = self._covers(point, self._lanespeed*dt, w, buffer)
+            return (self.getTile().collides(frog) and not safe)
 
 
 class Hedge(Lane):
@@ -360,3 +995,494 @@ class Hedge(Lane):
         return len(self._exitlist) == 0
 
 # IF YOU NEED ADDITIONAL LANE CLASSES, THEY GO HERE
+
+class Traffic(object):
+    """
+    A class to move the obstacles of every lane in a level at once.
+
+    The positions of all moving obstacles are stored in one contiguous numpy array,
+    and each moving lane is given a view into its part of that array.  That way all
+    of the lanes can be advanced (and wrapped around the offscreen buffer) with a
+    handful of array operations per frame, rather than one attribute update per
+    obstacle.
+
+    If the traffic is timed, the obstacles are not moved at all.  Instead every lane
+    is timed (see Lane.setTimed), and an update only advances the clock.  Each lane
+    computes its positions from the time when they are needed.
+    """
+
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+
+    # Attribute _xs: The horizontal positions of all moving obstacles (if the traffic is
+    # timed, each lane only brings its part up to date when it is needed)
+    # Invariant: _xs is a 1d float numpy array
+
+    # Attribute _speeds: The speed of each obstacle in _xs (that of its lane)
+    # Invariant: _speeds is a 1d float numpy array the same size as _xs
+
+    # Attribute _lanes: The moving lanes, which hold views into _xs
+    # Invariant: _lanes is a list of Lane objects
+
+    # Attribute _owners: The position in _lanes of the lane owning each obstacle
+    # Invariant: _owners is a 1d int numpy array the same size as _xs
+
+    # Attribute _prev: The positions in _xs before the last update
+    # Invariant: _prev is a 1d float numpy array the same size as _xs
+
+    # Attribute _wrapped: Which obstacles wrapped around in the last update
+    # Invariant: _wrapped is a 1d bool numpy array the same size as _xs
+
+    # Attribute _shown: The interpolated positions to draw the obstacles at
+    # Invariant: _shown is a 1d float numpy array the same size as _xs
+
+    # Attribute _width: The width of a lane in pixels
+    # Invariant: _width is a number
+
+    # Attribute _buffer: The offscreen buffer for obstacles in a lane
+    # Invariant: _buffer is a number
+
+    # Attribute _timed: Whether the lanes compute their positions from the time
+    # Invariant: _timed is a bool
+
+    # Attribute _time: The time in seconds since the traffic started moving
+    # Invariant: _time is a float >= 0
+
+    # Attribute _before: The value of _time before the last update
+    # Invariant: _before is a float >= 0
+
+    # Attribute _error: The rounding error of _time (so that the time does not drift)
+    # Invariant: _error is a float
+
+    # INITIALIZER TO COLLECT THE LANE POSITIONS
+    def __init__(self, lanes, w, buffer, timed=False):
+        """
+        Initializes the shared position array from the given lanes
+
+        Parameter lanes: The lanes of a level
+        Precondition: lanes is a list of Lane objects
+
+        Parameter w: The width of a lane in pixels
+        Precondition: w is a number (int or float)
+
+        Parameter buffer: The offscreen buffer for obstacles in a lane
+        Precondition: buffer is a number (int or float)
+
+        Parameter timed: Whether the lanes compute their positions from the time
+        Precondition: timed is a bool
+        """
+        self._lanes = [lane for lane in lanes if lane.isMoving()]
+        self._width = w
+        self._buffer = buffer
+        self._timed = timed
+        self._time = 0.0
+        self._before = 0.0
+        self._error = 0.0
+
+        arrays = [lane.getPositions() for lane in self._lanes]
+        speeds = [np.full(len(array),lane.getLaneSpeed(),dtype=float)
+                  for (lane, array) in zip(self._lanes, arrays)]
+        self._xs = np.concatenate(arrays) if arrays else np.zeros(0)
+        self._speeds = np.concatenate(speeds) if speeds else np.zeros(0)
+        self._owners = np.repeat(np.arange(len(arrays)),[len(a) for a in arrays])
+        self._prev = self._xs.copy()
+        self._wrapped = np.zeros(len(self._xs),dtype=bool)
+        self._shown = self._xs.copy()
+
+        start = 0
+        for lane in self._lanes:
+            end = start+len(lane.getPositions())
+            lane.setPositions(self._xs[start:end])
+            lane.setDisplay(None)
+            if timed:
+                lane.setTimed(w, buffer)
+            start = end
+
+    def update(self, dt):
+        """
+        Moves every obstacle in every lane, wrapping them around the buffer
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self._timed:
+            # Compensated (Kahan) summation, so many small steps add up exactly
+            self._before = self._time
+            step = dt-self._error
+            self._time = self._before+step
+            self._error = (self._time-self._before)-step
+            for lane in self._lanes:
+                lane.setTime(self._time)
+            return
+
+        self._prev[:] = self._xs
+        wrapped = advance(self._xs, self._speeds, dt, self._width, self._buffer)
+        self._wrapped = wrapped
+        for lane in self._lanes:
+            lane.markMoved()
+        if wrapped.any():
+            for pos in np.unique(self._owners[wrapped]).tolist():
+                self._lanes[pos].markWrapped()
+
+    def interpolate(self, alpha):
+        """
+        Sets every lane to draw its obstacles between their last two positions
+
+        An obstacle is drawn at prev + alpha*(current-prev), except that obstacles that
+        just wrapped around are drawn at their current position.  If alpha is 1, the
+        obstacles are drawn at their current positions.  If the traffic is timed, the
+        obstacles are simply drawn where they were at that fraction of the last update.
+
+        Parameter alpha: The fraction of the way from the previous to current positions
+        Precondition: alpha is a number in 0..1
+        """
+        if alpha >= 1:
+            for lane in self._lanes:
+                lane.setDisplay(None)
+            return
+
+        if self._timed:
+            t = self._before + alpha*(self._time-self._before)
+            for lane in self._lanes:
+                lane.setDisplay(lane.getPositionsAt(t))
+            return
+
+        np.subtract(self._xs, self._prev, out=self._shown)
+        self._shown *= alpha
+        self._shown += self._prev
+        self._shown[self._wrapped] = self._xs[self._wrapped]
+
+        start = 0
+        for lane in self._lanes:
+            end = start+len(lane.getPositions())
+            lane.setDisplay(self._shown[start:end])
+            start = end
+
+
+class Schedule(object):
+    """
+    A class representing a time-to-collision table for a lane.
+
+    The obstacles of a moving lane repeat exactly after one lap (the time it takes
+    the lane to move by the width of the lane and both offscreen buffers).  So whether
+    a frog resting in a grid column is touched by an obstacle at time t only depends
+    on t modulo the lap.  A schedule stores, for each column, the intervals of the lap
+    when the column is busy (an obstacle overlaps the frog box there).  Each question
+    is then a bisection over the few intervals of one column.
+
+    The table only describes a frog at rest: centered in a column of the lane, with
+    the box the table was built for.
+    """
+
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+
+    # Attribute _lap: The time in seconds after which the lane repeats
+    # Invariant: _lap is a float > 0
+
+    # Attribute _starts: For each column, the starts of the busy intervals
+    # Invariant: _starts is a list (one per column) of sorted lists of floats in 0..lap
+
+    # Attribute _ends: For each column, the ends of the busy intervals
+    # Invariant: _ends is a list (one per column) of lists of floats like _starts
+
+    # Attribute _box: The frog's box (left, top, right, bottom) relative to its center
+    # Invariant: _box is a tuple of four numbers
+
+    # Attribute _y: The vertical center of the lane
+    # Invariant: _y is a number
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getLap(self):
+        """
+        Returns the time in seconds after which the lane repeats
+        """
+        return self._lap
+
+    def getColumns(self):
+        """
+        Returns the number of grid columns in the table
+        """
+        return len(self._starts)
+
+    def getWindows(self, column):
+        """
+        Returns the busy intervals (start, end) of a column, over one lap
+
+        Parameter column: The grid column
+        Precondition: column is an int in 0..getColumns()-1
+        """
+        return list(zip(self._starts[column], self._ends[column]))
+
+    # INITIALIZER TO STORE THE INTERVALS
+    def __init__(self, busy, lap, box, y):
+        """
+        Initializes the table from the busy intervals of each column
+
+        Parameter busy: For each column, the sorted disjoint busy intervals
+        Precondition: busy is a list of lists of (start, end) pairs in 0..lap
+
+        Parameter lap: The time in seconds after which the lane repeats
+        Precondition: lap is a number > 0
+
+        Parameter box: The frog's box (left, top, right, bottom) relative to its center
+        Precondition: box is a tuple of four numbers
+
+        Parameter y: The vertical center of the lane
+        Precondition: y is a number
+        """
+        self._lap = float(lap)
+        self._starts = [[span[0] for span in spans] for spans in busy]
+        self._ends = [[span[1] for span in spans] for spans in busy]
+        self._box = tuple(box)
+        self._y = y
+
+    # ADDITIONAL METHODS (LOOKUPS)
+    def findColumn(self, box):
+        """
+        Returns the column of a frog resting with the given box, or None if the box
+        is not the one of this table at the middle of a column
+
+        Parameter box: The frog's box (left, top, right, bottom)
+        Precondition: box is a tuple of four numbers
+        """
+        x = box[0]-self._box[0]
+        column = int(round(x/GRID_SIZE-0.5))
+        if not 0 <= column < len(self._starts):
+            return None
+        x = GRID_SIZE*(column+0.5)
+        y = self._y
+        expect = (x+self._box[0], y+self._box[1], x+self._box[2], y+self._box[3])
+        for (a, b) in zip(box, expect):
+            if abs(a-b) > 1e-6:
+                return None
+        return column
+
+    def isBusy(self, column, t):
+        """
+        Returns True if the column is busy at time t
+
+        Parameter column: The grid column
+        Precondition: column is an int in 0..getColumns()-1
+
+        Parameter t: The time in seconds
+        Precondition: t is a number
+        """
+        t = t % self._lap
+        pos = bisect.bisect_right(self._starts[column], t)-1
+        return pos >= 0 and t <= self._ends[column][pos]
+
+    def isBusyDuring(self, column, t0, t1):
+        """
+        Returns True if the column is busy at any time from t0 to t1
+
+        Parameter column: The grid column
+        Precondition: column is an int in 0..getColumns()-1
+
+        Parameter t0: The start time in seconds
+        Precondition: t0 is a number
+
+        Parameter t1: The end time in seconds
+        Precondition: t1 is a number >= t0
+        """
+        if self.isBusy(column, t0):
+            return True
+        return self.timeToBusy(column, t0) <= t1-t0
+
+    def timeToBusy(self, column, t):
+        """
+        Returns the seconds from time t until the column is busy (0 if it is busy,
+        infinite if it never is)
+
+        Parameter column: The grid column
+        Precondition: column is an int in 0..getColumns()-1
+
+        Parameter t: The time in seconds
+        Precondition: t is a number
+        """
+        starts = self._starts[column]
+        if not starts:
+            return math.inf
+        if self.isBusy(column, t):
+            return 0.0
+        t = t % self._lap
+        pos = bisect.bisect_right(starts, t)
+        if pos < len(starts):
+            return starts[pos]-t
+        return starts[0]+self._lap-t
+
+    def timeToFree(self, column, t):
+        """
+        Returns the seconds from time t until the column is not busy (0 if it is not
+        busy, infinite if it always is)
+
+        Parameter column: The grid column
+        Precondition: column is an int in 0..getColumns()-1
+
+        Parameter t: The time in seconds
+        Precondition: t is a number
+        """
+        starts = self._starts[column]
+        ends = self._ends[column]
+        if not self.isBusy(column, t):
+            return 0.0
+
+        # Follow the busy intervals that touch, across the end of the lap if needed
+        t = t % self._lap
+        pos = bisect.bisect_right(starts, t)-1
+        wait = ends[pos]-t
+        for step in range(len(starts)):
+            if ends[pos] < self._lap:
+                return wait
+            pos = 0
+            if starts[0] > 0:
+                return wait
+            wait += ends[0]
+        return math.inf
+
+
+def compile_objects(dic, pos, hitdic):
+    """
+    Returns the GBody keyword arguments for each object in a lane
+
+    The result resolves everything that the level file leaves implicit: the image
+    file, the pixel position, the angle (objects face left in lanes with negative
+    speed) and the size and hitbox from the object data file.
+
+    Parameter dic: dic is the main loaded JSON file
+    Precondition: dic is a dictionary
+
+    Parameter pos: pos is the order the lane goes in
+    Precondition: pos is an int >= 0
+
+    Parameter hitdic: hitdic is the JSON file for objects
+    Precondition: hitdic is a dictionary
+    """
+    lane = dic['lanes'][pos]
+    result = []
+
+    for obj in lane.get("objects", []):
+        position = obj["position"]
+        pic = obj["type"] + '.png'
+        file = obj["type"]
+        hitbox = hitdic["images"][file]["hitbox"]
+        size = hitdic["images"][file]["size"]
+
+        keywords = {'x':GRID_SIZE*(position+0.5), 'y':GRID_SIZE*(pos+0.5),
+                    'width':size[0], 'height':size[1], 'source':pic, 'hitbox':hitbox}
+        if "speed" in lane and lane["speed"] < 0:
+            keywords['angle'] = 180
+        result.append(keywords)
+
+    return result
+
+
+def advance(xs, speeds, dt, w, buffer):
+    """
+    Moves the positions in xs (in place), wrapping them around the offscreen buffer
+
+    Returns a boolean numpy array marking the positions that wrapped around.
+
+    An obstacle moving right that passes the right edge of the buffer reappears on
+    the left, and an obstacle moving left that passes the left edge reappears on the
+    right.
+
+    Parameter xs: The horizontal obstacle positions
+    Precondition: xs is a 1d float numpy array
+
+    Parameter speeds: The obstacle speeds in pixels/second
+    Precondition: speeds is a number or a numpy array the same size as xs
+
+    Parameter dt: The time in seconds since last update
+    Precondition: dt is a number (int or float)
+
+    Parameter w: The width of a lane in pixels
+    Precondition: w is a number (int or float)
+
+    Parameter buffer: The offscreen buffer for obstacles in a lane
+    Precondition: buffer is a number (int or float)
+    """
+    lo = -buffer*GRID_SIZE
+    hi = w + buffer*GRID_SIZE
+    xs += speeds*dt
+
+    forward = (speeds >= 0) & (xs > hi)
+    xs[forward] = lo + (xs[forward]-hi)
+
+    backward = (speeds < 0) & (xs < lo)
+    xs[backward] = hi - (xs[backward]-lo)
+    return forward | backward
+
+
+def normalize(box):
+    """
+    Returns the box (left, top, right, bottom) that the overlap tests actually use
+
+    The box of a sprite turned sideways (such as the frog) has its top below its bottom
+    (see GObject._bbox).  The overlap test of GObject.collides then only counts the
+    bottom edge of the box, and it likewise only counts the left edge of a box whose
+    right edge is to the left of it.  This returns that flattened box, with
+    left <= right and bottom <= top, so that every test in this module (and every
+    time-to-collision table) agrees with GObject.collides.
+
+    Parameter box: The box to normalize
+    Precondition: box is a tuple of four numbers
+    """
+    (left, top, right, bottom) = box
+    return (left, max(top, bottom), max(right, left), bottom)
+
+
+def overlaps(box0, box1):
+    """
+    Returns True if two boxes (left, top, right, bottom) overlap, edges included
+
+    Both boxes must be normalized (see normalize).
+
+    Parameter box0: The first box
+    Precondition: box0 is a tuple of four numbers, with left <= right, bottom <= top
+
+    Parameter box1: The second box
+    Precondition: box1 is a tuple of four numbers, with left <= right, bottom <= top
+    """
+    return (box1[0] <= box0[2] and box0[0] <= box1[2] and
+            box1[3] <= box0[1] and box0[3] <= box1[1])
+
+
+def sweep(before, after, box, step):
+    """
+    Returns True if a box moving from before to after meets a box moving right by step
+
+    Boxes are tuples (left, top, right, bottom), and both boxes move (and the first
+    may change size) at a constant rate over the move.  Each edge test is then linear
+    in the fraction of the move, and so holds over an interval of it; the boxes meet
+    if the intervals of all four tests overlap.  At the end of the move, this is the
+    same test as overlaps, and the moving box is normalized the same way (see
+    normalize).
+
+    Parameter before: The first box at the start of the move
+    Precondition: before is a tuple of four numbers
+
+    Parameter after: The first box at the end of the move
+    Precondition: after is a tuple of four numbers
+
+    Parameter box: The second box at the start of the move
+    Precondition: box is a tuple of four numbers (with left <= right, bottom <= top)
+
+    Parameter step: The distance the second box moves (negative for left)
+    Precondition: step is a number
+    """
+    (l0,t0,r0,b0) = normalize(before)
+    (l1,t1,r1,b1) = normalize(after)
+    (left,top,right,bottom) = box
+
+    # The value of each test at the start and end of the move (it holds if >= 0)
+    tests = ((right-l0, right+step-l1), (r0-left, r1-left-step),
+             (top-b0, top-b1), (t0-bottom, t1-bottom))
+    start = 0.0
+    end = 1.0
+    for (f0, f1) in tests:
+        if f0 < 0 and f1 < 0:
+            return False
+        if f0 < 0:
+            start = max(start, f0/(f0-f1))
+        elif f1 < 0:
+            end = min(end, f0/(f0-f1))
+    return start <= end
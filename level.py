@@ -19,6 +19,7 @@ from game2d import *
 from consts import *
 from lanes  import *
 from models import *
+import math
 
 # PRIMARY RULE: Level can only access attributes in models.py or lanes.py using getters
 # and setters. Level is NOT allowed to access anything in app.py (Subcontrollers are not
@@ -81,23 +82,65 @@ class Level(object):
     # Invariant: _death is a Death (GSprite) object (or None)
 
     # Attribute _deathSound: The splat sound for when the frog dies
-    # Invariant: _deathSound is a Sound object
+    # Invariant: _deathSound is a SoundPool object (shared by every level)
 
     # Attribute _exitSound: The trill sound for when the frog enters an exit
-    # Invariant: _exitSound is a Sound object
+    # Invariant: _exitSound is a SoundPool object (shared by every level)
 
     # Attribute _lanes: A list of all the lanes in a json
     # Invariant: _lanes is a list consisting of Grass, Road, Water, Hedge objects
 
+    # Attribute _traffic: The positions of every moving obstacle, updated as a batch
+    # Invariant: _traffic is a Traffic object
+
+    # Attribute _profiler: The profiler for the phases of update
+    # Invariant: _profiler is a GProfiler object (possibly disabled)
+
+    # Attribute _batch: The batch that draws the obstacles of every moving lane
+    # Invariant: _batch is a GBatch object
+
+    # Attribute _rows: For each grid row, the lanes whose tile or objects reach that row
+    # Invariant: _rows is a list (one per lane) of lists of Lane objects, in lane order
+
     # Attribute _frog: An attribute for the instance of a Frog GSprite
     # Invariant: _frog is a Frog (GSprite) object (or None)
 
+    # Attribute _carried: How far a log carried the frog in the last update
+    # Invariant: _carried is a number (0 if the frog was not carried)
+
+    # Attribute _frogx: The actual x of the frog, while it is drawn behind it (so that
+    # it stays on its log when the obstacles are drawn between two updates)
+    # Invariant: _frogx is a number, or None if the frog is drawn where it is
+
+    # Attribute _lastbox: The frog's box at the last collision test
+    # Invariant: _lastbox is a tuple (left, top, right, bottom), or None if there was
+    # no frog at the last test
+
     # Attribute _lives: List of frog head GImages representing the frog's lives
     # Invariant: _lives is a list consisting of GImages or empty
 
     # Attribute _lifelabel: The label "LIVES:" next to the frog heads
     # Invariant: _lifelabel An instance of a GLabel
 
+    # Attribute _score: The points scored so far in this level
+    # Invariant: _score is an int >= 0
+
+    # Attribute _timer: The seconds the frog has left to reach an exit in this life
+    # Invariant: _timer is a number in 0..FROG_TIME
+
+    # Attribute _timeout: Whether the frog dies when its timer runs out
+    # Invariant: _timeout is a bool
+
+    # Attribute _bestrow: The highest grid row the frog has reached in this life
+    # Invariant: _bestrow is an int >= 0
+
+    # Attribute _framerate: The measured frames per second (given by the app)
+    # Invariant: _framerate is a number >= 0
+
+    # Attribute _readouts: The score, timer and frame rate texts on the life bar
+    # Invariant: _readouts is a list of GText objects (score, timer and, if SHOW_FPS
+    # is True, frame rate)
+
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getWidth(self):
         """
@@ -112,6 +155,82 @@ class Level(object):
         """
         return self._height
 
+    def getScore(self):
+        """
+        Returns the points scored so far in this level
+        """
+        return self._score
+
+    def setFramerate(self, fps):
+        """
+        Sets the frame rate shown on the life bar
+
+        Parameter fps: The measured frames per second
+        Precondition: fps is a number >= 0
+        """
+        self._framerate = fps
+
+    def setTimeout(self, timeout):
+        """
+        Sets whether the frog dies when its timer runs out (FROG_TIMEOUT by default)
+
+        Otherwise the timer is only shown on the life bar (and scored at an exit).
+
+        Parameter timeout: Whether the frog dies when its timer runs out
+        Precondition: timeout is a bool
+        """
+        self._timeout = timeout
+
+    def setProfiler(self, profiler):
+        """
+        Sets the profiler to record the phases of update with
+
+        The phases are 'level.movefrog', 'level.killfroggy', 'level.lanes',
+        'level.landing' and 'level.clock'.
+
+        Parameter profiler: The profiler to record with
+        Precondition: profiler is a GProfiler object
+        """
+        self._profiler = profiler
+
+    def isSafe(self, column, row, delay=0):
+        """
+        Returns True if a frog resting at the given grid cell would be safe from the
+        obstacles of that row, delay seconds from now
+
+        This is a lookup in the time-to-collision table of the lane in that row (see
+        the class Schedule in lanes.py), so it is cheap enough for AI and path finding.
+        A cell on a road is safe when no car touches the frog, and a cell on the water
+        is safe when a log holds the frog.  Rows without moving obstacles (or lanes
+        without a table) return None.
+
+        Parameter column: The grid column
+        Precondition: column is an int in 0..width/GRID_SIZE-1
+
+        Parameter row: The grid row (the lane position)
+        Precondition: row is an int in 0..number of lanes-1
+
+        Parameter delay: The time from now in seconds
+        Precondition: delay is a number >= 0
+        """
+        return self._lanes[row].isSafe(column, delay)
+
+    def timeToCollision(self, column, row):
+        """
+        Returns the seconds until a frog resting at the given grid cell would no longer
+        be safe from the obstacles of that row
+
+        The result is 0 if the cell is not safe now, infinite if it is always safe,
+        and None if the row has no time-to-collision table.
+
+        Parameter column: The grid column
+        Precondition: column is an int in 0..width/GRID_SIZE-1
+
+        Parameter row: The grid row (the lane position)
+        Precondition: row is an int in 0..number of lanes-1
+        """
+        return self._lanes[row].timeToCollision(column)
+
     def getCenter(self):
         """
         Returns the tile of the lane that is in the center of the game
@@ -120,10 +239,16 @@ class Level(object):
 
         return (self._lanes[x]).getTile()
 
-    # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
-    def __init__(self, dic, hitdic):
+    # LEVEL COMPILER
+    @staticmethod
+    def compile(dic, hitdic):
         """
-        Initializes the frog, lanes, sounds, and other things here and there.
+        Returns the tuple (dic, hitdic) with every lane object resolved in advance
+
+        The result is a copy of the level file, where each lane has an extra key
+        "compiled" with the keyword arguments for each of its objects (see the function
+        compile_objects in lanes.py).  Lanes use these instead of looking up positions
+        and hitboxes.  The result is meant to be cached with GameApp.load_compiled.
 
         Parameter dic: dic is the main loaded JSON file
         Precondition: dic is a dictionary
@@ -131,35 +256,50 @@ class Level(object):
         Parameter hitdic: hitdic is the JSON file for objects
         Precondition: hitdic is a dictionary
         """
-        self._hitdic = hitdic
-        lanes_list = dic['lanes']
-        self._width = (dic['size'][0]) * GRID_SIZE
-        self._height = ((dic['size'][1]) * GRID_SIZE) + GRID_SIZE
-        self._start = dic["start"]
-        self._buffer = dic["offscreen"]
-        self._switch = 3
-        self._animator = None
-        self._animatorD = None
-        self._death = None
-        self._deathSound = Sound(SPLAT_SOUND)
-        self._exitSound = Sound(TRILL_SOUND)
-        self._lanes = []
+        result = dict(dic)
+        result['lanes'] = []
 
-        for pos in range(len(lanes_list)):
-            type = lanes_list[pos]["type"]
-            pic = type + '.png'
+        for pos in range(len(dic['lanes'])):
+            lane = dict(dic['lanes'][pos])
+            lane['compiled'] = compile_objects(dic, pos, hitdic)
+            result['lanes'].append(lane)
 
-            if type == "grass":
-                self._lanes.append(Grass(dic=dic,pos=pos,back=pic,hitdic=hitdic))
-            if type == "road":
-                self._lanes.append(Road(dic=dic,pos=pos,back=pic,hitdic=hitdic))
-            if type == "water":
-                self._lanes.append(Water(dic=dic,pos=pos,back=pic,hitdic=hitdic))
-            if type == "hedge":
-                self._lanes.append(Hedge(dic=dic,pos=pos,back=pic,hitdic=hitdic))
+        return (result, hitdic)
 
-        self._frog = Frog(x=self._start[0],y=self._start[1],hitdic=self._hitdic)
-        self._lifebar(dic['size'][1], dic['size'][0])
+    # LEVEL BUILDER
+    @classmethod
+    def build(cls, dic, hitdic):
+        """
+        Returns a generator that makes a new level in small steps
+
+        The generator yields after making each lane (and after each of the other slow
+        steps), so that a loader can spread the work over several frames (see the class
+        GLoader in game2d).  Each yield is the fraction of the work done so far, and
+        the generator returns the finished Level.
+
+        Parameter dic: dic is the main loaded JSON file (or its compiled form)
+        Precondition: dic is a dictionary
+
+        Parameter hitdic: hitdic is the JSON file for objects
+        Precondition: hitdic is a dictionary
+        """
+        level = cls.__new__(cls)
+        yield from level._build(dic, hitdic)
+        return level
+
+    # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
+    def __init__(self, dic, hitdic):
+        """
+        Initializes the frog, lanes, sounds, and other things here and there.
+
+        Parameter dic: dic is the main loaded JSON file (or its compiled form)
+        Precondition: dic is a dictionary
+
+        Parameter hitdic: hitdic is the JSON file for objects
+        Precondition: hitdic is a dictionary
+        """
+        for progress in self._build(dic, hitdic):
+            pass
 
     # UPDATE METHOD TO MOVE THE FROG AND UPDATE ALL OF THE LANES
     def update(self, dt, input):
@@ -172,27 +312,51 @@ class Level(object):
         Parameter input: The user input, used to control the frog
         Precondition: input is an instance of GInput
         """
-        self._movefrog(dt, input)
+        profiler = self._profiler
+        self._restore()
+        self._carried = 0
 
-        self._killfroggy(dt)
+        with profiler.phase('level.movefrog'):
+            self._movefrog(dt, input)
 
-        for lane in self._lanes:
-            lane.update(dt, self._width, self._buffer)
+        with profiler.phase('level.killfroggy'):
+            self._killfroggy(dt)
+
+        with profiler.phase('level.lanes'):
+            self._traffic.update(dt)
 
-        self._landing()
+        with profiler.phase('level.landing'):
+            self._landing()
+
+        with profiler.phase('level.clock'):
+            self._countdown(dt)
 
     # DRAW METHOD TO DRAW THE FROG AND THE INDIVIDUAL LANES
-    def draw(self, view):
+    def draw(self, view, alpha=1):
         """
         Draws the frog, lanes, death sprite, and the lifebar.
 
+        The obstacles are drawn alpha of the way from their positions before the last
+        update to their current positions (see the alpha attribute of GameApp).  A frog
+        riding a log is drawn the same way, so that it stays on the log.
+
         Parameter view: The game view, used in drawing
         Precondition: view is an instance of GView
+
+        Parameter alpha: The interpolation fraction between the last two updates
+        Precondition: alpha is a number in 0..1
         """
+        self._restore()
+        self._traffic.interpolate(alpha)
         for lane in self._lanes:
             lane.draw(view)
 
+        self._batch.draw(view)
+
         if not self._frog is None:
+            if alpha < 1 and self._carried != 0:
+                self._frogx = self._frog.x
+                self._frog.x = self._frogx-(1-alpha)*self._carried
             self._frog.draw(view)
 
         if not self._death is None:
@@ -203,6 +367,10 @@ class Level(object):
 
         self._lifelabel.draw(view)
 
+        self._readout()
+        for text in self._readouts:
+            text.draw(view)
+
     # NECESSARY (UN-HIDDEN) HELPERS
 
     def resetFrog(self):
@@ -212,7 +380,12 @@ class Level(object):
         """
         self._switch = 3
         self._frog = Frog(x=self._start[0],y=self._start[1],hitdic=self._hitdic)
+        self._carried = 0
+        self._frogx = None
+        self._lastbox = None
         self._death = None
+        self._timer = FROG_TIME
+        self._bestrow = self._start[1]
 
     def endGame(self):
         """
@@ -229,6 +402,12 @@ class Level(object):
         """
         return (self._switch == 4)
 
+    def getLives(self):
+        """
+        Returns the number of lives the frog has left
+        """
+        return len(self._lives)
+
     def noLives(self):
         """
         Returns True if the frog has run out of lives.
@@ -238,6 +417,158 @@ class Level(object):
 
     # NECESSARY (HIDDEN) HELPERS
 
+    def _build(self, dic, hitdic):
+        """
+        Initializes the level in small steps, yielding the fraction done after each
+
+        There is one step for each lane, one for the traffic and the frog, one for the
+        time-to-collision table of each lane (if TIMED_LANES is True), and one for the
+        life bar.
+
+        Parameter dic: dic is the main loaded JSON file (or its compiled form)
+        Precondition: dic is a dictionary
+
+        Parameter hitdic: hitdic is the JSON file for objects
+        Precondition: hitdic is a dictionary
+        """
+        self._hitdic = hitdic
+        lanes_list = dic['lanes']
+        self._width = (dic['size'][0]) * GRID_SIZE
+        self._height = ((dic['size'][1]) * GRID_SIZE) + GRID_SIZE
+        self._start = dic["start"]
+        self._buffer = dic["offscreen"]
+        self._switch = 3
+        self._animator = None
+        self._animatorD = None
+        self._death = None
+        self._deathSound = GameApp.load_sound(SPLAT_SOUND)
+        self._exitSound = GameApp.load_sound(TRILL_SOUND)
+        for (sound, name) in ((self._deathSound, SPLAT_SOUND), (self._exitSound, TRILL_SOUND)):
+            if sound is None:
+                raise IOError('Cannot read the sound file %s' % repr(name))
+        self._lanes = []
+        self._profiler = GProfiler(enabled=False)
+
+        self._batch = GBatch()
+        steps = 2*len(lanes_list)+2 if TIMED_LANES else len(lanes_list)+2
+        for pos in range(len(lanes_list)):
+            type = lanes_list[pos]["type"]
+            pic = type + '.png'
+
+            if type == "grass":
+                self._lanes.append(Grass(dic=dic,pos=pos,back=pic,hitdic=hitdic))
+            if type == "road":
+                self._lanes.append(Road(dic=dic,pos=pos,back=pic,hitdic=hitdic))
+            if type == "water":
+                self._lanes.append(Water(dic=dic,pos=pos,back=pic,hitdic=hitdic))
+            if type == "hedge":
+                self._lanes.append(Hedge(dic=dic,pos=pos,back=pic,hitdic=hitdic))
+            if self._lanes[-1].isMoving():
+                self._lanes[-1].setBatch(self._batch)
+            yield (pos+1)/steps
+
+        self._traffic = Traffic(self._lanes, self._width, self._buffer, TIMED_LANES)
+        self._index()
+        self._frog = Frog(x=self._start[0],y=self._start[1],hitdic=self._hitdic)
+        self._carried = 0
+        self._frogx = None
+        self._lastbox = None
+        self._score = 0
+        self._timer = FROG_TIME
+        self._timeout = FROG_TIMEOUT
+        self._bestrow = self._start[1]
+        self._framerate = 0
+        yield (len(lanes_list)+1)/steps
+
+        done = len(lanes_list)+1
+        for lane in self._schedules(dic['size'][0]):
+            done += 1
+            yield done/steps
+        self._lifebar(dic['size'][1], dic['size'][0])
+        yield 1.0
+
+    def _restore(self):
+        """
+        Moves the frog back to where it is, if it was drawn behind it (see draw)
+        """
+        if not self._frogx is None:
+            if not self._frog is None:
+                self._frog.x = self._frogx
+            self._frogx = None
+
+    def _index(self):
+        """
+        Builds the row index, so that collision checks only look at nearby lanes
+
+        A lane is listed under every grid row that its tile or its objects touch.
+        Objects taller than a grid square (or a frog in mid hop) can reach more than
+        one row, and so they are found in all of them.
+        """
+        self._rows = [[] for lane in self._lanes]
+        for lane in self._lanes:
+            (bottom, top) = lane.getExtent()
+            for row in self._span(bottom, top):
+                self._rows[row].append(lane)
+
+    def _schedules(self, columns):
+        """
+        Builds the time-to-collision table of every moving lane, for the frog at rest
+
+        The tables need lanes whose positions are a function of the time, so they are
+        only built if TIMED_LANES is True.  This is a generator that yields each lane
+        once its table is built (so a loader can build the tables over several frames).
+
+        Parameter columns: The number of grid columns in the level
+        Precondition: columns is an int > 0
+        """
+        if not TIMED_LANES:
+            return
+
+        box = self._frog.getBox()
+        x = self._frog.x
+        y = self._frog.y
+        box = (box[0]-x, box[1]-y, box[2]-x, box[3]-y)
+        for lane in self._lanes:
+            if lane.isMoving():
+                lane.setSchedule(box, columns)
+            yield lane
+
+    def _span(self, bottom, top):
+        """
+        Returns the range of grid rows touched by the interval [bottom, top]
+
+        Rows include their edges, so an interval that ends exactly on the boundary
+        between two rows touches both of them.
+
+        Parameter bottom: The bottom of the interval in pixels
+        Precondition: bottom is a number
+
+        Parameter top: The top of the interval in pixels
+        Precondition: top is a number >= bottom
+        """
+        first = max(0, math.ceil(bottom/GRID_SIZE)-1)
+        last = min(len(self._lanes)-1, math.floor(top/GRID_SIZE))
+        return range(first, last+1)
+
+    def _nearby(self, box):
+        """
+        Returns the lanes (in lane order) that could touch the given box
+
+        Parameter box: The box (left, top, right, bottom) to test
+        Precondition: box is a tuple of four numbers
+        """
+        rows = self._span(box[3], box[1])
+        if len(rows) == 1:
+            return self._rows[rows[0]]
+
+        result = []
+        for row in rows:
+            for lane in self._rows[row]:
+                if not lane in result:
+                    result.append(lane)
+        result.sort(key=self._lanes.index)
+        return result
+
     def _lifebar(self, h, w):
         """
         Initializes the life bar for the froggie :D
@@ -257,6 +588,59 @@ class Level(object):
         font_size=ALLOY_SMALL, y = GRID_SIZE*(h+0.5),right=self._lives[0].left,\
         linecolor="dark green")
 
+        # The readouts change often, so they are GText objects (no font rendering)
+        self._readouts = []
+        for (row, width) in ((0.75, 3), (0.25, 3)):
+            self._readouts.append(GText(text='', font_name=ALLOY_FONT, \
+            font_size=ALLOY_TINY, left=GRID_SIZE*0.25, y=GRID_SIZE*(h+row), \
+            width=GRID_SIZE*width, height=GRID_SIZE/2, halign='left', \
+            linecolor="dark green"))
+        if SHOW_FPS:
+            self._readouts.append(GText(text='', font_name=ALLOY_FONT, \
+            font_size=ALLOY_TINY, left=GRID_SIZE*3.25, y=GRID_SIZE*(h+0.5), \
+            width=GRID_SIZE*2, height=GRID_SIZE/2, halign='left', \
+            linecolor="dark green"))
+        self._readout()
+
+    def _readout(self):
+        """
+        Updates the texts of the score, timer and frame rate on the life bar
+
+        The texts only change the vertices of their meshes, so this is cheap enough
+        to do every frame.
+        """
+        self._readouts[0].text = 'SCORE:%d' % self._score
+        self._readouts[1].text = 'TIME:%d' % math.ceil(self._timer)
+        if SHOW_FPS:
+            self._readouts[2].text = 'FPS:%d' % round(self._framerate)
+
+    def _countdown(self, dt):
+        """
+        Runs the frog's timer and scores the rows it reaches
+
+        The frog scores SCORE_STEP points for each row that is higher than any it has
+        reached in this life.  The timer stops at 0, and the frog only dies then if
+        the level has a timeout (see setTimeout).
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self._frog is None:
+            return
+
+        row = int(self._frog.y//GRID_SIZE)
+        if row > self._bestrow:
+            self._score += SCORE_STEP*(row-self._bestrow)
+            self._bestrow = row
+
+        self._timer = max(0, self._timer-dt)
+        if self._timer == 0 and self._timeout:
+            x = self._frog.x
+            y = self._frog.y
+            self._frog = None
+            self._animator = None
+            self._morgue(x, y)
+
     def _movefrog(self, dt, input):
         """
         Moves the frog whichever direction the user inputs with UDLR keys
@@ -306,11 +690,13 @@ class Level(object):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        for lane in self._lanes:
+        point = (self._frog.x, self._frog.y, self._frog.x, self._frog.y)
+        for lane in self._nearby(point):
             if isinstance(lane, Water):
 
-                if lane.frog_on_log(self._frog) and self._animator is None:
-                    self._frog.x = self._frog.x + lane.getLaneSpeed()*dt
+                if self._animator is None and lane.frog_on_log(self._frog):
+                    self._carried = lane.getLaneSpeed()*dt
+                    self._frog.x = self._frog.x + self._carried
 
         if self._frog.x <= 0 or self._frog.x >= self._width:
             x = self._frog.x
@@ -362,6 +748,7 @@ class Level(object):
                 if self._lanes[lane].frog_lands(self._frog):
 
                     self._exitSound.play()
+                    self._score += SCORE_EXIT + SCORE_TIME*int(self._timer)
                     self._animator = None
 
                     if all (hedge.noExitsLeft() for hedge in onlyhedges):
@@ -377,6 +764,11 @@ class Level(object):
         """
         Kills the frog if it gets hit by a car or drowns. Calls the morgue
 
+        If SWEPT_COLLISIONS is True, the frog is tested over the whole update: from
+        its box at the last test to its box now, against the cars as they move for dt
+        (they are moved after this test).  Otherwise, the frog is only tested where it
+        is now, against the cars where they are now.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
@@ -386,10 +778,25 @@ class Level(object):
             except:
                 self._animatorD = None
 
-        for lane in self._lanes:
+        if self._frog is None:
+            nearby = []
+        elif SWEPT_COLLISIONS:
+            after = self._frog.getBox()
+            before = after if self._lastbox is None else self._lastbox
+            nearby = self._nearby((min(before[0],after[0]), max(before[1],after[1]),
+                                   max(before[2],after[2]), min(before[3],after[3])))
+        else:
+            nearby = self._nearby(self._frog.getBox())
+
+        for lane in nearby:
 
             if isinstance(lane, Road):
-                if lane.car_hits_frog(self._frog):
+                if SWEPT_COLLISIONS:
+                    hit = lane.car_sweeps_frog(before, self._frog, dt, self._width,
+                                               self._buffer)
+                else:
+                    hit = lane.car_hits_frog(self._frog)
+                if hit:
                     x = self._frog.x
                     y = self._frog.y
                     self._frog = None
@@ -397,13 +804,19 @@ class Level(object):
                     self._morgue(x, y)
 
             if isinstance(lane, Water):
-                if lane.frogDrown(self._frog) and self._animator is None:
+                if SWEPT_COLLISIONS:
+                    drown = lane.frogDrown(self._frog, dt, self._width, self._buffer)
+                else:
+                    drown = lane.frogDrown(self._frog)
+                if drown and self._animator is None:
                     x = self._frog.x
                     y = self._frog.y
                     self._frog = None
                     self._animator = None
                     self._morgue(x, y)
 
+        self._lastbox = None if self._frog is None else self._frog.getBox()
+
     def _morgue(self, x, y):
         """
         Executes a few tasks after the frog dies
@@ -48,10 +48,18 @@ class Frog(GSprite):         # You will need to change this by Task 3
     # LIST ALL HIDDEN ATTRIBUTES HERE
 
     # Attribute _jumpSound: The ribbit sound for when the frog jumps
-    # Invariant: _jumpSound is a Sound object
+    # Invariant: _jumpSound is a SoundPool object (shared by every frog)
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
 
+    def getBox(self):
+        """
+        Returns the hitbox of the frog as a tuple (left, top, right, bottom)
+
+        This is the same box that the frog uses in collisions.
+        """
+        return self._bbox()
+
     # INITIALIZER TO SET FROG POSITION
 
     def __init__(self, x, y, hitdic):
@@ -77,7 +85,9 @@ class Frog(GSprite):         # You will need to change this by Task 3
 
         self.angle = FROG_NORTH
         self.frame = 0
-        self._jumpSound = Sound(CROAK_SOUND)
+        self._jumpSound = GameApp.load_sound(CROAK_SOUND)
+        if self._jumpSound is None:
+            raise IOError('Cannot read the sound file %s' % repr(CROAK_SOUND))
 
     # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
 
@@ -228,7 +238,6 @@ class Death(GSprite):
         while animating:
 
             dt = (yield)
-            print (dt)
             #amount = steps*dt
             current = dt*3+current
 
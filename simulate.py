@@ -0,0 +1,280 @@
+"""
+Headless simulation script for Froggit
+
+This module steps a single Froggit level without a window, textures or sound.  It
+selects the geometry-only backend of game2d before any of the game modules are
+imported, so the lanes, the frog and all of the collisions run on plain geometry.
+This is useful for testing on machines without a display, and for simulating a level
+far faster than real time.
+
+Run by typing "python simulate.py [level] [--frames N] [--dt DT] [--profile FILE]" into
+the command line.  The script reports how many frames per second it was able to simulate.
+With --profile, it also saves the time of each phase of each frame to FILE.
+
+A game recorded with RECORD in consts.py is played again by typing "python simulate.py
+--replay FILE".  The level and time steps come from the recording, and the replay runs
+as fast as it can.  It reports the frames simulated and how the game ended.
+"""
+import os
+import sys
+os.environ['GAME2D_HEADLESS'] = '1'
+
+# The constants read the game's command line (level and frog speed), not this one
+_argv, sys.argv = sys.argv, sys.argv[:1]
+from consts import *
+from game2d import *
+from level import *
+sys.argv = _argv
+
+
+class Simulation(object):
+    """
+    A headless driver for a single level of Froggit.
+
+    This class plays the role of the Froggit app, but without any of the graphics.
+    Each call to step is one animation frame.  After the frog dies or reaches an exit,
+    the next step restores it automatically (as if the player pressed 'C').
+
+    Attribute input: The simulated user input, used to control the frog
+    Invariant: input is an instance of GInput (keys are set with press and release)
+
+    Attribute profiler: The frame-time profiler (disabled unless enabled by the user)
+    Invariant: profiler is a GProfiler object
+    """
+    # HIDDEN ATTRIBUTES
+
+    # Attribute _level: The subcontroller for the simulated level
+    # Invariant: _level is a Level object
+
+    # Attribute _frames: The number of frames simulated so far
+    # Invariant: _frames is an int >= 0
+
+    # Attribute _time: The amount of simulated time in seconds
+    # Invariant: _time is a float >= 0
+
+    # GETTERS AND SETTERS
+    def getLevel(self):
+        """
+        Returns the simulated Level object
+        """
+        return self._level
+
+    def getFrames(self):
+        """
+        Returns the number of frames simulated so far
+        """
+        return self._frames
+
+    def getTime(self):
+        """
+        Returns the amount of simulated time in seconds
+        """
+        return self._time
+
+    # INITIALIZER
+    def __init__(self, level=DEFAULT_LEVEL, objects=OBJECT_DATA):
+        """
+        Initializes the simulation from the given level files
+
+        Parameter level: The level file in the JSON folder
+        Precondition: level is a string naming a JSON file
+
+        Parameter objects: The object data (hitbox) file in the JSON folder
+        Precondition: objects is a string naming a JSON file
+        """
+        compiled = GameApp.load_compiled(level, Level.compile, objects)
+        assert not compiled is None, '%s or %s is not a valid file' % (repr(level),repr(objects))
+
+        dic, hitdic = compiled
+        self._level = Level(dic, hitdic)
+        self.input = GInput()
+        self.profiler = GProfiler(enabled=False)
+        self._level.setProfiler(self.profiler)
+        self._frames = 0
+        self._time = 0.0
+
+    def isOver(self):
+        """
+        Returns True if the game is complete (won or lost)
+        """
+        return self._level.noLives() or self._level.endGame()
+
+    def step(self, dt):
+        """
+        Simulates one animation frame, returning False if the game is over
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self.isOver():
+            return False
+
+        if self._level.pauseGame():
+            self._level.resetFrog()
+
+        self.profiler.begin()
+        with self.profiler.phase('update'):
+            self._level.update(dt, self.input)
+        self.input.refresh()
+        self.profiler.end()
+        self._frames += 1
+        self._time += dt
+        return True
+
+    def run(self, frames, dt=1/60):
+        """
+        Simulates up to the given number of frames, stopping early if the game ends.
+
+        Returns the number of frames simulated.
+
+        Parameter frames: The maximum number of frames to simulate
+        Precondition: frames is an int >= 0
+
+        Parameter dt: The time in seconds for each frame
+        Precondition: dt is a number (int or float) > 0
+        """
+        count = 0
+        while count < frames and self.step(dt):
+            count += 1
+        return count
+
+
+class Replay(Simulation):
+    """
+    A headless driver that plays back a recorded game of Froggit.
+
+    Unlike Simulation, this class follows the states of the Froggit app, so that every
+    recorded key has the same effect as in the original game: the level starts when
+    'S' is pressed, and after the frog dies or reaches an exit, it is only restored
+    when 'C' is pressed.  Each step is one recorded update.
+
+    Attribute input: The recorded user input
+    Invariant: input is an instance of GReplayInput
+    """
+    # HIDDEN ATTRIBUTES
+
+    # Attribute _state: The current state of the game (as in the Froggit app)
+    # Invariant: _state is one of STATE_INACTIVE, STATE_ACTIVE, STATE_PAUSED,
+    # or STATE_COMPLETE
+
+    # INITIALIZER
+    def __init__(self, source, objects=OBJECT_DATA):
+        """
+        Initializes the replay from a recording
+
+        Parameter source: The recording file, or its contents
+        Precondition: source is a string naming a file, or bytes
+
+        Parameter objects: The object data (hitbox) file in the JSON folder
+        Precondition: objects is a string naming a JSON file
+        """
+        input = GReplayInput(source)
+        super().__init__(input.tag or DEFAULT_LEVEL, objects)
+        self.input = input
+        self._state = STATE_INACTIVE
+
+    def isOver(self):
+        """
+        Returns True if the game is complete or the recording has ended
+        """
+        return self.input.done or self._state == STATE_COMPLETE
+
+    def step(self, dt=None):
+        """
+        Simulates one recorded update, returning False if the replay is over
+
+        The states change exactly as in the update method of the Froggit app (the
+        loading and continue states only last part of a frame, so they are skipped).
+
+        Parameter dt: The time in seconds since last update (None for the recorded time)
+        Precondition: dt is a number (int or float) or None
+        """
+        if self.isOver():
+            return False
+
+        dt = self.input.dt if dt is None else dt
+        level = self._level
+        self.profiler.begin()
+        if self._state == STATE_INACTIVE and self.input.is_key_down('s'):
+            self._state = STATE_ACTIVE
+
+        if self._state == STATE_ACTIVE:
+            if level.pauseGame() or level.endGame():
+                self._state = STATE_PAUSED
+            with self.profiler.phase('update'):
+                level.update(dt, self.input)
+
+        if self._state == STATE_PAUSED:
+            if level.noLives() or (level.endGame() and not level.pauseGame()):
+                self._state = STATE_COMPLETE
+            elif level.pauseGame() and self.input.is_key_down('c'):
+                level.resetFrog()
+                self._state = STATE_ACTIVE
+
+        self.input.refresh()
+        self.profiler.end()
+        self._frames += 1
+        self._time += dt
+        return True
+
+    def run(self, frames=None, dt=None):
+        """
+        Plays up to the given number of updates, stopping early if the replay ends.
+
+        Returns the number of updates simulated.
+
+        Parameter frames: The maximum number of updates (None for the whole recording)
+        Precondition: frames is an int >= 0 or None
+
+        Parameter dt: The time in seconds for each update (None for the recorded times)
+        Precondition: dt is a number (int or float) > 0 or None
+        """
+        frames = self.input.frames if frames is None else frames
+        count = 0
+        while count < frames and self.step(dt):
+            count += 1
+        return count
+
+
+# Application code
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Simulate a Froggit level headlessly.')
+    parser.add_argument('level', nargs='?', default=DEFAULT_LEVEL,
+                        help='the level file in the JSON folder')
+    parser.add_argument('--frames', type=int, default=10000,
+                        help='the number of frames to simulate')
+    parser.add_argument('--dt', type=float, default=1/60,
+                        help='the time step of each frame in seconds')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='record the time of each phase and save it (CSV or JSON)')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='play back a recorded game (ignores level, --frames and --dt)')
+    args = parser.parse_args()
+
+    if args.replay:
+        sim = Replay(args.replay)
+        level = sim.input.tag or DEFAULT_LEVEL
+        frames = sim.input.frames
+    else:
+        level = args.level if args.level[-5:].lower() == '.json' else args.level+'.json'
+        sim = Simulation(level)
+        frames = args.frames
+    if args.profile:
+        sim.profiler = GProfiler(capacity=max(frames,1))
+        sim.getLevel().setProfiler(sim.profiler)
+    start = time.perf_counter()
+    count = sim.run(frames) if args.replay else sim.run(frames, args.dt)
+    elapsed = time.perf_counter()-start
+
+    print('%s: %d frames in %.3f s (%.0f frames/s, %.1fx real time)' %
+          (level, count, elapsed, count/elapsed, sim.getTime()/elapsed))
+    if args.replay:
+        level = sim.getLevel()
+        result = 'won' if level.endGame() else 'lost' if level.noLives() else 'unfinished'
+        print('replay %s with %d lives left' % (result, level.getLives()))
+    if args.profile:
+        sim.profiler.dump(args.profile)
+        print(sim.profiler.report())
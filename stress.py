@@ -0,0 +1,253 @@
+"""
+Stress level generator for Froggit
+
+The shipped levels are small (at most 16 columns and 13 lanes), which hides how the cost
+of a frame grows with the size of a level.  This module writes synthetic level files in
+the same format as the files in the JSON folder, with as many lanes, columns and
+obstacles as needed.  The levels are playable: the frog starts on grass in the middle of
+the bottom lane, and the top lane is a hedge with the requested number of exits.
+
+Between the start and the hedge, the lanes come in bands of roads and bands of water,
+separated by single grass lanes.  Each road or water lane is filled with randomly chosen
+obstacles until they cover the requested fraction (the density) of the lane, including
+its offscreen buffer.  Lanes alternate direction, and the speeds are random.  The same
+seed always gives the same level.
+
+Run by typing "python stress.py name [--lanes N] [--width N] [--density D] [--exits N]
+[--seed N]" into the command line.  This writes JSON/name.json, which can be played or
+simulated like any other level (e.g. "python simulate.py name").  To see how the time of
+a frame grows with the size of a level, type "python stress.py --sweep [--lanes N]
+[--density D]" instead.
+"""
+import os
+import json
+import random
+from consts import *
+
+
+# The obstacles that may appear on a road
+ROAD_OBSTACLES = ['car1', 'car2', 'car3', 'car4', 'car5', 'car6', 'truck1', 'truck2',
+                  'truck3', 'trailer1', 'trailer2', 'flatbed']
+
+# The obstacles that may appear on water
+WATER_OBSTACLES = ['log1', 'log2', 'log3', 'log4', 'log5']
+
+# The number of road or water lanes in a band before the next grass lane
+BAND = 5
+
+# The smallest and largest lane speed in pixels per second
+MIN_SPEED = 60
+MAX_SPEED = 180
+
+# The offscreen buffer (in grid squares) of a generated level
+OFFSCREEN = 4
+
+
+def obstacle_widths(hitdic):
+    """
+    Returns a dictionary of obstacle name to width in grid squares
+
+    Parameter hitdic: hitdic is the JSON file for objects
+    Precondition: hitdic is a dictionary
+    """
+    result = {}
+    for name in ROAD_OBSTACLES+WATER_OBSTACLES:
+        result[name] = hitdic['images'][name]['size'][0]/GRID_SIZE
+    return result
+
+
+def fill_lane(kinds, widths, span, density, rng):
+    """
+    Returns the object list for one lane, covering density of the span
+
+    The obstacles are chosen at random from kinds and then spread around the lane with
+    equal gaps (plus a little jitter), so that they never overlap.
+
+    Parameter kinds: The obstacle names to choose from
+    Precondition: kinds is a nonempty list of strings
+
+    Parameter widths: The width of each obstacle in grid squares
+    Precondition: widths is a dictionary of obstacle name to number
+
+    Parameter span: The length of the lane in grid squares, including the buffer
+    Precondition: span is a number > 0
+
+    Parameter density: The fraction of the lane to cover
+    Precondition: density is a number in 0..1
+
+    Parameter rng: The random number generator
+    Precondition: rng is a random.Random object
+    """
+    chosen = []
+    covered = 0.0
+    while True:
+        kind = rng.choice(kinds)
+        if covered+widths[kind] > density*span:
+            break
+        chosen.append(kind)
+        covered += widths[kind]
+
+    if not chosen:
+        return []
+
+    gap = (span-covered)/len(chosen)
+    left = rng.uniform(0, gap) - OFFSCREEN
+    result = []
+    for kind in chosen:
+        jitter = rng.uniform(0, gap/2)
+        center = left+jitter+widths[kind]/2
+        result.append({'type':kind, 'position':round(center-0.5, 2)})
+        left += widths[kind]+gap
+    return result
+
+
+def generate(lanes=13, width=16, density=0.3, exits=5, seed=0, hitdic=None):
+    """
+    Returns a level dictionary in the format of the JSON level files
+
+    Parameter lanes: The number of lanes (including the first grass lane and the hedge)
+    Precondition: lanes is an int >= 3
+
+    Parameter width: The number of columns
+    Precondition: width is an int >= 1
+
+    Parameter density: The fraction of each road and water lane covered by obstacles
+    Precondition: density is a number in 0..1
+
+    Parameter exits: The number of exits in the hedge
+    Precondition: exits is an int in 1..width
+
+    Parameter seed: The seed for the random number generator
+    Precondition: seed is an int
+
+    Parameter hitdic: hitdic is the JSON file for objects (None to load OBJECT_DATA)
+    Precondition: hitdic is a dictionary or None
+    """
+    assert type(lanes) == int and lanes >= 3, '%s is not a valid lane count' % repr(lanes)
+    assert type(width) == int and width >= 1, '%s is not a valid width' % repr(width)
+    assert 0 <= density <= 1, '%s is not a valid density' % repr(density)
+    assert type(exits) == int and 1 <= exits <= width, '%s is not a valid exit count' % repr(exits)
+
+    if hitdic is None:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),'JSON',OBJECT_DATA)) as file:
+            hitdic = json.load(file)
+
+    rng = random.Random(seed)
+    widths = obstacle_widths(hitdic)
+    span = width+2*OFFSCREEN
+    result = [{'type':'grass'}]
+
+    # The middle lanes, as bands of road and water between grass lanes
+    water = False
+    band = 0
+    direction = 1
+    for pos in range(1, lanes-1):
+        if band == BAND:
+            result.append({'type':'grass'})
+            band = 0
+            water = not water
+            continue
+
+        kinds = WATER_OBSTACLES if water else ROAD_OBSTACLES
+        speed = direction*rng.randint(MIN_SPEED, MAX_SPEED)
+        objects = fill_lane(kinds, widths, span, density, rng)
+        result.append({'type':'water' if water else 'road', 'speed':speed, 'objects':objects})
+        direction = -direction
+        band += 1
+
+    # The hedge, with evenly spaced exits
+    step = width/exits
+    objects = [{'type':'exit', 'position':int(step*(pos+0.5))} for pos in range(exits)]
+    result.append({'type':'hedge', 'objects':objects})
+
+    return {'version':1.0, 'size':[width, lanes], 'start':[width//2, 0],
+            'offscreen':OFFSCREEN, 'lanes':result}
+
+
+def count_obstacles(dic):
+    """
+    Returns the number of moving obstacles in a level dictionary
+
+    Parameter dic: dic is the main loaded JSON file
+    Precondition: dic is a dictionary
+    """
+    return sum(len(lane.get('objects',[])) for lane in dic['lanes'] if 'speed' in lane)
+
+
+def sweep(lanes=13, widths=(16,32,64,128,256,512), density=0.3, frames=200, seed=0):
+    """
+    Prints the time of a Level update for generated levels of increasing width
+
+    The levels are built in memory and never written to the JSON folder.  Unless the
+    environment variable GAME2D_HEADLESS is already set, this uses the headless backend
+    of game2d (so it must be called before anything else imports game2d).
+
+    Parameter lanes: The number of lanes in each level
+    Precondition: lanes is an int >= 3
+
+    Parameter widths: The column counts to try
+    Precondition: widths is a sequence of ints >= 5
+
+    Parameter density: The fraction of each road and water lane covered by obstacles
+    Precondition: density is a number in 0..1
+
+    Parameter frames: The number of updates to time for each level
+    Precondition: frames is an int > 0
+
+    Parameter seed: The seed for the random number generator
+    Precondition: seed is an int
+    """
+    import time
+    os.environ.setdefault('GAME2D_HEADLESS', '1')
+    from game2d import GameApp, GInput
+    from level import Level
+
+    hitdic = GameApp.load_json(OBJECT_DATA)
+    print('%8s %10s %14s' % ('columns', 'obstacles', 'us per frame'))
+    for width in widths:
+        dic = generate(lanes, width, density, 5, seed, hitdic)
+        level = Level(*Level.compile(dic, hitdic))
+        input = GInput()
+        level.update(1/60, input)
+        start = time.perf_counter()
+        for _ in range(frames):
+            if level.pauseGame():
+                level.resetFrog()
+            level.update(1/60, input)
+        elapsed = time.perf_counter()-start
+        print('%8d %10d %14.1f' % (width, count_obstacles(dic), elapsed/frames*1e6))
+
+
+# Application code
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write a synthetic Froggit stress level.')
+    parser.add_argument('name', nargs='?', help='the level name (written to the JSON folder)')
+    parser.add_argument('--lanes', type=int, default=13, help='the number of lanes')
+    parser.add_argument('--width', type=int, default=16, help='the number of columns')
+    parser.add_argument('--density', type=float, default=0.3,
+                        help='the fraction of each lane covered by obstacles')
+    parser.add_argument('--exits', type=int, default=5, help='the number of hedge exits')
+    parser.add_argument('--seed', type=int, default=0, help='the random seed')
+    parser.add_argument('--force', action='store_true', help='overwrite an existing file')
+    parser.add_argument('--sweep', action='store_true',
+                        help='time levels of increasing width instead of writing a file')
+    args = parser.parse_args()
+
+    if args.sweep:
+        sweep(lanes=args.lanes, density=args.density, seed=args.seed)
+        parser.exit()
+    elif args.name is None:
+        parser.error('a level name is required (unless using --sweep)')
+
+    name = args.name if args.name[-5:].lower() == '.json' else args.name+'.json'
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'JSON', name)
+    if os.path.exists(path) and not args.force:
+        parser.error('%s already exists (use --force to overwrite it)' % path)
+
+    dic = generate(args.lanes, args.width, args.density, args.exits, args.seed)
+    with open(path,'w') as file:
+        json.dump(dic, file, indent=1)
+    print('%s: %d lanes, %d columns, %d obstacles' %
+          (name, args.lanes, args.width, count_obstacles(dic)))
@@ -0,0 +1,33 @@
+"""
+Shared setup for the Froggit and game2d checks.
+
+The checks run against whichever game2d backend is selected when the package is first
+imported.  Run them once as is (the Kivy backend) and once with GAME2D_HEADLESS=1:
+
+    python -m pytest -q tests
+    GAME2D_HEADLESS=1 python -m pytest -q tests
+
+Checks that need one backend skip themselves under the other.
+"""
+import os
+import sys
+
+# Kivy and consts both read sys.argv, which here holds the arguments of pytest
+os.environ.setdefault('KIVY_NO_ARGS','1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG','1')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not ROOT in sys.path:
+    sys.path.insert(0,ROOT)
+
+_argv, sys.argv = sys.argv, sys.argv[:1]
+try:
+    import consts
+    from game2d import GameApp
+finally:
+    sys.argv = _argv
+
+GameApp.set_resources(ROOT)
+
+# Whether the checks are running against the geometry-only backend
+HEADLESS = os.environ.get('GAME2D_HEADLESS','0') not in ('','0')
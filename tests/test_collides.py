@@ -0,0 +1,65 @@
+"""
+Checks that collisions between objects and bodies agree, in both directions.
+"""
+import pytest
+from game2d import GObject, GRectangle, GBody
+
+
+# (x, y, width, height, angle, hitbox) for pairs that do and do not collide
+CASES = [
+    ((0,0,40,20,45,None),        (30,0,20,20,0,(2,3,4,1))),
+    ((0,0,40,20,45,(1,2,3,4)),   (45,0,20,20,0,(2,3,4,1))),
+    ((0,0,40,20,30,None),        (0,60,20,20,60,None)),
+    ((0,0,40,20,0,(5,0,5,0)),    (28,0,20,20,10,(2,2,2,2))),
+    ((0,0,40,20,180,(1,2,3,4)),  (0,12,20,20,0,(0,0,0,0))),
+    ((0,0,40,20,45,(2,2,2,2)),   (40,40,20,20,135,None)),
+]
+
+
+def rectangle(x,y,width,height,angle,hitbox):
+    return GRectangle(x=x,y=y,width=width,height=height,angle=angle,hitbox=hitbox)
+
+
+def body(x,y,width,height,angle,hitbox):
+    return GBody(x=x,y=y,width=width,height=height,angle=angle,hitbox=hitbox)
+
+
+@pytest.mark.parametrize('collider',['edges','sat'])
+@pytest.mark.parametrize('first,second',CASES)
+def test_object_and_body_agree(first,second,collider,monkeypatch):
+    monkeypatch.setattr(GObject,'COLLIDER',collider)
+    monkeypatch.setattr(GBody,'COLLIDER',collider)
+    expected = rectangle(*first).collides(rectangle(*second))
+    assert rectangle(*first).collides(body(*second)) == expected
+    assert body(*first).collides(rectangle(*second)) == expected
+    assert body(*first).collides(body(*second)) == expected
+
+
+@pytest.mark.parametrize('first,second',CASES)
+def test_exact_test_is_symmetric(first,second,monkeypatch):
+    # The edge test is an approximation, and only the exact test is symmetric
+    monkeypatch.setattr(GObject,'COLLIDER','sat')
+    monkeypatch.setattr(GBody,'COLLIDER','sat')
+    a = rectangle(*first)
+    b = body(*second)
+    assert a.collides(b) == b.collides(a)
+
+
+@pytest.mark.parametrize('shape',[first for (first,second) in CASES])
+def test_bounds_and_contains_agree(shape):
+    a = rectangle(*shape)
+    b = body(*shape)
+    assert a._bbox() == pytest.approx(b._bbox())
+    (l,t,r,b0) = b._bbox()
+    for point in [(l+1,b0+1),((l+r)/2,(t+b0)/2),(r+1,t),(shape[0],shape[1])]:
+        assert a.contains(point) == b.contains(point)
+
+
+def test_headless_has_no_kivy_shapes():
+    import game2d
+    from conftest import HEADLESS
+    if not HEADLESS:
+        pytest.skip('only the headless backend leaves out these shapes')
+    for name in ['GScene','GEllipse','GPath','GTriangle','GPolygon']:
+        with pytest.raises(ImportError):
+            getattr(game2d,name)
@@ -0,0 +1,100 @@
+"""
+Checks that the compiled level cache returns what compiling the files would.
+"""
+import os
+import json
+import shutil
+import pytest
+from game2d import GameApp, gcache
+from consts import OBJECT_DATA
+from level import Level
+
+
+class Compiler(object):
+    # A compiler that counts its calls
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, *sources):
+        self.calls += 1
+        return [source['value'] for source in sources]
+
+
+def write(folder, name, value):
+    path = os.path.join(folder, name)
+    with open(path, 'w') as file:
+        json.dump({'value':value}, file)
+    return path
+
+
+def test_second_load_uses_the_cache(tmp_path):
+    folder = str(tmp_path)
+    write(folder, 'a.json', 1)
+    write(folder, 'b.json', 2)
+    compiler = Compiler()
+    assert gcache.load_compiled(folder, ['a.json','b.json'], compiler, 'test') == [1, 2]
+    assert gcache.load_compiled(folder, ['a.json','b.json'], compiler, 'test') == [1, 2]
+    assert compiler.calls == 1
+    assert os.path.exists(gcache.cache_path(folder, ['a.json','b.json']))
+
+
+def test_touched_file_is_hashed_not_compiled(tmp_path):
+    folder = str(tmp_path)
+    path = write(folder, 'a.json', 1)
+    compiler = Compiler()
+    gcache.load_compiled(folder, ['a.json'], compiler, 'test')
+    info = os.stat(path)
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns+10**9))
+    assert gcache.load_compiled(folder, ['a.json'], compiler, 'test') == [1]
+    assert compiler.calls == 1
+
+
+def test_changed_file_is_compiled_again(tmp_path):
+    folder = str(tmp_path)
+    path = write(folder, 'a.json', 1)
+    compiler = Compiler()
+    gcache.load_compiled(folder, ['a.json'], compiler, 'test')
+    write(folder, 'a.json', 1234)
+    info = os.stat(path)
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns+10**9))
+    assert gcache.load_compiled(folder, ['a.json'], compiler, 'test') == [1234]
+    assert compiler.calls == 2
+
+
+def test_new_tag_or_bad_cache_is_compiled_again(tmp_path):
+    folder = str(tmp_path)
+    write(folder, 'a.json', 1)
+    compiler = Compiler()
+    gcache.load_compiled(folder, ['a.json'], compiler, 'test')
+    assert gcache.load_compiled(folder, ['a.json'], compiler, 'other') == [1]
+    assert compiler.calls == 2
+
+    with open(gcache.cache_path(folder, ['a.json']), 'wb') as file:
+        file.write(b'not a pickle')
+    assert gcache.load_compiled(folder, ['a.json'], compiler, 'other') == [1]
+    assert compiler.calls == 3
+
+
+def test_missing_or_bad_files_load_nothing(tmp_path):
+    folder = str(tmp_path)
+    compiler = Compiler()
+    assert gcache.load_compiled(folder, ['a.json'], compiler) is None
+    with open(os.path.join(folder, 'a.json'), 'w') as file:
+        file.write('{ not json')
+    assert gcache.load_compiled(folder, ['a.json'], compiler) is None
+    assert compiler.calls == 0
+
+
+@pytest.mark.parametrize('name',['easy1.json','complete.json','bigones.json'])
+def test_cached_level_matches_a_fresh_compile(name, tmp_path):
+    folder = str(tmp_path)
+    sources = []
+    for item in (name, OBJECT_DATA):
+        shutil.copy(os.path.join(GameApp.json, item), folder)
+        with open(os.path.join(folder, item)) as file:
+            sources.append(json.load(file))
+
+    # The first load compiles and writes the cache, and the second unpickles it
+    expected = Level.compile(*sources)
+    for step in range(2):
+        assert gcache.load_compiled(folder, [name, OBJECT_DATA], Level.compile) == expected
@@ -0,0 +1,56 @@
+"""
+Checks of the loader that spreads a load over several frames.
+"""
+import time
+import pytest
+from game2d import GLoader
+
+
+def build(count, pause=0.0):
+    def steps(data=None):
+        for pos in range(count):
+            if pause:
+                time.sleep(pause)
+            yield (pos+1)/count
+        return (data, count)
+    return steps
+
+
+def test_finish_returns_the_result():
+    loader = GLoader(lambda : 'data', build(10))
+    assert loader.finish() == ('data', 10)
+    assert loader.done and loader.progress == 1.0 and loader.steps == 10
+
+
+def test_unthreaded_load_reports_progress():
+    loader = GLoader(lambda : 'data', build(4), budget=None, threaded=False)
+    assert loader.update()
+    assert loader.result == ('data', 4)
+
+
+def test_budget_is_shared_by_a_frame():
+    # Five updates in one frame (a fixed time step catching up) spend one budget
+    loader = GLoader(None, build(100, pause=0.002), budget=0.005)
+    for step in range(5):
+        assert not loader.update(1)
+    assert 1 <= loader.steps <= 5
+
+    # The next frame has a budget of its own
+    before = loader.steps
+    loader.update(2)
+    assert loader.steps > before
+
+
+def test_budget_without_frames_is_per_call():
+    loader = GLoader(None, build(100, pause=0.002), budget=0.005)
+    for step in range(5):
+        loader.update()
+    assert loader.steps >= 5
+
+
+def test_errors_are_raised_on_update():
+    def work():
+        raise ValueError('bad level')
+    loader = GLoader(work, build(3))
+    with pytest.raises(ValueError):
+        loader.finish()
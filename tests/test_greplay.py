@@ -0,0 +1,123 @@
+"""
+Checks that a recorded game plays back exactly as it was played.
+"""
+import random
+import pytest
+from game2d import GameApp, GKeyInput, GRecorder, GReplayInput
+from consts import OBJECT_DATA
+from level import Level
+
+KEYS = ['up','down','left','right','s','c']
+
+
+class Keys(GKeyInput):
+    # An input handler whose keys are set by the test
+    def set(self, key, down):
+        if down != self._keystate.get(key,False):
+            self._keycount += 1 if down else -1
+        self._keystate[key] = down
+
+
+def script(seed, frames):
+    # Random key changes, with some keys held over several frames
+    rng = random.Random(seed)
+    result = []
+    for frame in range(frames):
+        result.append([(rng.choice(KEYS), rng.random() < 0.5) for pos in range(rng.randrange(3))])
+    return result
+
+
+def state(input):
+    return (sorted(input.keys), [input.is_key_pressed(key) for key in KEYS],
+            [input.is_key_released(key) for key in KEYS])
+
+
+@pytest.mark.parametrize('timestep',[1/60, None])
+def test_replay_has_the_recorded_keys(timestep):
+    keys = Keys()
+    recorder = GRecorder(keys, timestep, 'test')
+    rng = random.Random(1)
+    expected = []
+    for changes in script(0, 500):
+        for (key, down) in changes:
+            keys.set(key, down)
+        dt = rng.choice([1/60, 1/30])
+        recorder.capture(dt)
+        expected.append((state(keys), dt if timestep is None else timestep))
+        keys.refresh()
+
+    replay = GReplayInput(recorder.tobytes())
+    assert (replay.tag, replay.timestep, replay.frames) == ('test', timestep, 500)
+    for (frame, (keystate, dt)) in enumerate(expected):
+        assert not replay.done
+        assert (state(replay), replay.dt) == (keystate, dt), frame
+        replay.refresh()
+    assert replay.done and replay.dt == 0
+
+
+def test_replay_from_a_file(tmp_path):
+    keys = Keys()
+    recorder = GRecorder(keys, 1/60)
+    keys.set('up', True)
+    recorder.capture()
+    keys.refresh()
+    keys.set('up', False)
+    recorder.capture()
+    path = str(tmp_path/'game.g2dr')
+    recorder.save(path)
+
+    replay = GReplayInput(path)
+    assert replay.is_key_down('up') and replay.frames == 2
+    replay.refresh()
+    assert replay.is_key_released('up')
+    replay.rewind()
+    assert replay.frame == 0 and replay.is_key_pressed('up')
+
+
+def play(level, input, frames, dt, recorder=None):
+    # Steps the level as GameApp does, noting the frog and score of every frame
+    trace = []
+    for frame in range(frames):
+        if level.noLives() or level.endGame():
+            break
+        if level.pauseGame():
+            level.resetFrog()
+        if recorder:
+            recorder.capture(dt)
+        level.update(dt, input)
+        input.refresh()
+        frog = level._frog
+        trace.append((None if frog is None else (frog.x, frog.y), level.getLives(),
+                      level.getScore()))
+    return trace
+
+
+@pytest.mark.parametrize('name',['easy1.json','complete.json'])
+def test_replayed_level_matches_the_original(name):
+    compiled = GameApp.load_compiled(name, Level.compile, OBJECT_DATA)
+    keys = Keys()
+    recorder = GRecorder(keys, 1/60, name)
+    rng = random.Random(2)
+
+    class Player(object):
+        # Holds a random arrow key (or none) for a while, then picks again
+        def __init__(self):
+            self.frame = 0
+
+        def is_key_down(self, key):
+            return keys.is_key_down(key)
+
+        def refresh(self):
+            keys.refresh()
+            self.frame += 1
+            if self.frame % 45 == 0:
+                for key in KEYS[:4]:
+                    keys.set(key, False)
+                key = rng.choice(['left','right','up','down',None,None,None])
+                if key:
+                    keys.set(key, True)
+
+    original = play(Level(*compiled), Player(), 4000, 1/60, recorder)
+    replay = GReplayInput(recorder.tobytes())
+    assert play(Level(*compiled), replay, 4000, replay.timestep) == original
+    assert replay.frame == len(original) and len(original) > 500
@@ -0,0 +1,77 @@
+"""
+Checks that the separating axis test is exact, and that its numpy form agrees with it.
+"""
+import random
+import pytest
+from game2d import GBody
+from game2d import gsat
+
+
+def shape(rng):
+    hitbox = tuple(rng.uniform(0,4) for pos in range(4))
+    return GBody(x=rng.uniform(-40,40),y=rng.uniform(-40,40),width=rng.uniform(10,50),
+                 height=rng.uniform(10,50),angle=rng.uniform(0,360),hitbox=hitbox)
+
+
+def cross(o,a,b):
+    return (a[0]-o[0])*(b[1]-o[1])-(a[1]-o[1])*(b[0]-o[0])
+
+
+def inside(point,corners):
+    # The corners are counter-clockwise, so the point is left of every edge
+    return all(cross(corners[pos],corners[(pos+1)%4],point) >= 0 for pos in range(4))
+
+
+def crosses(p0,p1,q0,q1):
+    d0 = cross(p0,p1,q0)
+    d1 = cross(p0,p1,q1)
+    d2 = cross(q0,q1,p0)
+    d3 = cross(q0,q1,p1)
+    return d0*d1 <= 0 and d2*d3 <= 0
+
+
+def overlap(a,b):
+    # Two convex shapes overlap if an edge of one crosses the other, or one holds the other
+    ca = gsat.box(a)
+    cb = gsat.box(b)
+    for i in range(4):
+        for j in range(4):
+            if crosses(ca[i],ca[(i+1)%4],cb[j],cb[(j+1)%4]):
+                return True
+    return inside(ca[0],cb) or inside(cb[0],ca)
+
+
+def test_agrees_with_polygon_overlap():
+    rng = random.Random(0)
+    hits = 0
+    for step in range(2000):
+        a = shape(rng)
+        b = shape(rng)
+        expected = overlap(a,b)
+        assert gsat.collides(a,b) == expected, (a.x,a.y,a.angle,b.x,b.y,b.angle)
+        hits += expected
+    # Both outcomes must actually be exercised
+    assert 200 < hits < 1800
+
+
+def test_finds_a_box_inside_another():
+    # The edge test misses this, as no edge of the small box meets an edge of the large
+    large = GBody(x=0,y=0,width=100,height=100,angle=30)
+    small = GBody(x=0,y=0,width=10,height=10,angle=45)
+    assert gsat.collides(large,small)
+    assert gsat.collides(small,large)
+
+
+def test_many_agrees_with_one():
+    rng = random.Random(1)
+    others = [shape(rng) for pos in range(200)]
+    hitboxes = gsat.frames(others)
+    for step in range(20):
+        obj = shape(rng)
+        expected = [gsat.collides(obj,other) for other in others]
+        assert gsat.collides_many(obj,hitboxes).tolist() == expected
+
+
+def test_many_with_no_hitboxes():
+    obj = GBody(x=0,y=0,width=10,height=10)
+    assert len(gsat.collides_many(obj,gsat.frames([]))) == 0
@@ -0,0 +1,87 @@
+"""
+Checks that a retained view shows exactly what an immediate view would.
+"""
+import random
+import pytest
+from conftest import HEADLESS
+
+pytestmark = pytest.mark.skipif(HEADLESS, reason='the headless view draws nothing')
+
+
+class Counter(object):
+    # Wraps an instruction group, counting the changes made to it
+    def __init__(self, group):
+        self.group = group
+        self.changes = 0
+
+    def insert(self, pos, cmd):
+        self.changes += 1
+        self.group.insert(pos, cmd)
+
+    def remove(self, cmd):
+        self.changes += 1
+        self.group.remove(cmd)
+
+
+def frames(seed, count):
+    # A static background and foreground, with a few commands that come and go
+    rng = random.Random(seed)
+    back = list(range(20))
+    sprites = list(range(20,30))
+    front = list(range(30,35))
+    result = []
+    for frame in range(count):
+        middle = rng.sample(sprites, rng.randrange(len(sprites)+1))
+        if rng.random() < 0.3:
+            middle.append(middle[0] if middle else sprites[0])
+        result.append(back+middle+front)
+    return result
+
+
+def commands():
+    # A Kivy instruction belongs to one group, so each view needs its own
+    from kivy.graphics import Color
+    return [Color(pos/35.0,0,0) for pos in range(35)]
+
+
+def show(view, cmds, frame):
+    # Draws the frame, returning the positions of the commands now in the view
+    view.clear()
+    for pos in frame:
+        view.draw(cmds[pos])
+    view._commit()
+    return [cmds.index(cmd) for cmd in view._frame.children]
+
+
+def test_retained_matches_immediate():
+    from game2d.gview import GView
+    immediate = GView()
+    retained = GView()
+    retained.retained = True
+    (cmds0, cmds1) = (commands(), commands())
+    for frame in frames(0, 300):
+        assert show(retained, cmds1, frame) == show(immediate, cmds0, frame)
+
+
+def test_unchanged_frames_touch_nothing():
+    from game2d.gview import GView
+    view = GView()
+    view.retained = True
+    cmds = commands()
+    frame = frames(1, 1)[0]
+    show(view, cmds, frame)
+    counter = Counter(view._frame)
+    view._frame = counter
+    for step in range(10):
+        view.clear()
+        for pos in frame:
+            view.draw(cmds[pos])
+        view._commit()
+    assert counter.changes == 0
+
+    # Leaving one command out only removes that one
+    view.clear()
+    for pos in frame[:5]+frame[6:]:
+        view.draw(cmds[pos])
+    view._commit()
+    assert counter.changes == 1
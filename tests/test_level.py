@@ -0,0 +1,31 @@
+"""
+Checks of the level rules that are not about collisions.
+"""
+from game2d import GameApp, GKeyInput
+from consts import FROG_TIME, FROG_LIVES, OBJECT_DATA
+from level import Level
+
+
+def load(name='easy1.json'):
+    return Level(*GameApp.load_compiled(name, Level.compile, OBJECT_DATA))
+
+
+def idle(level, seconds, dt=0.1):
+    keys = GKeyInput()
+    for step in range(int(seconds/dt)):
+        level.update(dt, keys)
+
+
+def test_timer_is_only_shown_by_default():
+    level = load()
+    level.setTimeout(False)
+    idle(level, FROG_TIME+5)
+    assert level.getLives() == FROG_LIVES
+    assert not level.pauseGame()
+
+
+def test_timeout_kills_the_frog():
+    level = load()
+    level.setTimeout(True)
+    idle(level, FROG_TIME+5)
+    assert level.getLives() == FROG_LIVES-1
@@ -0,0 +1,40 @@
+"""
+Checks that the time-to-collision tables agree with the live collision tests.
+"""
+import random
+import pytest
+from game2d import GameApp
+from consts import GRID_SIZE, TIMED_LANES
+from level import Level
+from lanes import Water
+
+
+def load(name):
+    return Level(*GameApp.load_compiled(name, Level.compile, 'objects.json'))
+
+
+@pytest.mark.skipif(not TIMED_LANES, reason='tables need timed lanes')
+@pytest.mark.parametrize('name',['easy2.json','complete.json','roadsonly.json'])
+def test_safe_agrees_with_collides(name):
+    level = load(name)
+    frog = level._frog
+    columns = int(level.getWidth()//GRID_SIZE)
+    rng = random.Random(0)
+    checked = 0
+    for (row, lane) in enumerate(level._lanes):
+        schedule = lane.getSchedule()
+        if schedule is None:
+            continue
+        for column in range(columns):
+            frog.x = GRID_SIZE*(column+0.5)
+            frog.y = GRID_SIZE*(row+0.5)
+            for step in range(40):
+                t = rng.uniform(0,schedule.getLap())
+                lane.setTime(t)
+                if isinstance(lane,Water):
+                    live = any(log.contains((frog.x,frog.y)) for log in lane.getObjs())
+                else:
+                    live = not any(car.collides(frog) for car in lane.getObjs())
+                assert level.isSafe(column,row) == live, (row,column,t)
+                checked += 1
+    assert checked > 0